@@ -1,6 +1,6 @@
 from ulauncher_toggl_extension.utils import ensure_import
 
-ensure_import("toggl_api", "toggl-api-wrapper", "1.5.1")
+ensure_import("toggl_api", "toggl-api-wrapper", "1.6.0")
 
 from ulauncher_toggl_extension.extension import TogglExtension  # noqa: E402
 
@@ -1,15 +1,14 @@
 from __future__ import annotations
 
 import os
-import time
 from dataclasses import dataclass
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from random import Random
-from typing import TYPE_CHECKING, Final
+from typing import TYPE_CHECKING, Final, Optional
 
 import pytest
 from faker import Faker
-from toggl_api import generate_authentication
+from toggl_api import TogglTag, TogglTracker, generate_authentication
 
 from ulauncher_toggl_extension.commands import (
     ClientCommand,
@@ -19,21 +18,16 @@ from ulauncher_toggl_extension.commands import (
 )
 from ulauncher_toggl_extension.date_time import get_local_tz
 from ulauncher_toggl_extension.query import QueryParser
+from ulauncher_toggl_extension.scheduler import ScheduledAuth
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
     from pathlib import Path
 
     from httpx import BasicAuth
     from toggl_api.reports.reports import REPORT_FORMATS
 
 
-@pytest.fixture(autouse=True)
-def _rate_limit(request):
-    yield
-    if "integration" in request.keywords:
-        time.sleep(1)
-
-
 @pytest.fixture(autouse=True)
 def _patch_noti(monkeypatch):
     def mocked_notif():
@@ -56,8 +50,10 @@ def faker():
 
 
 @pytest.fixture
-def auth():
-    return generate_authentication()
+def auth(request):
+    # NOTE: Live requests share the extension's scheduler to respect rate limits.
+    auth = generate_authentication()
+    return ScheduledAuth(auth) if "integration" in request.keywords else auth
 
 
 @pytest.fixture
@@ -65,6 +61,41 @@ def get_tz():
     return get_local_tz()
 
 
+def tracker_factory(  # noqa: PLR0913
+    tracker_id: int,
+    start: datetime | timedelta,
+    *,
+    name: Optional[str] = None,
+    workspace: int = 1,
+    duration: Optional[timedelta] = timedelta(hours=1),
+    project: Optional[int] = None,
+    tags: Sequence[str] = (),
+    timestamp: Optional[datetime] = None,
+) -> TogglTracker:
+    """Builds a tracker starting at a datetime or this long ago.
+
+    Trackers without a duration are still running.
+    """
+    if isinstance(start, timedelta):
+        start = datetime.now(timezone.utc) - start
+    return TogglTracker(
+        tracker_id,
+        name or f"Tracker {tracker_id}",
+        workspace=workspace,
+        start=start,
+        stop=None if duration is None else start + duration,
+        duration=duration,
+        project=project,
+        tags=[TogglTag(i, tag, workspace=workspace) for i, tag in enumerate(tags, 1)],
+        timestamp=timestamp,
+    )
+
+
+@pytest.fixture
+def make_tracker() -> Callable[..., TogglTracker]:
+    return tracker_factory
+
+
 @pytest.fixture
 def workspace():
     return int(os.environ.get("TOGGL_WORKSPACE_ID"))
@@ -82,6 +113,10 @@ class DummyExtension:
     hints: bool = True
     report_format: REPORT_FORMATS = "csv"
     expiration: timedelta = timedelta(days=7)
+    workspace_ids: tuple[int, ...] = ()
+
+    def invalidate(self) -> None:
+        pass
 
 
 @pytest.fixture
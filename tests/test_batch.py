@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+from threading import Barrier
+
+import pytest
+
+from ulauncher_toggl_extension.batch import BATCH, run_batches
+
+
+@pytest.mark.unit
+def test_run_batches_parallel():
+    barrier = Barrier(BATCH, timeout=5)
+
+    def call(item: int) -> int:
+        barrier.wait()
+        return -item
+
+    result = run_batches(range(BATCH * 2), call, interval=timedelta())
+    assert result.done == [(i, -i) for i in range(BATCH * 2)]
+    assert not result.failed
+
+
+@pytest.mark.unit
+def test_run_batches_failure():
+    def call(item: int) -> int:
+        if item % 2:
+            raise ValueError(item)
+        return item
+
+    result = run_batches(range(5), call, size=2, interval=timedelta())
+    assert [item for item, _ in result.done] == [0, 2, 4]
+    assert [item for item, _ in result.failed] == [1, 3]
+    assert all(isinstance(err, ValueError) for _, err in result.failed)
+
+
+@pytest.mark.unit
+def test_run_batches_interval():
+    started = time.monotonic()
+    run_batches(range(3), lambda x: x, size=1, interval=timedelta(seconds=0.05))
+    assert time.monotonic() - started >= 0.1  # noqa: PLR2004
@@ -0,0 +1,56 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from toggl_api import JSONCache, ProjectEndpoint, TogglProject
+from toggl_api.meta import RequestMethod
+
+from ulauncher_toggl_extension.codec import decode_models, decode_trackers, dumps, loads
+
+
+@pytest.mark.unit
+def test_codec_roundtrip():
+    data = {"data": [{"id": 1, "name": "Ulauncher"}], "version": "1.5.1"}
+    assert loads(dumps(data)) == data
+
+    with pytest.raises(ValueError, match=r".+"):
+        loads(b"{")
+
+
+@pytest.mark.unit
+def test_codec_models(dummy_ext):
+    cache = JSONCache(dummy_ext.cache_path)
+    ProjectEndpoint(dummy_ext.workspace_id, dummy_ext.auth, cache)
+    project = TogglProject(1, "Ulauncher", workspace=dummy_ext.workspace_id)
+    cache.save_cache(project, RequestMethod.PUT)
+
+    assert decode_models(cache.cache_path.read_bytes()) == [project]
+
+
+@pytest.mark.unit
+def test_codec_trackers():
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    raw = dumps(
+        {
+            "data": [
+                {
+                    "class": "tracker",
+                    "id": 1,
+                    "name": "Toggl",
+                    "timestamp": start.isoformat(),
+                    "workspace": 1,
+                    "start": start.isoformat().replace("+00:00", "Z"),
+                    "duration": None,
+                    "stop": None,
+                    "project": 2,
+                    "tags": [],
+                },
+            ],
+        },
+    )
+
+    (record,) = decode_trackers(raw)
+    assert record.id == 1
+    assert record.project == 2  # noqa: PLR2004
+    assert math.isclose(record.start, start.timestamp())
+    assert math.isnan(record.stop)
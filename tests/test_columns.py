@@ -0,0 +1,202 @@
+import pickle  # noqa: S403
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter
+
+import pytest
+from toggl_api import JSONCache, TogglTag, TogglTracker, UserEndpoint
+from toggl_api.meta import RequestMethod
+
+from ulauncher_toggl_extension.columns import ColumnStore, TrackerColumns
+from ulauncher_toggl_extension.journal import JournalCache
+
+
+@pytest.fixture
+def tracker_cache(dummy_ext):
+    cache = JSONCache(dummy_ext.cache_path)
+    UserEndpoint(dummy_ext.workspace_id, dummy_ext.auth, cache)
+    now = datetime.now(timezone.utc)
+    tag = TogglTag(5, "Extension", workspace=dummy_ext.workspace_id)
+    cache.save_cache(
+        [
+            TogglTracker(
+                1,
+                "Ulauncher",
+                workspace=dummy_ext.workspace_id,
+                start=now - timedelta(hours=3),
+                stop=now - timedelta(hours=2),
+                duration=timedelta(hours=1),
+                project=10,
+                tags=[tag],
+            ),
+            TogglTracker(
+                2,
+                "Toggl",
+                workspace=dummy_ext.workspace_id,
+                start=now - timedelta(hours=2),
+                stop=now - timedelta(hours=1),
+                duration=timedelta(hours=1),
+            ),
+            TogglTracker(
+                3,
+                "Ulauncher",
+                workspace=dummy_ext.workspace_id,
+                start=now - timedelta(minutes=30),
+                project=10,
+                tags=[tag],
+            ),
+        ],
+        RequestMethod.GET,
+    )
+    return cache
+
+
+@pytest.mark.unit
+def test_columns_model(tracker_cache):
+    columns = ColumnStore().get(tracker_cache.cache_path)
+    assert columns is not None
+    assert len(columns.strings) == 2  # noqa: PLR2004
+
+    for tracker in tracker_cache.load_cache():
+        model = columns.find(tracker.id)
+        assert model.running() == tracker.running()
+        if not tracker.running():
+            assert model == tracker
+
+    assert columns.find("Toggl").id == 2  # noqa: PLR2004
+    assert columns.find("Missing") is None
+    assert columns.find(1, timedelta(microseconds=1)) is None
+
+
+@pytest.mark.unit
+def test_columns_select(tracker_cache):
+    columns = TrackerColumns.from_models(tracker_cache.load_cache())
+
+    rows = columns.select(reverse=True)
+    assert [t.id for t in rows] == [3, 2, 1]
+    assert [t.id for t in columns.select(reverse=True, distinct=True)] == [3, 2]
+    assert columns.select("Toggl", reverse=True)[0].name == "Toggl"
+
+    now = datetime.now(timezone.utc)
+    recent = columns.select(start_date=now - timedelta(minutes=45), end_date=now)
+    assert [t.id for t in recent] == [3]
+
+
+@pytest.mark.unit
+def test_columns_lazy(tracker_cache, monkeypatch):
+    columns = ColumnStore().get(tracker_cache.cache_path)
+    results = columns.select(reverse=True).map(attrgetter("name"))
+
+    built = []
+    model = TrackerColumns.model
+
+    def track(self, row):
+        built.append(row)
+        return model(self, row)
+
+    monkeypatch.setattr(TrackerColumns, "model", track)
+    assert results[:1] == ["Ulauncher"]
+    assert len(built) == 1
+    assert len(results) == 3  # noqa: PLR2004
+
+    restored = pickle.loads(pickle.dumps(results))  # noqa: S301
+    assert restored[1:] == ["Toggl", "Ulauncher"]
+
+
+@pytest.mark.unit
+def test_columns_tiering(tracker_cache):
+    store = ColumnStore(timedelta(hours=1))
+    now = datetime.now(timezone.utc)
+
+    hot = store.get(tracker_cache.cache_path)
+    assert [t.id for t in hot.select()] == [3]
+    assert tracker_cache.cache_path.with_suffix(ColumnStore.SUFFIX).exists()
+
+    assert store.get(tracker_cache.cache_path, since=now - timedelta(minutes=30)) is hot
+    history = store.get(tracker_cache.cache_path, since=now - timedelta(days=1))
+    assert sorted(t.id for t in history.select()) == [1, 2, 3]
+    assert store.get(tracker_cache.cache_path, full=True) is history
+
+
+@pytest.mark.unit
+def test_columns_memory_budget(tracker_cache):
+    columns = TrackerColumns.from_cache(tracker_cache.cache_path)
+    store = ColumnStore(timedelta(days=1), columns.nbytes // 2)
+
+    hot = store.get(tracker_cache.cache_path)
+    assert [t.id for t in hot.select()] == [3]
+
+    history = store.get(tracker_cache.cache_path, full=True)
+    assert len(history) == 3  # noqa: PLR2004
+    assert store.get(tracker_cache.cache_path, full=True) is not history
+
+
+@pytest.mark.unit
+def test_columns_last_used(tracker_cache):
+    columns = ColumnStore().get(tracker_cache.cache_path)
+    assert columns is not None
+
+    projects, tags = columns.last_used()
+    starts = {t.id: t.start.timestamp() for t in tracker_cache.load_cache()}
+    assert projects == {10: starts[3]}
+    assert tags == {5: starts[3]}
+
+
+@pytest.mark.unit
+def test_columns_journal_fold(dummy_ext, make_tracker):
+    cache = JournalCache(dummy_ext.cache_path)
+    UserEndpoint(dummy_ext.workspace_id, dummy_ext.auth, cache)
+    half = timedelta(minutes=30)
+
+    cache.save_cache(
+        [
+            make_tracker(
+                1,
+                timedelta(days=3),
+                duration=half,
+                workspace=dummy_ext.workspace_id,
+            ),
+            make_tracker(
+                2,
+                timedelta(hours=2),
+                duration=half,
+                workspace=dummy_ext.workspace_id,
+            ),
+        ],
+        RequestMethod.GET,
+    )
+    store = ColumnStore(timedelta(days=1))
+    assert [t.id for t in store.get(cache.cache_path).select()] == [2]
+    cold = cache.cache_path.with_suffix(ColumnStore.SUFFIX)
+    written = cold.stat().st_mtime_ns
+
+    cache.save_cache(
+        make_tracker(
+            3,
+            timedelta(hours=1),
+            duration=half,
+            workspace=dummy_ext.workspace_id,
+        ),
+        RequestMethod.PUT,
+    )
+    cache.save_cache(
+        make_tracker(
+            1,
+            timedelta(days=3),
+            name="Edited",
+            duration=half,
+            workspace=dummy_ext.workspace_id,
+        ),
+        RequestMethod.PUT,
+    )
+    cache.delete_entries(cache.find_entry({"id": 2}))
+    cache.commit()
+
+    hot = store.get(cache.cache_path)
+    assert sorted(t.id for t in hot.select()) == [1, 3]
+    assert cold.stat().st_mtime_ns == written
+
+    history = store.get(cache.cache_path, full=True)
+    assert sorted((t.id, t.name) for t in history.select()) == [
+        (1, "Edited"),
+        (3, "Tracker 3"),
+    ]
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import re
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from toggl_api import TogglTag, TogglTracker
+from toggl_api.meta import RequestMethod
+
+from ulauncher_toggl_extension.commands import (
+    ActionEnum,
+    BulkCommand,
+    BulkDeleteCommand,
+    BulkEditCommand,
+    BulkTagCommand,
+    routing_table,
+)
+from ulauncher_toggl_extension.query import QueryParser
+
+
+@pytest.fixture
+def parser(dummy_ext):
+    return QueryParser(
+        dummy_ext.prefix,
+        dummy_ext.report_format,
+        routing_table().parents,
+    )
+
+
+@pytest.fixture
+def trackers(dummy_ext):
+    cmd = BulkTagCommand(dummy_ext)
+    now = datetime.now(timezone.utc)
+    tag = TogglTag(1, "meeting", workspace=dummy_ext.workspace_id)
+    models = [
+        TogglTracker(
+            i,
+            name,
+            workspace=dummy_ext.workspace_id,
+            start=now - timedelta(days=i),
+            stop=now - timedelta(days=i) + timedelta(hours=1),
+            duration=timedelta(hours=1),
+            tags=tags,
+        )
+        for i, (name, tags) in enumerate(
+            [
+                ("Standup", [tag]),
+                ("Daily Standup", [tag]),
+                ("Planning", []),
+                ("Standup", []),
+            ],
+            start=1,
+        )
+    ]
+    cmd.endpoint().cache.save_cache(models, RequestMethod.GET)
+    return cmd
+
+
+def cached(cmd: BulkCommand) -> dict[int, TogglTracker]:
+    return {t.id: t for t in cmd.endpoint().cache.load_cache()}
+
+
+@pytest.mark.unit
+def test_bulk_routing():
+    routes = routing_table()
+    assert routes.get("bulk") is BulkCommand
+    assert routes.get("batch", "edit") is BulkEditCommand
+    assert routes.get("bulk", "tag") is BulkTagCommand
+    assert routes.get("bulk", "rm") is BulkDeleteCommand
+    assert "bulk" in routes.parents
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("query", "ids"),
+    [
+        ("tgl bulk tag", [1, 2, 3, 4]),
+        ('tgl bulk tag "standup"', [1, 2, 4]),
+        ('tgl bulk tag "standup" #meeting', [1, 2]),
+        ('tgl bulk tag "standup" #-meeting', [4]),
+        ("tgl bulk tag <{stop}", [3, 4]),
+    ],
+)
+def test_bulk_select(trackers, parser, query, ids):
+    stop = (date.today() - timedelta(days=2)).isoformat()  # noqa: DTZ011
+    query = parser.parse(query.format(stop=stop))
+    assert sorted(t.id for t in trackers.select(query)) == ids
+
+
+@pytest.mark.unit
+def test_bulk_split(trackers, parser):
+    query = parser.parse('tgl bulk edit "Standup" #meeting -> "Sync"')
+    filters, changes = trackers.split(query)
+    assert filters.name == "Standup"
+    assert filters.add_tags == ["meeting"]
+    assert changes.name == "Sync"
+    assert not changes.tags
+
+
+@pytest.mark.unit
+def test_bulk_tag(trackers, parser, httpx_mock, monkeypatch):
+    monkeypatch.setattr("ulauncher_toggl_extension.batch.CHUNK", 1)
+    monkeypatch.setattr("ulauncher_toggl_extension.batch.INTERVAL", timedelta())
+    for i in (1, 2):
+        httpx_mock.add_response(
+            method="PATCH",
+            url=re.compile(rf".*/time_entries/{i}$"),
+            json={"success": [i], "failure": []},
+        )
+
+    query = parser.parse("tgl bulk tag #meeting -meeting")
+    assert trackers.changes(query) == ([], ["meeting"])
+    assert trackers.handle(query)
+
+    models = cached(trackers)
+    assert not models[1].tags
+    assert not models[2].tags
+    assert len(httpx_mock.get_requests()) == 2  # noqa: PLR2004
+
+
+@pytest.mark.unit
+def test_bulk_delete(trackers, parser, httpx_mock, monkeypatch):
+    monkeypatch.setattr("ulauncher_toggl_extension.batch.INTERVAL", timedelta())
+    httpx_mock.add_response(method="DELETE", url=re.compile(r".*/time_entries/3$"))
+
+    cmd = BulkDeleteCommand(trackers)
+    assert cmd.handle(parser.parse('tgl bulk delete "Planning"'))
+    assert sorted(cached(trackers)) == [1, 2, 4]
+
+
+@pytest.mark.unit
+def test_bulk_unfiltered(trackers, parser):
+    cmd = BulkDeleteCommand(trackers)
+    query = parser.parse("tgl bulk delete")
+    assert not cmd.filtered(query)
+    assert [r.on_enter for r in cmd.view(query)] == [ActionEnum.DO_NOTHING]
+    assert not cmd.handle(query)
+    assert sorted(cached(trackers)) == [1, 2, 3, 4]
+
+
+@pytest.mark.unit
+def test_bulk_previewed(trackers, parser, httpx_mock, monkeypatch):
+    monkeypatch.setattr("ulauncher_toggl_extension.batch.INTERVAL", timedelta())
+    httpx_mock.add_response(method="DELETE", url=re.compile(r".*/time_entries/3$"))
+
+    cmd = BulkDeleteCommand(trackers)
+    query = parser.parse('tgl bulk delete "Planning"')
+    action = cmd.view(query)[0].on_enter
+    assert action.keywords["ids"] == [3]
+
+    now = datetime.now(timezone.utc)
+    trackers.endpoint().cache.save_cache(
+        TogglTracker(
+            5,
+            "Planning",
+            workspace=trackers.workspace_id,
+            start=now - timedelta(hours=2),
+            stop=now - timedelta(hours=1),
+            duration=timedelta(hours=1),
+        ),
+        RequestMethod.PUT,
+    )
+    assert cmd.handle(query, ids=action.keywords["ids"])
+    assert sorted(cached(trackers)) == [1, 2, 4, 5]
+
+
+@pytest.mark.unit
+def test_bulk_workspaces(trackers, parser, httpx_mock, monkeypatch, dummy_ext):
+    monkeypatch.setattr("ulauncher_toggl_extension.batch.INTERVAL", timedelta())
+    other = dummy_ext.workspace_id + 1
+    now = datetime.now(timezone.utc)
+    trackers.endpoint().cache.save_cache(
+        TogglTracker(
+            5,
+            "Standup",
+            workspace=other,
+            start=now - timedelta(hours=5),
+            stop=now - timedelta(hours=4),
+            duration=timedelta(hours=1),
+        ),
+        RequestMethod.PUT,
+    )
+    for wid, ids in ((dummy_ext.workspace_id, [1, 2, 4]), (other, [5])):
+        httpx_mock.add_response(
+            method="PATCH",
+            url=re.compile(rf".*/workspaces/{wid}/time_entries/[\d,]+$"),
+            json={"success": ids, "failure": []},
+        )
+
+    cmd = BulkEditCommand(trackers)
+    assert cmd.handle(parser.parse('tgl bulk edit "Standup" -> "Sync"'))
+    synced = {t.id for t in cached(trackers).values() if t.name == "Sync"}
+    assert synced == {1, 2, 4, 5}
@@ -1,14 +1,26 @@
+import re
+from datetime import datetime, timedelta, timezone
+
 import pytest
-from toggl_api import JSONCache, ProjectEndpoint
+from toggl_api import (
+    JSONCache,
+    ProjectEndpoint,
+    TogglProject,
+    TogglTracker,
+    TrackerEndpoint,
+)
+from toggl_api.meta import RequestMethod
 
 from ulauncher_toggl_extension.commands.project import (
     AddProjectCommand,
+    ArchiveProjectCommand,
     DeleteProjectCommand,
     EditProjectCommand,
     ListProjectCommand,
     ProjectCommand,
     RefreshProjectCommand,
 )
+from ulauncher_toggl_extension.journal import JournalCache
 
 
 @pytest.mark.integration
@@ -90,3 +102,46 @@ def test_delete_project_command(dummy_ext, create_project, query_parser):
     assert isinstance(cmd.view(query), list)
     assert cmd.handle(query)
     assert cmd.get_model(create_project.name) is None
+
+
+@pytest.mark.unit
+def test_archive_project_command(dummy_ext, query_parser, httpx_mock, monkeypatch):
+    monkeypatch.setattr("ulauncher_toggl_extension.batch.INTERVAL", timedelta())
+    cmd = ArchiveProjectCommand(dummy_ext)
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(weeks=52)
+    wid = dummy_ext.workspace_id
+    endpoint = ProjectEndpoint(wid, cmd.auth, JournalCache(cmd.cache_path))
+    endpoint.cache.delete_entries(list(endpoint.cache.load_cache()))
+    endpoint.cache.save_cache(
+        [
+            TogglProject(1, "Used", workspace=wid, timestamp=old),
+            TogglProject(2, "Stale", workspace=wid, timestamp=old),
+            TogglProject(3, "Archived", workspace=wid, timestamp=old, active=False),
+        ],
+        RequestMethod.GET,
+    )
+    TrackerEndpoint(wid, cmd.auth, JournalCache(cmd.cache_path)).cache.save_cache(
+        [
+            TogglTracker(
+                1,
+                "Tracker",
+                workspace=wid,
+                start=now - timedelta(days=1),
+                stop=now - timedelta(hours=23),
+                duration=timedelta(hours=1),
+                project=1,
+            ),
+        ],
+        RequestMethod.GET,
+    )
+    httpx_mock.add_response(
+        method="PATCH",
+        url=re.compile(r".*/projects/2$"),
+        json={"success": [2], "failure": []},
+    )
+
+    query = query_parser.parse("tgl project archive")
+    assert [p.id for p in cmd.candidates(query)] == [2]
+    assert cmd.handle(query)
+    assert not {p.id: p for p in endpoint.cache.load_cache()}[2].active
@@ -0,0 +1,56 @@
+import pytest
+
+from ulauncher_toggl_extension.commands import (
+    ClientCommand,
+    ListCommand,
+    ProjectCommand,
+    ReportCommand,
+    TagCommand,
+    routing_table,
+)
+from ulauncher_toggl_extension.commands.project import ListProjectCommand
+from ulauncher_toggl_extension.commands.report import WeeklyReportCommand
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        (("list",), ListCommand),
+        (("ls",), ListCommand),
+        (("project",), ProjectCommand),
+        (("proj", "ls"), ListProjectCommand),
+        (("projects", "list"), ListProjectCommand),
+        (("stats", "wk"), WeeklyReportCommand),
+        (("project", "missing"), None),
+        (("missing",), None),
+    ],
+)
+def test_routing_table_get(path, expected):
+    assert routing_table().get(*path) is expected
+
+
+@pytest.mark.unit
+def test_routing_table_complete():
+    routes = routing_table()
+
+    assert routes.complete("proj") == [ProjectCommand]
+    assert ListCommand in routes.complete("l")
+    assert routes.complete("l", ProjectCommand) == [ListProjectCommand]
+    assert routes.complete("xyz") == []
+
+
+@pytest.mark.unit
+def test_routing_table_structure():
+    routes = routing_table()
+
+    assert routes.path(WeeklyReportCommand) == ("report", "week")
+    assert ListProjectCommand in routes.children(ProjectCommand)
+    assert routes.parents >= {
+        ProjectCommand.PREFIX,
+        ClientCommand.PREFIX,
+        TagCommand.PREFIX,
+        ReportCommand.PREFIX,
+        *ProjectCommand.ALIASES,
+    }
+    assert ListCommand.PREFIX not in routes.parents
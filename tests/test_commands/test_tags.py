@@ -1,12 +1,19 @@
+import re
+from datetime import datetime, timedelta, timezone
+
 import pytest
+from toggl_api import TagEndpoint, TogglTag, TogglTracker, TrackerEndpoint
+from toggl_api.meta import RequestMethod
 
 from ulauncher_toggl_extension.commands.tag import (
     AddTagCommand,
     DeleteTagCommand,
     EditTagCommand,
     ListTagCommand,
+    PruneTagCommand,
     TagCommand,
 )
+from ulauncher_toggl_extension.journal import JournalCache
 
 
 @pytest.mark.unit
@@ -60,3 +67,82 @@ def test_delete_tag_command(dummy_ext, create_tag, query_parser):
     assert isinstance(cmd.view(query), list)
     assert cmd.handle(query)
     assert cmd.get_model(create_tag.name) is None
+
+
+@pytest.fixture
+def unused_tags(dummy_ext):
+    cmd = PruneTagCommand(dummy_ext)
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(weeks=52)
+    tags = [
+        TogglTag(1, "used", workspace=dummy_ext.workspace_id, timestamp=old),
+        TogglTag(2, "stale", workspace=dummy_ext.workspace_id, timestamp=old),
+        TogglTag(3, "fresh", workspace=dummy_ext.workspace_id, timestamp=now),
+        TogglTag(4, "forgotten", workspace=dummy_ext.workspace_id, timestamp=old),
+    ]
+    endpoint = TagEndpoint(cmd.workspace_id, cmd.auth, JournalCache(cmd.cache_path))
+    # NOTE: Re-adding cached tags would refresh their timestamps.
+    endpoint.cache.delete_entries(list(endpoint.cache.load_cache()))
+    endpoint.cache.save_cache(tags, RequestMethod.GET)
+
+    trackers = [
+        TogglTracker(
+            i,
+            "Tracker",
+            workspace=dummy_ext.workspace_id,
+            start=now - days,
+            stop=now - days + timedelta(hours=1),
+            duration=timedelta(hours=1),
+            tags=[tag],
+        )
+        for i, (tag, days) in enumerate(
+            [(tags[0], timedelta(days=1)), (tags[3], timedelta(weeks=20))],
+            start=1,
+        )
+    ]
+    TrackerEndpoint(
+        cmd.workspace_id,
+        cmd.auth,
+        JournalCache(cmd.cache_path),
+    ).cache.save_cache(trackers, RequestMethod.GET)
+    return cmd, endpoint
+
+
+@pytest.mark.unit
+def test_prune_tag_candidates(unused_tags, query_parser):
+    cmd, _ = unused_tags
+    assert sorted(
+        t.id for t in cmd.candidates(query_parser.parse("tgl tag prune"))
+    ) == [
+        2,
+        4,
+    ]
+    query = query_parser.parse("tgl tag prune >30w<")
+    assert [t.id for t in cmd.candidates(query)] == [2]
+
+
+@pytest.mark.unit
+def test_prune_tag_command(unused_tags, query_parser, httpx_mock, monkeypatch):
+    cmd, endpoint = unused_tags
+    monkeypatch.setattr("ulauncher_toggl_extension.batch.INTERVAL", timedelta())
+    httpx_mock.add_response(method="DELETE", url=re.compile(r".*/tags/2$"))
+    httpx_mock.add_response(method="DELETE", url=re.compile(r".*/tags/4$"))
+
+    query = query_parser.parse("tgl tag prune")
+    assert cmd.view(query)
+    assert cmd.handle(query)
+    assert sorted(t.id for t in endpoint.cache.load_cache()) == [1, 3]
+
+
+@pytest.mark.unit
+def test_prune_tag_previewed(unused_tags, query_parser, httpx_mock, monkeypatch):
+    cmd, endpoint = unused_tags
+    monkeypatch.setattr("ulauncher_toggl_extension.batch.INTERVAL", timedelta())
+    httpx_mock.add_response(method="DELETE", url=re.compile(r".*/tags/2$"))
+
+    query = query_parser.parse("tgl tag prune")
+    action = cmd.view(query)[0].on_enter
+    assert sorted(action.keywords["ids"]) == [2, 4]
+
+    assert cmd.handle(query, ids=[2])
+    assert sorted(t.id for t in endpoint.cache.load_cache()) == [1, 3, 4]
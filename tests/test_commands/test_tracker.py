@@ -1,3 +1,4 @@
+import csv
 import sys
 import time
 from datetime import datetime, timedelta, timezone
@@ -7,6 +8,7 @@ from pathlib import Path
 import pytest
 from faker import Faker
 from toggl_api import JSONCache, TogglTag, TogglTracker, TrackerEndpoint
+from toggl_api.meta import RequestMethod
 
 from ulauncher_toggl_extension.commands import (
     AddCommand,
@@ -14,6 +16,7 @@ from ulauncher_toggl_extension.commands import (
     CurrentTrackerCommand,
     DeleteCommand,
     EditCommand,
+    ExportCommand,
     ListCommand,
     StartCommand,
     StopCommand,
@@ -21,6 +24,7 @@ from ulauncher_toggl_extension.commands import (
 from ulauncher_toggl_extension.commands.project import AddProjectCommand, ProjectCommand
 from ulauncher_toggl_extension.commands.tracker import RefreshCommand
 from ulauncher_toggl_extension.query import Query
+from ulauncher_toggl_extension.shards import ShardedCache
 
 
 @pytest.mark.integration
@@ -56,11 +60,80 @@ def test_current_command(dummy_ext, create_tracker, query_parser):
 
     time.sleep(5)
 
+    # NOTE: Expired state is served while being reconciled in the background.
+    assert cmd.get_current_tracker().id == create_tracker.id
+    assert cmd.join(30)
+
     assert cmd.get_current_tracker() is None
     assert not cmd.preview(query)
     assert not cmd.handle(query)
 
 
+@pytest.mark.unit
+def test_current_command_state(dummy_ext):
+    cmd = CurrentTrackerCommand(dummy_ext)
+    tracker = TogglTracker.from_kwargs(
+        id=1,
+        description="Running",
+        workspace_id=dummy_ext.workspace_id,
+        start=datetime.now(timezone.utc) - timedelta(hours=1),
+        duration=-1,
+    )
+    cmd.tracker = tracker
+
+    cmd._tracker = None  # noqa: SLF001
+    cmd._ts = None  # noqa: SLF001
+    loaded = cmd.get_current_tracker()
+
+    assert loaded is not None
+    assert loaded.id == tracker.id
+    assert loaded.running()
+
+    cmd.tracker = None
+    cmd._ts = None  # noqa: SLF001
+    cmd.load_state()
+    assert cmd.tracker is None
+    assert cmd._ts is not None  # noqa: SLF001
+
+
+@pytest.mark.unit
+def test_current_command_update(dummy_ext):
+    cmd = CurrentTrackerCommand(dummy_ext)
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    cmd.tracker = TogglTracker.from_kwargs(
+        id=1,
+        description="Running",
+        workspace_id=dummy_ext.workspace_id,
+        start=start,
+        duration=-1,
+    )
+
+    cmd.update_tracker(
+        TogglTracker.from_kwargs(
+            id=1,
+            description="Edited",
+            workspace_id=dummy_ext.workspace_id,
+            start=start,
+            duration=-1,
+        ),
+    )
+    cmd._ts = None  # noqa: SLF001
+    cmd.load_state()
+    assert cmd.tracker.name == "Edited"
+
+    cmd.update_tracker(
+        TogglTracker.from_kwargs(
+            id=1,
+            description="Edited",
+            workspace_id=dummy_ext.workspace_id,
+            start=start,
+            stop=start + timedelta(minutes=30),
+            duration=1800,
+        ),
+    )
+    assert cmd.tracker is None
+
+
 @pytest.mark.integration
 def test_current_command_stop(dummy_ext, create_tracker, query_parser):
     cmd = CurrentTrackerCommand(dummy_ext)
@@ -247,3 +320,63 @@ def test_refresh_command(dummy_ext, create_tracker, faker, query_parser):
 
     cmd.handle(query_parser.parse(f"tgl refresh :{create_tracker.id}"))
     assert endpoint.cache.find_entry(create_tracker).name == old_name
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("query", "suffix"),
+    [
+        ("tgl export ~/exports/history.jsonl", "history.jsonl"),
+        ("tgl export ~/exports .csv", "_trackers.csv"),
+        ("tgl export ~/exports", "_trackers.csv"),
+        ("tgl export ~/exports ics", "trackers.ics"),
+        ("tgl export ~/exports/work.ics", "work.ics"),
+    ],
+)
+def test_export_target(dummy_ext, query_parser, query, suffix):
+    cmd = ExportCommand(dummy_ext)
+    target = cmd.target(query_parser.parse(query))
+    assert target.parent == Path.home() / "exports"
+    assert target.name.endswith(suffix)
+
+
+@pytest.fixture
+def stale_export(dummy_ext, monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    (tmp_path / "exports").mkdir()
+    cmd = ExportCommand(dummy_ext)
+    start = datetime.now(timezone.utc) - timedelta(days=10)
+    endpoint = TrackerEndpoint(
+        dummy_ext.workspace_id,
+        dummy_ext.auth,
+        ShardedCache(cmd.cache_path),
+    )
+    endpoint.cache.save_cache(
+        [
+            TogglTracker(
+                1,
+                "Stale",
+                workspace=dummy_ext.workspace_id,
+                start=start,
+                stop=start + timedelta(hours=1),
+                duration=timedelta(hours=1),
+                timestamp=start + timedelta(hours=1),
+            ),
+        ],
+        RequestMethod.GET,
+    )
+    return cmd
+
+
+@pytest.mark.unit
+def test_export_stale_trackers(stale_export, query_parser, tmp_path):
+    assert stale_export.handle(query_parser.parse("tgl export ~/exports/history.csv"))
+
+    with (tmp_path / "exports" / "history.csv").open(newline="") as file:
+        assert [row["id"] for row in csv.DictReader(file)] == ["1"]
+
+
+@pytest.mark.unit
+def test_export_stale_feed(stale_export, query_parser, tmp_path):
+    assert stale_export.handle(query_parser.parse("tgl export ~/exports/work.ics"))
+    assert "SUMMARY:Stale" in (tmp_path / "exports" / "work.ics").read_text()
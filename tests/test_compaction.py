@@ -0,0 +1,160 @@
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from toggl_api import TogglTracker
+from toggl_api.meta.cache.json_cache import CustomEncoder
+
+from ulauncher_toggl_extension.compaction import Compactor, RetentionPolicy, compact
+from ulauncher_toggl_extension.shards import TrackerShards
+
+
+def stored(tracker: TogglTracker) -> dict:
+    entry = json.loads(json.dumps(tracker, cls=CustomEncoder))
+    # NOTE: Dates the cache entry to the tracker so retention has an age to go by.
+    entry["timestamp"] = entry["start"]
+    return entry
+
+
+@pytest.fixture
+def cache_dir(tmp_path, make_tracker):
+    minute = timedelta(minutes=1)
+    data = [
+        stored(make_tracker(1, timedelta(days=1), duration=minute)),
+        stored(make_tracker(2, timedelta(days=60), duration=minute)),
+        stored(make_tracker(3, timedelta(days=90), duration=None)),
+        stored(make_tracker(4, timedelta(days=2), duration=minute)),
+        stored(make_tracker(4, timedelta(days=3), duration=minute)),
+    ]
+    (tmp_path / "cache_tracker.json").write_text(
+        json.dumps({"version": "1.5.1", "data": data}, indent=2),
+    )
+    (tmp_path / "cache_project.json").write_text(
+        json.dumps(
+            {
+                "version": "1.5.1",
+                "data": [
+                    {
+                        "class": "project",
+                        "id": 1,
+                        "color": "#ffffff",
+                        "timestamp": (
+                            datetime.now(timezone.utc) - timedelta(weeks=40)
+                        ).isoformat(),
+                    },
+                ],
+            },
+        ),
+    )
+    (tmp_path / "svg").mkdir()
+    (tmp_path / "svg/#ffffff.svg").write_text("<svg/>")
+    (tmp_path / "svg/#000000.svg").write_text("<svg/>")
+    (tmp_path / "cache_client.snapshot").write_bytes(b"TGLSNAP")
+    return tmp_path
+
+
+@pytest.mark.unit
+def test_compact_retention(cache_dir):
+    size = (cache_dir / "cache_tracker.json").stat().st_size
+
+    report = compact(cache_dir, RetentionPolicy(timedelta(days=30)))
+
+    data = json.loads((cache_dir / "cache_tracker.json").read_text())["data"]
+    assert sorted(t["id"] for t in data) == [1, 3, 4]
+    assert report.records == 2  # noqa: PLR2004
+    assert report.size >= size - (cache_dir / "cache_tracker.json").stat().st_size
+
+    projects = json.loads((cache_dir / "cache_project.json").read_text())["data"]
+    assert [p["id"] for p in projects] == [1]
+    assert (cache_dir / "svg/#ffffff.svg").exists()
+    assert not (cache_dir / "svg/#000000.svg").exists()
+    assert not (cache_dir / "cache_client.snapshot").exists()
+
+    assert compact(cache_dir, RetentionPolicy(timedelta(days=30))).files == 0
+
+
+@pytest.mark.unit
+def test_compact_size(cache_dir):
+    report_dir = cache_dir / "report"
+    report_dir.mkdir()
+    (report_dir / "report.csv").write_bytes(b"0" * 4096)
+
+    report = compact(cache_dir, RetentionPolicy(None, 2048, orphans=False))
+
+    assert not (report_dir / "report.csv").exists()
+    assert report.size >= 4096  # noqa: PLR2004
+    assert not (cache_dir / "svg/#000000.svg").exists()
+    assert not (cache_dir / "cache_client.snapshot").exists()
+
+
+@pytest.mark.unit
+def test_compact_size_rebuilt_first(cache_dir):
+    report_dir = cache_dir / "report"
+    report_dir.mkdir()
+    (report_dir / "report.csv").write_bytes(b"0" * 1024)
+    (cache_dir / "cache_tracker.cold").write_bytes(b"0" * 8192)
+    total = sum(f.stat().st_size for f in cache_dir.rglob("*") if f.is_file())
+
+    policy = RetentionPolicy(None, total - 4096, orphans=False)
+    report = compact(cache_dir, policy)
+
+    assert not (cache_dir / "cache_tracker.cold").exists()
+    assert (report_dir / "report.csv").exists()
+    data = json.loads((cache_dir / "cache_tracker.json").read_text())["data"]
+    shards = TrackerShards(cache_dir / "cache_tracker.json")
+    archived = [t.id for shard in shards.select() for t in shards.load(shard)]
+    assert sorted([t["id"] for t in data] + archived) == [1, 2, 3, 4]
+    assert report.records == 1
+
+
+@pytest.mark.unit
+def test_compact_default_keeps_history(cache_dir):
+    report = compact(cache_dir, RetentionPolicy())
+
+    data = json.loads((cache_dir / "cache_tracker.json").read_text())["data"]
+    shards = TrackerShards(cache_dir / "cache_tracker.json")
+    archived = [t.id for shard in shards.select() for t in shards.load(shard)]
+    assert sorted([t["id"] for t in data] + archived) == [1, 2, 3, 4]
+    assert report.records == 1
+
+
+@pytest.mark.unit
+def test_compact_namespaces(cache_dir, make_tracker):
+    namespace = cache_dir / "workspaces" / "2"
+    namespace.mkdir(parents=True)
+    (namespace / "cache_tracker.json").write_text(
+        json.dumps(
+            {
+                "version": "1.5.1",
+                "data": [
+                    stored(make_tracker(5, timedelta(days=60))),
+                    stored(make_tracker(6, timedelta(1))),
+                ],
+            },
+        ),
+    )
+    (namespace / "cache_tag.journal").write_bytes(b"")
+
+    report = compact(cache_dir, RetentionPolicy(timedelta(days=30)))
+
+    data = json.loads((namespace / "cache_tracker.json").read_text())["data"]
+    assert [t["id"] for t in data] == [6]
+    assert not (namespace / "cache_tag.journal").exists()
+    assert report.records == 3  # noqa: PLR2004
+
+
+@pytest.mark.unit
+def test_compactor_idle(tmp_path):
+    submitted = []
+    ext = SimpleNamespace(
+        cache_path=tmp_path,
+        jobs=SimpleNamespace(submit=submitted.append),
+    )
+    compactor = Compactor(ext, idle=timedelta(milliseconds=50))
+
+    for _ in range(5):
+        compactor.touch()
+
+    assert compactor._idle.wait(5)  # noqa: SLF001
+    assert submitted == [compactor.run]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+from toggl_api import ProjectEndpoint, TagEndpoint
+
+from ulauncher_toggl_extension.conditional import Validators, conditional_collect
+from ulauncher_toggl_extension.journal import JournalCache
+
+
+def project_json(i: int, wid: int, **kwargs) -> dict:
+    return {
+        "id": i,
+        "name": f"Project {i}",
+        "workspace_id": wid,
+        "active": True,
+        "color": "#0b83d9",
+        **kwargs,
+    }
+
+
+@pytest.fixture
+def projects(dummy_ext, tmp_path):
+    return ProjectEndpoint(
+        dummy_ext.workspace_id,
+        dummy_ext.auth,
+        JournalCache(tmp_path / "cache"),
+    )
+
+
+@pytest.mark.unit
+def test_conditional_not_modified(projects, httpx_mock, dummy_ext):
+    wid = dummy_ext.workspace_id
+    httpx_mock.add_response(
+        url=re.compile(r".*/projects$"),
+        json=[project_json(1, wid), project_json(2, wid)],
+        headers={"ETag": '"v1"'},
+    )
+    assert [p.id for p in conditional_collect(projects, since=True)] == [1, 2]
+
+    cache_file = projects.cache.cache_path
+    validators = Validators.load(cache_file)
+    assert validators.etag == '"v1"'
+    assert validators.count == 2  # noqa: PLR2004
+    stat = cache_file.stat()
+
+    httpx_mock.add_response(
+        url=re.compile(rf".*/projects\?since={validators.since}$"),
+        match_headers={"If-None-Match": '"v1"'},
+        status_code=304,
+    )
+    assert [p.id for p in conditional_collect(projects, since=True)] == [1, 2]
+    assert cache_file.stat().st_mtime_ns == stat.st_mtime_ns
+    assert Validators.load(cache_file).checked is not None
+
+
+@pytest.mark.unit
+def test_conditional_since(projects, httpx_mock, dummy_ext):
+    wid = dummy_ext.workspace_id
+    httpx_mock.add_response(
+        url=re.compile(r".*/projects$"),
+        json=[project_json(1, wid), project_json(2, wid)],
+    )
+    conditional_collect(projects, since=True)
+
+    httpx_mock.add_response(
+        url=re.compile(r".*/projects\?since=\d+$"),
+        json=[
+            project_json(1, wid, name="Renamed"),
+            project_json(2, wid, server_deleted_at="2024-09-02T10:00:00+00:00"),
+        ],
+    )
+    models = conditional_collect(projects, since=True)
+    assert [(p.id, p.name) for p in models] == [(1, "Renamed")]
+    assert Validators.load(projects.cache.cache_path).count == 1
+
+
+@pytest.mark.unit
+def test_conditional_since_rejected(projects, httpx_mock, dummy_ext):
+    wid = dummy_ext.workspace_id
+    httpx_mock.add_response(
+        url=re.compile(r".*/projects$"),
+        json=[project_json(1, wid)],
+    )
+    conditional_collect(projects, since=True)
+
+    httpx_mock.add_response(url=re.compile(r".*/projects\?since=\d+$"), status_code=400)
+    httpx_mock.add_response(
+        url=re.compile(r".*/projects$"),
+        json=[project_json(3, wid)],
+    )
+    assert [p.id for p in conditional_collect(projects, since=True)] == [3]
+
+
+@pytest.mark.unit
+def test_conditional_digest(dummy_ext, tmp_path, httpx_mock):
+    wid = dummy_ext.workspace_id
+    tags = TagEndpoint(wid, dummy_ext.auth, JournalCache(tmp_path / "cache"))
+    body = [{"id": 1, "name": "meeting", "workspace_id": wid}]
+    httpx_mock.add_response(url=re.compile(r".*/tags$"), json=body)
+    conditional_collect(tags)
+
+    cache_file = tags.cache.cache_path
+    stat = cache_file.stat()
+    httpx_mock.add_response(url=re.compile(r".*/tags$"), json=body)
+    assert [t.name for t in conditional_collect(tags)] == ["meeting"]
+    assert cache_file.stat().st_mtime_ns == stat.st_mtime_ns
+
+    body.append({"id": 2, "name": "code", "workspace_id": wid})
+    httpx_mock.add_response(url=re.compile(r".*/tags$"), json=body)
+    assert [t.name for t in conditional_collect(tags)] == ["meeting", "code"]
+    assert {t.name for t in tags.load_cache()} == {"meeting", "code"}
@@ -91,6 +91,69 @@ def test_parse_datetime(get_tz):
         assert parse_datetime("wadfwadad")
 
 
+def _reference_parse_datetime(ts_text: str) -> datetime:
+    for fmt in DT_FORMATS:
+        try:
+            dt = datetime.strptime(ts_text, fmt)  # noqa: DTZ007
+        except ValueError:
+            continue
+
+        if dt.year == 1900:  # noqa: PLR2004
+            today = date.today()  # noqa: DTZ011
+            dt = dt.replace(year=today.year, month=today.month, day=today.day)
+        return localize_timezone(dt)
+
+    msg = "No format matched!"
+    raise ValueError(msg)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "text",
+    [
+        "14:30",
+        "7:5",
+        "07:05",
+        "23:59",
+        "24:00",
+        "12:60",
+        "007:00",
+        " 14:30",
+        "14:30:15",
+        "2:30 PM",
+        "02:30 pm",
+        "11:59:59 AM",
+        "12:00 am",
+        "13:00 PM",
+        "2:30PM",
+        "2024-06-01",
+        "2024-6-1",
+        "1900-01-05",
+        "2024-06-01T14:30",
+        "2024-06-01t14:30",
+        "2024-06-01T14:30:15",
+        "2024-06-01T02:30 PM",
+        "2024-06-01T02:30:15 PM",
+        "15T14:30",
+        "15T02:30 PM",
+        "32T14:30",
+        "2024-13-01",
+        "",
+        "wadfwadad",
+        "10",
+        "12:30:00:00",
+    ],
+)
+def test_parse_datetime_differential(text):
+    try:
+        expected = _reference_parse_datetime(text)
+    except ValueError:
+        with pytest.raises((ValueError,)):
+            parse_datetime(text)
+    else:
+        assert parse_datetime(text) == expected
+
+
 @pytest.mark.unit
 def test_parse_localize(get_tz):
     now = datetime.now(tz=timezone.utc)
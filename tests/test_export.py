@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import csv
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ulauncher_toggl_extension.export import (
+    TrackerFilter,
+    export_trackers,
+    stream_trackers,
+)
+from ulauncher_toggl_extension.shards import TrackerShards
+
+
+@pytest.fixture
+def history(tmp_path, make_tracker):
+    cache_file = tmp_path / "cache_tracker.json"
+    old = datetime(2023, 1, 10, tzinfo=timezone.utc)
+    TrackerShards(cache_file).write(
+        [
+            make_tracker(1, old, project=10, tags=("meeting",)),
+            make_tracker(2, old + timedelta(days=40)),
+            make_tracker(3, old + timedelta(days=70), project=10),
+        ],
+    )
+    recent = datetime.now(timezone.utc) - timedelta(days=1)
+    hot = [
+        make_tracker(4, recent, tags=("meeting",)),
+        make_tracker(3, recent - timedelta(days=2), project=10),
+    ]
+    return cache_file, hot
+
+
+@pytest.mark.unit
+def test_stream_trackers(history):
+    cache_file, hot = history
+    trackers = list(stream_trackers(cache_file, hot))
+    assert [t.id for t in trackers] == [1, 2, 3, 4]
+    assert trackers[2].start == hot[1].start
+
+    since = datetime(2023, 2, 1, tzinfo=timezone.utc).date()
+    assert [t.id for t in stream_trackers(cache_file, hot, since=since)] == [2, 3, 4]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("select", "ids"),
+    [
+        (TrackerFilter(), [1, 2, 3, 4]),
+        (TrackerFilter(project=10), [1, 3]),
+        (TrackerFilter(include=frozenset(("meeting",))), [1, 4]),
+        (TrackerFilter(exclude=frozenset(("meeting",))), [2, 3]),
+        (
+            TrackerFilter(
+                start=datetime(2023, 2, 1, tzinfo=timezone.utc),
+                stop=datetime(2023, 3, 1, tzinfo=timezone.utc),
+            ),
+            [2],
+        ),
+    ],
+)
+def test_export_jsonl(history, tmp_path, select, ids):
+    cache_file, hot = history
+    path = tmp_path / "export" / "history.jsonl"
+    count = export_trackers(
+        path,
+        stream_trackers(cache_file, hot),
+        {10: "Extension"},
+        select,
+    )
+    assert count == len(ids)
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["id"] for r in records] == ids
+    assert all(r["duration"] == 3600 for r in records)  # noqa: PLR2004
+    assert all(r["project"] == ("Extension" if r["id"] % 2 else None) for r in records)
+
+
+@pytest.mark.unit
+def test_export_csv(history, tmp_path):
+    cache_file, hot = history
+    path = tmp_path / "history.csv"
+    assert export_trackers(path, stream_trackers(cache_file, hot), {}) == 4  # noqa: PLR2004
+
+    with path.open(newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["id"] for row in rows] == ["1", "2", "3", "4"]
+    assert rows[0]["tags"] == "meeting"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.unit
+def test_export_parquet(history, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    cache_file, hot = history
+    path = tmp_path / "history.parquet"
+    export_trackers(path, stream_trackers(cache_file, hot), {})
+    assert pq.read_table(path).column("id").to_pylist() == [1, 2, 3, 4]
+
+
+@pytest.mark.unit
+def test_export_unsupported(history, tmp_path):
+    cache_file, hot = history
+    with pytest.raises(ValueError, match="xml"):
+        export_trackers(tmp_path / "history.xml", stream_trackers(cache_file, hot), {})
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from functools import partial
+
+import pytest
+
+pytest.importorskip("ulauncher")
+
+from ulauncher_toggl_extension.commands import (  # noqa: E402
+    HelpCommand,
+    ListCommand,
+    StartCommand,
+)
+from ulauncher_toggl_extension.commands.bulk import (  # noqa: E402
+    BulkCommand,
+    BulkDeleteCommand,
+)
+from ulauncher_toggl_extension.commands.tracker import (  # noqa: E402
+    ExportCommand,
+    ImportCommand,
+)
+from ulauncher_toggl_extension.extension import (  # noqa: E402
+    KeywordQueryEventListener,
+    TogglExtension,
+)
+from ulauncher_toggl_extension.render import (  # noqa: E402
+    PreviewRenderer,
+    ResultCache,
+)
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+
+    def submit(self, func, *args):
+        self.calls.append((func, *args))
+
+
+@pytest.fixture
+def extension(monkeypatch):
+    ext = TogglExtension.__new__(TogglExtension)
+    ext.actions = Recorder()
+    ext.jobs = Recorder()
+    invalidated: list[bool] = []
+    monkeypatch.setattr(ext, "invalidate", lambda: invalidated.append(True))
+    monkeypatch.setattr(
+        "ulauncher_toggl_extension.extension.show_notification",
+        lambda *_, **__: None,
+    )
+    ext.invalidated = invalidated
+    return ext
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("action", "expected"),
+    [
+        (partial(StartCommand.call_pickle, method="handle"), True),
+        (partial(StartCommand.call_pickle, "handle"), True),
+        (partial(ImportCommand.call_pickle, method="handle"), True),
+        (partial(StartCommand.call_pickle, method="view"), False),
+        (partial(ListCommand.call_pickle, method="handle"), False),
+        (lambda **_: None, False),
+    ],
+)
+def test_runs_in_background(action, expected):
+    assert TogglExtension.runs_in_background(action) is expected
+
+
+@pytest.mark.unit
+def test_submit_action(extension):
+    start = partial(StartCommand.call_pickle, method="handle")
+    bulk = partial(BulkDeleteCommand.call_pickle, method="handle")
+    view = partial(ListCommand.call_pickle, method="view")
+
+    assert extension.submit_action(bulk)
+    assert extension.submit_action(start)
+    assert not extension.submit_action(view)
+
+    assert extension.actions.calls == [(extension.run_action, start)]
+    assert extension.jobs.calls == [(extension.run_action, bulk)]
+
+
+@pytest.mark.unit
+def test_run_action(extension):
+    calls = []
+
+    def record(extension):
+        calls.append(extension)
+
+    extension.run_action(record)
+    assert calls == [extension]
+
+    def fail(**_):
+        msg = "Broken"
+        raise ValueError(msg)
+
+    extension.run_action(fail)
+    assert extension.invalidated == [True, True]
+
+
+@pytest.mark.unit
+def test_warm(extension, monkeypatch):
+    extension.prefix = "tgl"
+    extension.report_format = "csv"
+    extension.result_cache = ResultCache()
+    rendered = []
+
+    def process(query):
+        rendered.append(query.command)
+        return []
+
+    monkeypatch.setattr(extension, "_process_query", process)
+
+    extension.warm("ls")
+    extension.warm("list")
+
+    key = extension.cache_key(extension.parse_query("tgl list"))
+    assert extension.result_cache.get(key) == []
+    assert rendered == ["ls"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("name", [HelpCommand.PREFIX, *HelpCommand.ALIASES])
+def test_parse_help_subcommand(extension, query_parser, name):
+    extension.prefix = "tgl"
+    extension.report_format = "csv"
+    raw = f"tgl {name} project list :5"
+
+    assert name in KeywordQueryEventListener.SUBCOMMANDS
+    assert extension.parse_query(raw) == query_parser.parse(raw)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("command", "expected"),
+    [("bul", BulkCommand), ("exp", ExportCommand), ("imp", ImportCommand)],
+)
+def test_match_results_routed(extension, query_parser, monkeypatch, command, expected):
+    matched = []
+
+    def tasks(_query, commands):
+        matched.extend(commands)
+        return []
+
+    monkeypatch.setattr(extension, "preview_tasks", tasks)
+    extension.previews = PreviewRenderer()
+    extension.match_results(query_parser.parse(f"tgl {command}"))
+
+    assert matched[0] is expected
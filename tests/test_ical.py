@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from ulauncher_toggl_extension.export import TrackerFilter
+from ulauncher_toggl_extension.ical import (
+    LINE_LENGTH,
+    CalendarFeed,
+    event,
+    month_frames,
+)
+from ulauncher_toggl_extension.shards import TrackerShards
+
+
+@pytest.fixture
+def history(tmp_path, make_tracker):
+    cache_file = tmp_path / "cache_tracker.json"
+    TrackerShards(cache_file).write(
+        [
+            make_tracker(1, datetime(2023, 1, 10, tzinfo=timezone.utc), project=10),
+            make_tracker(2, datetime(2023, 2, 10, tzinfo=timezone.utc)),
+        ],
+    )
+    hot = [make_tracker(3, datetime(2023, 3, 10, tzinfo=timezone.utc), project=10)]
+    frames = list(month_frames(date(2023, 1, 5), date(2023, 3, 20)))
+    return cache_file, hot, frames
+
+
+@pytest.mark.unit
+def test_month_frames():
+    frames = list(month_frames(date(2023, 11, 20), date(2024, 2, 1)))
+    assert [f.start.date() for f in frames] == [
+        date(2023, 11, 1),
+        date(2023, 12, 1),
+        date(2024, 1, 1),
+        date(2024, 2, 1),
+    ]
+
+
+@pytest.mark.unit
+def test_event(make_tracker):
+    start = datetime(2023, 1, 10, 9, tzinfo=timezone.utc)
+    tracker = make_tracker(
+        1,
+        start,
+        name="Review, fix; ship " * 10,
+        project=10,
+        tags=("meeting",),
+    )
+    text = event(tracker, {10: "Work"})
+    lines = text.split("\r\n")
+    assert text.endswith("END:VEVENT\r\n")
+    assert "DTSTART:20230110T090000Z" in lines
+    assert "DESCRIPTION:Work" in lines
+    assert "CATEGORIES:meeting" in lines
+    assert all(len(line.encode()) <= LINE_LENGTH for line in lines)
+    assert r"Review\, fix\; ship" in text.replace("\r\n ", "")
+
+
+@pytest.mark.unit
+def test_calendar_feed(history, tmp_path, make_tracker):
+    cache_file, hot, frames = history
+    feed = CalendarFeed(tmp_path / "feed" / "trackers.ics")
+    assert feed.update(cache_file, hot, frames, {10: "Work"}) == len(frames)
+
+    text = feed.path.read_bytes().decode()
+    assert text.startswith("BEGIN:VCALENDAR\r\n")
+    assert text.endswith("END:VCALENDAR\r\n")
+    assert [line for line in text.splitlines() if line.startswith("UID")] == [
+        f"UID:{i}@track.toggl.com" for i in (1, 2, 3)
+    ]
+
+    assert feed.update(cache_file, hot, frames, {10: "Work"}) == 0
+
+    edited = make_tracker(3, hot[0].start, name="Edited", project=10)
+    edited.timestamp += timedelta(minutes=5)
+    assert feed.update(cache_file, [edited], frames, {10: "Work"}) == 1
+    assert "SUMMARY:Edited" in feed.path.read_bytes().decode()
+
+    shard = TrackerShards(cache_file).shard(date(2023, 1, 1))
+    os.utime(shard, ns=(0, 0))
+    assert feed.update(cache_file, [edited], frames, {10: "Work"}) == 1
+
+
+@pytest.mark.unit
+def test_calendar_feed_options(history, tmp_path):
+    cache_file, hot, frames = history
+    feed = CalendarFeed(tmp_path / "trackers.ics")
+    feed.update(cache_file, hot, frames, {})
+
+    select = TrackerFilter(project=10)
+    rebuilt = feed.update(cache_file, hot, frames[:2], {}, select=select, options="1")
+    assert rebuilt == 2  # noqa: PLR2004
+    assert sorted(p.stem for p in feed.segments.glob("*.ics")) == [
+        "2023-01",
+        "2023-02",
+    ]
+    assert "UID:1@" in feed.path.read_bytes().decode()
+    assert "UID:2@" not in feed.path.read_bytes().decode()
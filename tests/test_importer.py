@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import re
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from toggl_api import ProjectEndpoint, TagEndpoint, TrackerEndpoint
+
+from ulauncher_toggl_extension.importer import (
+    ImportCheckpoint,
+    Importer,
+    parse_row,
+    read_rows,
+)
+from ulauncher_toggl_extension.journal import JournalCache
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_text(
+        "Description,Project,Start date,Start time,End date,End time,Tags\n"
+        "Standup,Work,2024-09-02,09:00:00,2024-09-02,09:15:00,meeting\n"
+        "\n"
+        "Broken,,,,,,\n"
+        'Review,Work,2024-09-02,10:00:00,2024-09-02,11:00:00,"code, meeting"\n',
+        encoding="utf-8",
+    )
+    return path
+
+
+@pytest.fixture
+def importer(dummy_ext, csv_file, tmp_path):
+    cache = tmp_path / "cache"
+    wid = dummy_ext.workspace_id
+    return Importer(
+        TrackerEndpoint(wid, dummy_ext.auth, JournalCache(cache)),
+        ProjectEndpoint(wid, dummy_ext.auth, JournalCache(cache)),
+        TagEndpoint(wid, dummy_ext.auth, JournalCache(cache)),
+        ImportCheckpoint.from_cache(cache, csv_file),
+    )
+
+
+def tracker_json(i: int, wid: int) -> dict:
+    return {
+        "id": i,
+        "description": "Imported",
+        "workspace_id": wid,
+        "start": "2024-09-02T09:00:00+00:00",
+        "stop": "2024-09-02T10:00:00+00:00",
+        "duration": 3600,
+        "tags": [],
+        "tag_ids": [],
+        "at": "2024-09-02T10:00:00+00:00",
+    }
+
+
+@pytest.mark.unit
+def test_read_rows(csv_file):
+    rows = list(read_rows(csv_file))
+    assert [line for line, _ in rows] == [1, 2, 3]
+    assert rows[0][1]["description"] == "Standup"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("row", "stop", "tags"),
+    [
+        (
+            {"start": "2024-09-02T09:00:00+00:00", "duration": "01:30:00"},
+            datetime(2024, 9, 2, 10, 30, tzinfo=timezone.utc),
+            (),
+        ),
+        (
+            {
+                "start": "2024-09-02T09:00:00+00:00",
+                "stop": "2024-09-02T09:10:00+00:00",
+                "tags": "a, b",
+            },
+            datetime(2024, 9, 2, 9, 10, tzinfo=timezone.utc),
+            ("a", "b"),
+        ),
+        (
+            {"start": "2024-09-02T09:00:00+00:00", "duration": "600"},
+            datetime(2024, 9, 2, 9, 10, tzinfo=timezone.utc),
+            (),
+        ),
+    ],
+)
+def test_parse_row(row, stop, tags):
+    parsed = parse_row(1, {"description": "Tracker", **row})
+    assert parsed.stop == stop
+    assert parsed.tags == tags
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "row",
+    [
+        {"start": "2024-09-02T09:00:00+00:00", "duration": "1h"},
+        {"description": "Tracker", "start": "2024-09-02T09:00:00+00:00"},
+        {
+            "description": "Tracker",
+            "start": "2024-09-02T09:00:00+00:00",
+            "stop": "2024-09-02T08:00:00+00:00",
+        },
+    ],
+)
+def test_parse_row_invalid(row):
+    with pytest.raises(ValueError, match="Row 1"):
+        parse_row(1, row)
+
+
+@pytest.mark.unit
+def test_import_checkpoint(tmp_path, csv_file):
+    state = ImportCheckpoint.from_cache(tmp_path, csv_file)
+    state.mark([1, 3])
+    assert state.offset == 1
+    assert state.done(3)
+    assert not state.done(2)
+    state.save()
+
+    state = ImportCheckpoint.from_cache(tmp_path, csv_file)
+    assert state.offset == 1
+    assert state.finished == {3}
+    state.clear()
+    assert not state.path.exists()
+
+
+@pytest.mark.unit
+def test_importer_resume(importer, csv_file, httpx_mock, monkeypatch, dummy_ext):
+    monkeypatch.setattr("ulauncher_toggl_extension.batch.INTERVAL", timedelta())
+    wid = dummy_ext.workspace_id
+    httpx_mock.add_response(
+        method="POST",
+        url=re.compile(r".*/projects$"),
+        json={
+            "id": 5,
+            "name": "Work",
+            "workspace_id": wid,
+            "active": True,
+            "color": "#0b83d9",
+        },
+    )
+    for i, name in enumerate(("meeting", "code"), start=1):
+        httpx_mock.add_response(
+            method="POST",
+            url=re.compile(r".*/tags$"),
+            match_json={"name": name},
+            json={"id": i, "name": name, "workspace_id": wid},
+        )
+
+    def create(request: httpx.Request) -> httpx.Response:
+        if json.loads(request.content)["description"] == "Review":
+            return httpx.Response(500)
+        return httpx.Response(200, json=tracker_json(1, wid))
+
+    for _ in range(2):
+        httpx_mock.add_callback(
+            create,
+            method="POST",
+            url=re.compile(r".*/time_entries$"),
+        )
+
+    result = importer.run(read_rows(csv_file))
+    assert (result.imported, result.invalid, result.failed) == (1, 1, 1)
+    assert importer.checkpoint.path.exists()
+    assert not importer.checkpoint.done(3)
+
+    httpx_mock.reset()
+    httpx_mock.add_response(
+        method="POST",
+        url=re.compile(r".*/time_entries$"),
+        json=tracker_json(2, wid),
+    )
+    result = importer.run(read_rows(csv_file))
+    assert (result.imported, result.invalid, result.failed) == (1, 0, 0)
+    assert not importer.checkpoint.path.exists()
+    assert sorted(t.id for t in importer.trackers.cache.load_cache()) == [1, 2]
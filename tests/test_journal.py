@@ -0,0 +1,155 @@
+from datetime import timedelta
+
+import pytest
+from toggl_api import TrackerEndpoint
+from toggl_api.meta import RequestMethod
+
+from ulauncher_toggl_extension.columns import ColumnStore
+from ulauncher_toggl_extension.journal import (
+    JournalCache,
+    JournalOp,
+    checkpoint,
+    journal_path,
+)
+
+
+def journal_cache(dummy_ext) -> JournalCache:
+    cache = JournalCache(dummy_ext.cache_path)
+    TrackerEndpoint(dummy_ext.workspace_id, dummy_ext.auth, cache)
+    return cache
+
+
+@pytest.fixture
+def cache(dummy_ext, make_tracker):
+    cache = journal_cache(dummy_ext)
+    cache.save_cache(
+        [
+            make_tracker(i, timedelta(hours=i + 1), workspace=dummy_ext.workspace_id)
+            for i in range(1, 4)
+        ],
+        RequestMethod.GET,
+    )
+    return cache
+
+
+@pytest.mark.unit
+def test_journal_append(cache, dummy_ext, make_tracker):
+    base = cache.cache_path.read_bytes()
+    journal = journal_path(cache.cache_path)
+    assert not journal.exists()
+
+    cache.save_cache(
+        make_tracker(4, timedelta(hours=5), workspace=dummy_ext.workspace_id),
+        RequestMethod.PUT,
+    )
+    cache.save_cache(
+        make_tracker(
+            2,
+            timedelta(hours=3),
+            name="Edited",
+            workspace=dummy_ext.workspace_id,
+        ),
+        RequestMethod.PATCH,
+    )
+    cache.delete_entries(cache.find_entry({"id": 1}))
+    cache.commit()
+
+    assert cache.cache_path.read_bytes() == base
+    assert journal.read_bytes().count(b"\n") == 3  # noqa: PLR2004
+
+    trackers = {t.id: t.name for t in journal_cache(dummy_ext).load_cache()}
+    assert trackers == {2: "Edited", 3: "Tracker 3", 4: "Tracker 4"}
+
+    columns = ColumnStore().get(cache.cache_path, full=True)
+    assert sorted(t.id for t in columns.select()) == [2, 3, 4]
+
+    assert checkpoint(cache.cache_path)
+    assert not journal.exists()
+    assert cache.cache_path.read_bytes() != base
+    trackers = {t.id: t.name for t in journal_cache(dummy_ext).load_cache()}
+    assert trackers == {2: "Edited", 3: "Tracker 3", 4: "Tracker 4"}
+
+
+@pytest.mark.unit
+def test_journal_torn_write(cache, dummy_ext, make_tracker):
+    cache.save_cache(
+        make_tracker(4, timedelta(hours=5), workspace=dummy_ext.workspace_id),
+        RequestMethod.PUT,
+    )
+    journal = journal_path(cache.cache_path)
+    intact = journal.read_bytes()
+    with journal.open("ab") as file:
+        file.write(intact[: len(intact) // 2])
+
+    reader = journal_cache(dummy_ext)
+    assert sorted(t.id for t in reader.load_cache()) == [1, 2, 3, 4]
+
+    reader.save_cache(
+        make_tracker(5, timedelta(hours=6), workspace=dummy_ext.workspace_id),
+        RequestMethod.PUT,
+    )
+    assert journal.read_bytes().startswith(intact)
+    assert journal.read_bytes().count(b"\n") == 2  # noqa: PLR2004
+    assert sorted(t.id for t in journal_cache(dummy_ext).load_cache()) == [
+        1,
+        2,
+        3,
+        4,
+        5,
+    ]
+
+
+@pytest.mark.unit
+def test_journal_checkpoint_threshold(cache, dummy_ext, monkeypatch, make_tracker):
+    monkeypatch.setattr(JournalCache, "CHECKPOINT", 0)
+    size = cache.cache_path.stat().st_size
+    name = "x" * size
+
+    cache.save_cache(
+        make_tracker(
+            4,
+            timedelta(hours=5),
+            name=name,
+            workspace=dummy_ext.workspace_id,
+        ),
+        RequestMethod.PUT,
+    )
+    assert journal_path(cache.cache_path).exists()
+
+    cache.save_cache(
+        make_tracker(5, timedelta(hours=6), workspace=dummy_ext.workspace_id),
+        RequestMethod.PUT,
+    )
+    assert not journal_path(cache.cache_path).exists()
+    assert len(journal_cache(dummy_ext).load_cache()) == 5  # noqa: PLR2004
+
+
+@pytest.mark.unit
+def test_journal_concurrent_writers(cache, dummy_ext, make_tracker):
+    other = journal_cache(dummy_ext)
+    other.load_cache()
+
+    # NOTE: Appends right after another writer, before refreshing.
+    cache.save_cache(
+        make_tracker(4, timedelta(hours=5), workspace=dummy_ext.workspace_id),
+        RequestMethod.PUT,
+    )
+    other.session.append(
+        other.cache_path,
+        [
+            (
+                JournalOp.PUT,
+                make_tracker(5, timedelta(hours=6), workspace=dummy_ext.workspace_id),
+            ),
+        ],
+    )
+
+    assert journal_path(cache.cache_path).read_bytes().count(b"\n") == 2  # noqa: PLR2004
+    assert sorted(t.id for t in other.session.data) == [1, 2, 3, 4, 5]
+    assert sorted(t.id for t in journal_cache(dummy_ext).load_cache()) == [
+        1,
+        2,
+        3,
+        4,
+        5,
+    ]
@@ -0,0 +1,115 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+from ulauncher_toggl_extension.prefetch import Prefetcher, QueryHistory
+from ulauncher_toggl_extension.render import ResultCache
+from ulauncher_toggl_extension.worker import checkpoint
+
+
+@pytest.mark.unit
+def test_query_history_predict(tmp_path):
+    history = QueryHistory.from_cache(tmp_path)
+    assert history.predict("") == []
+
+    history.record("", "list")
+    history.record("", "list")
+    history.record("", "continue")
+    history.record("", "project")
+
+    assert history.predict("", 2) == ["list", "continue"]
+    assert history.predict("list") == []
+
+
+@pytest.mark.unit
+def test_query_history_persistence(tmp_path):
+    history = QueryHistory.from_cache(tmp_path)
+    history.record("project", "project list")
+    history.save()
+
+    assert (tmp_path / QueryHistory.FILE_NAME).exists()
+
+    loaded = QueryHistory.from_cache(tmp_path)
+    assert loaded.predict("project") == ["project list"]
+
+
+class Extension:
+    def __init__(self, cache_path, delays=None) -> None:
+        self.cache_path = cache_path
+        self.delays = delays or {}
+        self.result_cache = ResultCache()
+        self.warmed = []
+
+    def warm(self, view: str) -> None:
+        end = time.monotonic() + self.delays.get(view, 0)
+        while time.monotonic() < end:
+            checkpoint()
+            time.sleep(0.005)
+        self.result_cache.set(view, [view])
+        self.warmed.append(view)
+
+
+@pytest.mark.unit
+def test_prefetcher_warms_predictions(tmp_path):
+    extension = Extension(tmp_path)
+    prefetcher = Prefetcher(extension, settle=timedelta(0))
+    prefetcher.history.record("", "list")
+
+    prefetcher.visit("")
+    assert prefetcher.join(5)
+    assert extension.result_cache.get("list") == ["list"]
+
+
+@pytest.mark.unit
+def test_prefetcher_budget(tmp_path):
+    extension = Extension(tmp_path, {"slow": 5})
+    prefetcher = Prefetcher(extension, timedelta(milliseconds=50), settle=timedelta(0))
+    for view in ("slow", "slow", "list"):
+        prefetcher.history.record("", view)
+
+    start = time.monotonic()
+    prefetcher.visit("")
+    assert prefetcher.join(5)
+    assert time.monotonic() - start < 1
+    assert extension.warmed == []
+    assert extension.result_cache.get("slow") is None
+
+    prefetcher.visit("")
+    assert prefetcher.join(5)
+    assert extension.warmed == ["list"]
+
+
+@pytest.mark.unit
+def test_prefetcher_saves_history(tmp_path):
+    prefetcher = Prefetcher(
+        Extension(tmp_path),
+        settle=timedelta(0),
+        save_delay=timedelta(0),
+    )
+    prefetcher.visit("")
+    assert prefetcher.join(5)
+    prefetcher.visit("project")
+    assert prefetcher.join(5)
+
+    assert QueryHistory.from_cache(tmp_path).predict("") == ["project"]
+
+
+@pytest.mark.unit
+def test_prefetcher_settled_views(tmp_path):
+    extension = Extension(tmp_path)
+    prefetcher = Prefetcher(
+        extension,
+        settle=timedelta(milliseconds=200),
+        save_delay=timedelta(milliseconds=200),
+    )
+    prefetcher.visit("")
+    assert prefetcher.join(5)
+
+    for view in ("project", None, "project list"):
+        prefetcher.visit(view)
+    assert prefetcher.join(5)
+
+    assert prefetcher.history.predict("") == ["project list"]
+    assert prefetcher.history.predict("project") == []
+    assert QueryHistory.from_cache(tmp_path).predict("") == ["project list"]
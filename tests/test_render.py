@@ -0,0 +1,114 @@
+from datetime import timedelta
+from threading import Event
+
+import pytest
+
+from ulauncher_toggl_extension.render import PreviewRenderer, PreviewTask, ResultCache
+
+
+@pytest.mark.unit
+def test_result_cache():
+    cache: ResultCache[list[str]] = ResultCache()
+
+    assert cache.get("tgl list") is None
+    assert cache.set("tgl list", ["tracker"])
+    assert cache.get("tgl list") == ["tracker"]
+
+    cache.invalidate()
+    assert cache.get("tgl list") is None
+
+
+@pytest.mark.unit
+def test_result_cache_stale_generation():
+    cache: ResultCache[list[str]] = ResultCache()
+
+    generation = cache.generation
+    cache.invalidate()
+
+    assert not cache.set("tgl list", ["tracker"], generation)
+    assert "tgl list" not in cache
+
+
+@pytest.mark.unit
+def test_result_cache_expiration():
+    cache: ResultCache[list[str]] = ResultCache(timedelta(microseconds=1))
+    cache.set("tgl list", ["tracker"])
+
+    assert cache.get("tgl list") is None
+
+
+@pytest.mark.unit
+def test_result_cache_max_size():
+    cache: ResultCache[int] = ResultCache(max_size=2)
+    for i in range(3):
+        cache.set(str(i), i)
+
+    assert len(cache) == 2  # noqa: PLR2004
+    assert cache.get("0") is None
+    assert cache.get("2") == 2  # noqa: PLR2004
+
+
+@pytest.mark.unit
+def test_preview_renderer_deadline():
+    renderer: PreviewRenderer[str] = PreviewRenderer(timedelta(milliseconds=10))
+    release = Event()
+
+    def slow():
+        release.wait(5)
+        return ["current"]
+
+    tasks = [
+        PreviewTask("current", slow, ["loading"], deferred=True),
+        PreviewTask("start", lambda: ["start"]),
+    ]
+
+    assert renderer.render(tasks) == ["loading", "start"]
+
+    release.set()
+    renderer._inflight["current"].result(5)  # noqa: SLF001
+    assert renderer.render(tasks) == ["current", "start"]
+
+    renderer.invalidate()
+    assert "current" not in renderer.ready
+
+
+@pytest.mark.unit
+def test_preview_renderer_expired():
+    renderer: PreviewRenderer[str] = PreviewRenderer(timedelta(milliseconds=10))
+    renderer.ready.expiration = timedelta(microseconds=1)
+    release = Event()
+    calls = []
+
+    def slow():
+        release.wait(5)
+        calls.append(len(calls))
+        return [f"current {len(calls)}"]
+
+    tasks = [PreviewTask("current", slow, ["loading"], deferred=True)]
+    assert renderer.render(tasks) == ["loading"]
+
+    future = renderer._inflight["current"]  # noqa: SLF001
+    release.set()
+    future.result(5)
+    release.clear()
+    assert renderer.render(tasks) == ["current 1"]
+
+    future = renderer._inflight["current"]  # noqa: SLF001
+    release.set()
+    future.result(5)
+    assert renderer.render(tasks) == ["current 2"]
+
+
+@pytest.mark.unit
+def test_preview_renderer_limit():
+    renderer: PreviewRenderer[str] = PreviewRenderer()
+    called = []
+
+    def preview(name: str):
+        called.append(name)
+        return [name]
+
+    tasks = [PreviewTask(n, lambda n=n: preview(n)) for n in ("a", "b", "c")]
+
+    assert renderer.render(tasks, limit=2) == ["a", "b"]
+    assert called == ["a", "b"]
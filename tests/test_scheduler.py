@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from threading import Thread
+
+import httpx
+import pytest
+
+from ulauncher_toggl_extension.batch import run_batches
+from ulauncher_toggl_extension.scheduler import (
+    Priority,
+    RequestScheduler,
+    ScheduledAuth,
+    current_priority,
+    priority,
+    retry_after,
+)
+
+
+@pytest.mark.unit
+def test_priority():
+    assert current_priority() is Priority.QUERY
+    with priority(Priority.INTERACTIVE):
+        assert current_priority() is Priority.INTERACTIVE
+        with priority(Priority.SYNC):
+            assert current_priority() is Priority.SYNC
+        assert current_priority() is Priority.INTERACTIVE
+    assert current_priority() is Priority.QUERY
+
+    result = run_batches([1], lambda _: current_priority())
+    assert result.done == [(1, Priority.BACKGROUND)]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("headers", "delay"),
+    [
+        ({}, 5.0),
+        ({"Retry-After": "12"}, 12.0),
+        ({"Retry-After": "soon"}, 5.0),
+        (
+            {
+                "Retry-After": format_datetime(
+                    datetime.now(timezone.utc) - timedelta(minutes=1),
+                    usegmt=True,
+                ),
+            },
+            0.0,
+        ),
+    ],
+)
+def test_retry_after(headers, delay):
+    response = httpx.Response(429, headers=headers)
+    assert retry_after(response, timedelta(seconds=5)) == delay
+
+
+@pytest.mark.unit
+def test_scheduler_reserve():
+    scheduler = RequestScheduler(rate=5, burst=2, reserve=1)
+    scheduler.acquire(Priority.BACKGROUND)
+
+    started = time.monotonic()
+    scheduler.acquire(Priority.INTERACTIVE)
+    assert time.monotonic() - started < 0.1  # noqa: PLR2004
+
+    started = time.monotonic()
+    scheduler.acquire(Priority.BACKGROUND)
+    assert time.monotonic() - started >= 0.3  # noqa: PLR2004
+
+
+@pytest.mark.unit
+def test_scheduler_order():
+    scheduler = RequestScheduler(rate=10, burst=1, reserve=0)
+    scheduler.throttled(0.2)
+    order: list[Priority] = []
+
+    def acquire(level: Priority) -> None:
+        scheduler.acquire(level)
+        order.append(level)
+
+    threads = [
+        Thread(target=acquire, args=(level,))
+        for level in (Priority.BACKGROUND, Priority.SYNC, Priority.INTERACTIVE)
+    ]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+
+    assert order == [Priority.INTERACTIVE, Priority.SYNC, Priority.BACKGROUND]
+
+
+@pytest.mark.unit
+def test_scheduled_auth_throttled(httpx_mock):
+    url = "https://api.track.toggl.com/api/v9/me"
+    httpx_mock.add_response(url=url, status_code=429, headers={"Retry-After": "0"})
+    httpx_mock.add_response(url=url, json={"id": 1})
+
+    scheduler = RequestScheduler(rate=100, burst=4)
+    auth = ScheduledAuth(httpx.BasicAuth("token", "api_token"), scheduler)
+    with httpx.Client(auth=auth) as client:
+        response = client.get(url)
+
+    assert response.json() == {"id": 1}
+    requests = httpx_mock.get_requests()
+    assert len(requests) == 2  # noqa: PLR2004
+    assert all(r.headers["Authorization"].startswith("Basic ") for r in requests)
+
+
+@pytest.mark.unit
+def test_scheduled_auth_gives_up(httpx_mock):
+    url = "https://api.track.toggl.com/api/v9/me"
+    httpx_mock.add_response(url=url, status_code=429, headers={"Retry-After": "3600"})
+
+    scheduler = RequestScheduler(rate=100, burst=4)
+    auth = ScheduledAuth(httpx.BasicAuth("token", "api_token"), scheduler)
+    with httpx.Client(auth=auth) as client:
+        assert client.get(url).status_code == 429  # noqa: PLR2004
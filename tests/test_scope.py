@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+import pytest
+from toggl_api import TogglTag
+
+from ulauncher_toggl_extension.commands import TagCommand
+from ulauncher_toggl_extension.scope import (
+    RenderScope,
+    SingleFlight,
+    bind,
+    current_scope,
+    fetch,
+)
+from ulauncher_toggl_extension.worker import QueryCancelledError
+
+
+@pytest.mark.unit
+def test_single_flight():
+    flights = SingleFlight()
+    calls: list[int] = []
+
+    def call() -> int:
+        calls.append(1)
+        time.sleep(0.1)
+        return len(calls)
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: flights.do("key", call), range(4)))
+
+    assert results == [1, 1, 1, 1]
+    assert flights.do("key", call) == 2  # noqa: PLR2004
+
+
+@pytest.mark.unit
+def test_single_flight_cancelled():
+    flights = SingleFlight()
+    started = Event()
+
+    def cancelled() -> str:
+        started.set()
+        time.sleep(0.1)
+        raise QueryCancelledError
+
+    with ThreadPoolExecutor(1) as pool:
+        owner = pool.submit(flights.do, "key", cancelled)
+        started.wait()
+        assert flights.do("key", lambda: "rerun") == "rerun"
+        with pytest.raises(QueryCancelledError):
+            owner.result()
+
+
+@pytest.mark.unit
+def test_render_scope():
+    calls: list[str] = []
+
+    def call(key: str) -> str:
+        calls.append(key)
+        return key.upper()
+
+    with RenderScope() as scope:
+        assert current_scope() is scope
+        assert fetch("a", lambda: call("a")) == "A"
+        assert fetch("a", lambda: call("a")) == "A"
+        with ThreadPoolExecutor(1) as pool:
+            assert pool.submit(bind(fetch), "a", lambda: call("a")).result() == "A"
+            assert pool.submit(current_scope).result() is None
+        assert fetch("b", lambda: call("b")) == "B"
+
+    assert current_scope() is None
+    assert calls == ["a", "b"]
+
+    fetch("a", lambda: call("a"))
+    assert calls == ["a", "b", "a"]
+
+
+@pytest.mark.unit
+def test_collect_all(dummy_ext, query_parser, monkeypatch):
+    calls: list[bool] = []
+
+    def collect(_self, workspace, *, refresh):
+        calls.append(refresh)
+        return [TogglTag(1, "Tag", workspace=workspace.id)]
+
+    monkeypatch.setattr(TagCommand, "collect", collect)
+    cmd = TagCommand(dummy_ext)
+    with RenderScope():
+        for raw in ("tgl tag list", "tgl tag list", "tgl tag list refresh"):
+            tags = cmd.get_models(query_parser.parse(raw))
+            assert [t.name for t in tags] == ["Tag"]
+
+    assert calls == [False, True]
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from toggl_api import TrackerEndpoint
+from toggl_api.meta import RequestMethod
+
+from ulauncher_toggl_extension.columns import ColumnStore
+from ulauncher_toggl_extension.shards import ShardedCache, TrackerShards, archive
+
+
+def sharded_cache(dummy_ext) -> ShardedCache:
+    cache = ShardedCache(dummy_ext.cache_path, window=timedelta(weeks=4))
+    TrackerEndpoint(dummy_ext.workspace_id, dummy_ext.auth, cache)
+    return cache
+
+
+@pytest.fixture
+def cache(dummy_ext, make_tracker):
+    cache = sharded_cache(dummy_ext)
+    cache.save_cache(
+        [
+            make_tracker(1, timedelta(days=1), workspace=dummy_ext.workspace_id),
+            make_tracker(2, timedelta(days=100), workspace=dummy_ext.workspace_id),
+            make_tracker(3, timedelta(days=200), workspace=dummy_ext.workspace_id),
+        ],
+        RequestMethod.GET,
+    )
+    return cache
+
+
+@pytest.mark.unit
+def test_shards_checkpoint(cache, dummy_ext):
+    shards = TrackerShards(cache.cache_path)
+    assert len(shards.select()) == 2  # noqa: PLR2004
+    assert [t.id for t in sharded_cache(dummy_ext).load_cache()] == [1]
+
+    since = datetime.now(timezone.utc).date() - timedelta(days=150)
+    assert len(shards.select(since)) == 1
+    assert [t.id for t in shards.load(shards.select(since)[0])] == [2]
+
+    assert archive(cache.cache_path, timedelta(weeks=4)) == 0
+
+
+@pytest.mark.unit
+def test_shards_columns(cache, monkeypatch):
+    store = ColumnStore(timedelta(weeks=4))
+    now = datetime.now(timezone.utc)
+
+    read = []
+    original = TrackerShards.read
+
+    def track(shard):
+        read.append(shard)
+        return original(shard)
+
+    monkeypatch.setattr(TrackerShards, "read", staticmethod(track))
+
+    assert [t.id for t in store.get(cache.cache_path).select()] == [1]
+    recent = store.get(cache.cache_path, since=now - timedelta(days=7))
+    assert [t.id for t in recent.select()] == [1]
+    assert read == []
+
+    history = store.get(cache.cache_path, since=now - timedelta(days=150))
+    assert sorted(t.id for t in history.select()) == [1, 2]
+    assert len(read) == 1
+
+    history = store.get(cache.cache_path, full=True)
+    assert sorted(t.id for t in history.select()) == [1, 2, 3]
+
+
+@pytest.mark.unit
+def test_shards_edit_delete(cache, dummy_ext, make_tracker):
+    old = make_tracker(2, timedelta(days=100), workspace=dummy_ext.workspace_id)
+    old.name = "Edited"
+    cache.save_cache(old, RequestMethod.PATCH)
+
+    history = ColumnStore().get(cache.cache_path, full=True)
+    assert sorted((t.id, t.name) for t in history.select()) == [
+        (1, "Tracker 1"),
+        (2, "Edited"),
+        (3, "Tracker 3"),
+    ]
+
+    cache.delete_entries(
+        make_tracker(3, timedelta(days=200), workspace=dummy_ext.workspace_id),
+    )
+    cache.commit()
+    assert len(TrackerShards(cache.cache_path).select()) == 1
+
+    archive(cache.cache_path, timedelta(weeks=4))
+    shards = TrackerShards(cache.cache_path)
+    assert [t.name for t in shards.load(shards.select()[0])] == ["Edited"]
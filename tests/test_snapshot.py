@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from toggl_api import JSONCache, ProjectEndpoint, TogglProject
+from toggl_api.meta import RequestMethod
+
+from ulauncher_toggl_extension.snapshot import CacheSnapshot, SnapshotStore
+
+
+@pytest.fixture
+def project_cache(dummy_ext):
+    cache = JSONCache(dummy_ext.cache_path)
+    ProjectEndpoint(dummy_ext.workspace_id, dummy_ext.auth, cache)
+    cache.save_cache(
+        [
+            TogglProject(1, "Ulauncher", workspace=dummy_ext.workspace_id),
+            TogglProject(2, "Toggl", workspace=dummy_ext.workspace_id),
+        ],
+        RequestMethod.GET,
+    )
+    return cache
+
+
+@pytest.mark.unit
+def test_snapshot_find(project_cache):
+    snapshot = SnapshotStore().get(project_cache.cache_path)
+
+    assert snapshot is not None
+    assert snapshot.find(1).name == "Ulauncher"
+    assert snapshot.find("Toggl").id == 2  # noqa: PLR2004
+    assert snapshot.find("Missing") is None
+    assert snapshot.find(1, timedelta(microseconds=1)) is None
+
+
+@pytest.mark.unit
+def test_snapshot_warm_start(project_cache, monkeypatch):
+    SnapshotStore().get(project_cache.cache_path)
+
+    def rebuild(*_):
+        msg = "Snapshot should be loaded from disk."
+        raise AssertionError(msg)
+
+    monkeypatch.setattr(CacheSnapshot, "from_cache", rebuild)
+    snapshot = SnapshotStore().get(project_cache.cache_path)
+
+    assert snapshot is not None
+    assert snapshot.find(2).name == "Toggl"
+
+
+@pytest.mark.unit
+def test_snapshot_generation(project_cache, dummy_ext):
+    store = SnapshotStore()
+    assert store.get(project_cache.cache_path).find(3) is None
+
+    project_cache.save_cache(
+        TogglProject(3, "Snapshot", workspace=dummy_ext.workspace_id),
+        RequestMethod.PUT,
+    )
+
+    assert store.get(project_cache.cache_path).find(3).name == "Snapshot"
+
+
+@pytest.mark.unit
+def test_snapshot_derived(dummy_ext):
+    wid = dummy_ext.workspace_id
+    now = datetime.now(timezone.utc)
+    cache = JSONCache(dummy_ext.cache_path)
+    ProjectEndpoint(wid, dummy_ext.auth, cache)
+    cache.save_cache(
+        [
+            TogglProject(
+                1,
+                "Old",
+                workspace=wid,
+                client=7,
+                timestamp=now - timedelta(days=2),
+            ),
+            TogglProject(2, "New", workspace=wid, client=7, timestamp=now),
+            TogglProject(3, "Solo", workspace=wid, timestamp=now - timedelta(days=1)),
+        ],
+        RequestMethod.GET,
+    )
+    SnapshotStore().get(cache.cache_path)
+    snapshot = SnapshotStore().get(cache.cache_path)
+
+    assert snapshot is not None
+    assert [p.id for p in snapshot.recent()] == [2, 3, 1]
+    assert [p.id for p in snapshot.recent(timedelta(hours=36))] == [2, 3]
+    assert [p.id for p in snapshot.referencing("client", 7)] == [1, 2]
+    assert snapshot.referenced("client") == {7}
+    assert snapshot.referenced("tags") == set()
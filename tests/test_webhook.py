@@ -0,0 +1,99 @@
+import hashlib
+import hmac
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from toggl_api import TrackerEndpoint
+
+from ulauncher_toggl_extension.journal import JournalCache
+from ulauncher_toggl_extension.shards import ShardedCache
+from ulauncher_toggl_extension.webhook import WebhookReceiver
+
+
+@pytest.fixture
+def payload():
+    path = Path(__file__).parent / "data" / "webhook_time_entry.json"
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def receiver(dummy_ext):
+    receiver = WebhookReceiver(dummy_ext, secret="secret")  # noqa: S106
+    receiver.start()
+    yield receiver
+    receiver.stop()
+
+
+def post(receiver: WebhookReceiver, data: dict) -> httpx.Response:
+    body = json.dumps(data).encode()
+    digest = hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+    return httpx.post(
+        f"http://{receiver.HOST}:{receiver.port}",
+        content=body,
+        headers={receiver.SIGNATURE_HEADER: f"sha256={digest}"},
+    )
+
+
+def cached_trackers(dummy_ext):
+    cache = JournalCache(dummy_ext.cache_path)
+    TrackerEndpoint(dummy_ext.workspace_id, dummy_ext.auth, cache)
+    return cache.load_cache()
+
+
+@pytest.mark.unit
+def test_webhook_validation(receiver):
+    response = post(receiver, {"payload": "ping", "validation_code": "abc"})
+
+    assert response.status_code == httpx.codes.OK
+    assert response.json() == {"validation_code": "abc"}
+
+
+@pytest.mark.unit
+def test_webhook_signature(receiver, payload):
+    response = httpx.post(
+        f"http://{receiver.HOST}:{receiver.port}",
+        json=payload,
+        headers={receiver.SIGNATURE_HEADER: "sha256=invalid"},
+    )
+
+    assert response.status_code == httpx.codes.UNAUTHORIZED
+
+
+@pytest.mark.unit
+def test_webhook_apply(receiver, payload, dummy_ext):
+    assert post(receiver, payload).status_code == httpx.codes.OK
+
+    trackers = cached_trackers(dummy_ext)
+    assert [t.id for t in trackers] == [payload["payload"]["id"]]
+    assert trackers[0].name == payload["payload"]["description"]
+
+    payload["event_id"] += 1
+    payload["metadata"]["action"] = "deleted"
+    assert post(receiver, payload).status_code == httpx.codes.OK
+
+    assert cached_trackers(dummy_ext) == []
+
+
+@pytest.mark.unit
+def test_webhook_retry_failed(receiver, payload, dummy_ext, monkeypatch):
+    save_cache = ShardedCache.save_cache
+    calls = []
+
+    def flaky(self, *args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            msg = "Disk full"
+            raise OSError(msg)
+        return save_cache(self, *args, **kwargs)
+
+    monkeypatch.setattr(ShardedCache, "save_cache", flaky)
+
+    assert post(receiver, payload).status_code == httpx.codes.INTERNAL_SERVER_ERROR
+    assert post(receiver, payload).status_code == httpx.codes.OK
+    assert len(calls) == 2  # noqa: PLR2004
+    assert [t.id for t in cached_trackers(dummy_ext)] == [payload["payload"]["id"]]
+
+    assert post(receiver, payload).status_code == httpx.codes.OK
+    assert len(calls) == 2  # noqa: PLR2004
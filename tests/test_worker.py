@@ -0,0 +1,97 @@
+from datetime import timedelta
+from threading import Event
+
+import pytest
+
+from ulauncher_toggl_extension.worker import (
+    IdleTimer,
+    QueryCancelledError,
+    QueryWorker,
+    checkpoint,
+    time_limit,
+)
+
+
+@pytest.mark.unit
+def test_checkpoint_outside_worker():
+    checkpoint()
+
+
+@pytest.mark.unit
+def test_checkpoint_time_limit():
+    with time_limit(timedelta(hours=1)):
+        checkpoint()
+        with time_limit(timedelta()), pytest.raises(QueryCancelledError):
+            checkpoint()
+        checkpoint()
+    checkpoint()
+
+
+@pytest.mark.unit
+def test_query_worker_drops_stale():
+    started = Event()
+    release = Event()
+    done = Event()
+    cancelled = []
+    responses = []
+
+    def process(query: str):
+        if query == "tgl ls":
+            started.set()
+            release.wait(5)
+            try:
+                checkpoint()
+            except QueryCancelledError:
+                cancelled.append(query)
+                raise
+        return [query]
+
+    def respond(event: int, results: list):
+        responses.append((event, results))
+        done.set()
+
+    worker = QueryWorker(process, respond)
+    worker.submit(1, "tgl ls")
+    assert started.wait(5)
+
+    assert worker.submit(2, "tgl list") == 2  # noqa: PLR2004
+    release.set()
+
+    assert done.wait(5)
+    assert cancelled == ["tgl ls"]
+    assert responses == [(2, ["tgl list"])]
+
+
+@pytest.mark.unit
+def test_idle_timer_debounces():
+    calls = []
+    timer = IdleTimer(lambda: calls.append(True), timedelta(milliseconds=50))
+
+    for _ in range(20):
+        timer.touch()
+    assert timer.wait(5)
+    assert calls == [True]
+
+    timer.touch()
+    assert timer.wait(5)
+    assert calls == [True, True]
+
+
+@pytest.mark.unit
+def test_query_worker_responds_with_error():
+    responses = []
+    done = Event()
+
+    def process(query):
+        msg = f"Broken {query}"
+        raise ValueError(msg)
+
+    def respond(event, results):
+        responses.append((event, results))
+        done.set()
+
+    worker = QueryWorker(process, respond, lambda err: [str(err)])
+    worker.submit(1, "tgl ls")
+
+    assert done.wait(5)
+    assert responses == [(1, ["Broken tgl ls"])]
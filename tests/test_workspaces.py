@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from pathlib import Path
+from threading import Barrier
+
+import pytest
+
+from ulauncher_toggl_extension.workspaces import (
+    MAX_FETCHES,
+    Workspace,
+    fetch_all,
+    namespaces,
+)
+
+
+@pytest.mark.unit
+def test_namespaces():
+    root = Path("cache")
+    assert namespaces(root, (1, 2)) == [
+        Workspace(1, root),
+        Workspace(2, root / "workspaces" / "2"),
+    ]
+
+
+@pytest.mark.unit
+def test_fetch_all_parallel():
+    workspaces = namespaces(Path("cache"), range(1, MAX_FETCHES + 1))
+    barrier = Barrier(len(workspaces), timeout=5)
+
+    def fetch(workspace: Workspace) -> list[int]:
+        barrier.wait()
+        return [workspace.id, -workspace.id]
+
+    assert fetch_all(workspaces, fetch) == [
+        i for w in workspaces for i in (w.id, -w.id)
+    ]
+
+
+@pytest.mark.unit
+def test_fetch_all_error():
+    def fetch(workspace: Workspace) -> list[int]:
+        if workspace.id == 2:  # noqa: PLR2004
+            msg = "Workspace unavailable."
+            raise ValueError(msg)
+        return [workspace.id]
+
+    with pytest.raises(ValueError, match="unavailable"):
+        fetch_all(namespaces(Path("cache"), (1, 2)), fetch)
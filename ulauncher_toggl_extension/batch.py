@@ -0,0 +1,198 @@
+"""Chunked, concurrent and rate limited batches of API calls.
+
+Bulk operations would otherwise issue one request and one cache rewrite per
+model. Calls are instead run a few at a time on a bounded pool with every
+batch spaced out by an interval, while the cache is only committed once all
+of the batches finished.
+
+Classes:
+    BatchResult: Models a batch of calls succeeded and failed for.
+
+Functions:
+    run_batches: Runs a call for every item in rate limited batches.
+    patch_all: Edits models through chunked bulk PATCH requests.
+    delete_all: Deletes models concurrently.
+
+Attributes:
+    BATCH: Maximum amount of concurrent calls per batch.
+    CHUNK: Maximum amount of ids per bulk PATCH request.
+    INTERVAL: Minimum time between the start of two batches.
+
+Examples:
+    >>> endpoint = TagEndpoint(231231, BasicAuth(...), JournalCache(...))
+    >>> delete_all(endpoint, unused_tags)
+    [TogglTag(...), ...]
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Final, Generic, Optional, TypeVar, cast
+
+from httpx import HTTPStatusError, Response, codes
+from toggl_api.meta import RequestMethod
+from toggl_api.models import TogglClass
+
+from ulauncher_toggl_extension.scheduler import Priority, priority
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from toggl_api.meta.cached_endpoint import TogglCachedEndpoint
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+M = TypeVar("M", bound=TogglClass)
+
+BATCH: Final[int] = 4
+CHUNK: Final[int] = 100
+INTERVAL: Final[timedelta] = timedelta(seconds=1)
+
+_pool = ThreadPoolExecutor(BATCH, thread_name_prefix="toggl-batch")
+
+
+@dataclass
+class BatchResult(Generic[T]):
+    """Outcome of running a call over a set of items.
+
+    Attributes:
+        done: Items the call succeeded for with its return values.
+        failed: Items the call raised for with the error.
+    """
+
+    done: list[tuple[T, Any]] = field(default_factory=list)
+    failed: list[tuple[T, BaseException]] = field(default_factory=list)
+
+
+def _background(call: Callable[[T], Any], item: T) -> Any:
+    with priority(Priority.BACKGROUND):
+        return call(item)
+
+
+def run_batches(
+    items: Sequence[T],
+    call: Callable[[T], Any],
+    *,
+    size: Optional[int] = None,
+    interval: Optional[timedelta] = None,
+) -> BatchResult[T]:
+    """Runs a call for every item in concurrent, rate limited batches.
+
+    A failing call doesn't stop the remaining ones. Requests sent by the
+    calls are scheduled with background priority.
+
+    Args:
+        items: Items to call for.
+        call: Call to run for a single item.
+        size: Amount of concurrent calls per batch. Defaults to `BATCH`.
+        interval: Minimum time between the start of two batches. Defaults to
+            `INTERVAL`.
+
+    Returns:
+        BatchResult: Items that succeeded and failed in the original order.
+    """
+    size = size or BATCH
+    pause = (interval if interval is not None else INTERVAL).total_seconds()
+    result: BatchResult[T] = BatchResult()
+    for i in range(0, len(items), size):
+        started = time.monotonic()
+        batch = items[i : i + size]
+        futures = [_pool.submit(_background, call, item) for item in batch]
+        wait(futures)
+        for item, future in zip(batch, futures):
+            error = future.exception()
+            if error is None:
+                result.done.append((item, future.result()))
+            else:
+                log.warning("Batched call failed for %s: %s", item, error)
+                result.failed.append((item, error))
+
+        if i + size < len(items):
+            time.sleep(max(0.0, pause - (time.monotonic() - started)))
+
+    return result
+
+
+def patch_all(
+    endpoint: TogglCachedEndpoint[M],
+    models: Sequence[M],
+    body: list[dict[str, Any]],
+    apply: Callable[[M], None],
+    *,
+    chunk: Optional[int] = None,
+) -> list[M]:
+    """Edits models through bulk PATCH requests on comma separated ids.
+
+    The edits are applied locally to the models that succeeded, which are
+    then saved to the cache of the endpoint with a single write.
+
+    Args:
+        endpoint: Endpoint supporting bulk PATCH requests.
+        models: Models to edit.
+        body: JSON patch operations to send.
+        apply: Applies the same edit to a local model.
+        chunk: Maximum amount of ids per request. Defaults to `CHUNK`.
+
+    Returns:
+        list: Models that were edited.
+    """
+    chunk = chunk or CHUNK
+
+    def patch(ids: str) -> dict[str, Any]:
+        response = endpoint.request(
+            f"/{ids}",
+            body=body,
+            method=RequestMethod.PATCH,
+            refresh=True,
+            raw=True,
+        )
+        return cast(Response, response).json()
+
+    chunks = [
+        ",".join(str(m.id) for m in models[i : i + chunk])
+        for i in range(0, len(models), chunk)
+    ]
+    success: set[int] = set()
+    for _, response in run_batches(chunks, patch).done:
+        success.update(response.get("success") or ())
+        for failure in response.get("failure") or ():
+            log.warning("Failed to bulk edit a model: %s", failure)
+
+    edited = [m for m in models if m.id in success]
+    for model in edited:
+        apply(model)
+    if edited:
+        endpoint.cache.save_cache(edited, RequestMethod.PATCH)
+    return edited
+
+
+def delete_all(endpoint: TogglCachedEndpoint[M], models: Sequence[M]) -> list[M]:
+    """Deletes models concurrently and drops them from the cache at once.
+
+    Models that were already deleted remotely count as deleted.
+
+    Args:
+        endpoint: Endpoint the models belong to.
+        models: Models to delete.
+
+    Returns:
+        list: Models that were deleted.
+    """
+
+    def delete(model: M) -> None:
+        try:
+            endpoint.request(f"/{model.id}", method=RequestMethod.DELETE, refresh=True)
+        except HTTPStatusError as err:
+            if err.response.status_code != codes.NOT_FOUND:
+                raise
+
+    deleted = [model for model, _ in run_batches(models, delete).done]
+    if deleted:
+        endpoint.cache.delete_entries(deleted)
+        endpoint.cache.commit()
+    return deleted
@@ -0,0 +1,183 @@
+"""JSON codec with optional native backends.
+
+Uses `orjson` or `msgspec` if either is installed and falls back to the
+standard library otherwise. Cache records can be decoded with typed schemas,
+so timestamps are parsed by the backend instead of once per field in Python.
+
+Functions:
+    loads: Decodes JSON from bytes or text.
+    dumps: Encodes an object into compact JSON bytes.
+    decode_models: Decodes a cache file straight into models.
+    decode_trackers: Decodes a tracker cache file into flat records.
+
+Attributes:
+    BACKEND: Name of the backend in use.
+
+Examples:
+    >>> decode_trackers(Path("cache/cache_tracker.json").read_bytes())
+    [TrackerRecord(id=1, ...)]
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Final, NamedTuple, Optional
+
+from toggl_api.meta.cache.json_cache import CustomDecoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if TYPE_CHECKING:
+    from toggl_api.models import TogglClass
+
+log = logging.getLogger(__name__)
+
+
+BACKEND: Final[str] = (
+    "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json"
+)
+
+
+class TrackerRecord(NamedTuple):
+    """Flat tracker record with epochs instead of datetimes.
+
+    Missing epochs and durations are NaN.
+    """
+
+    id: int
+    name: str
+    workspace: int
+    start: float
+    stop: float
+    duration: Optional[float]
+    project: Optional[int]
+    tags: list[dict[str, Any]]
+    timestamp: float
+
+
+def _epoch(value: datetime | str | None) -> float:
+    if value is None:
+        return math.nan
+    if isinstance(value, str):
+        # NOTE: Python 3.10 doesn't parse the 'Z' suffix.
+        if value[-1] == "Z":
+            value = value[:-1] + "+00:00"
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def loads(data: bytes | str) -> Any:
+    """Decodes JSON.
+
+    Raises:
+        ValueError: If the data is not valid JSON regardless of the backend.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as err:
+            raise ValueError(str(err)) from err
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encodes plain JSON data compactly."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    if msgspec is not None:
+        return msgspec.json.encode(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def decode_models(data: bytes | str) -> list[TogglClass]:
+    """Decodes the records of a cache file into their model classes."""
+    models = []
+    for record in loads(data)["data"]:
+        cls = CustomDecoder.MATCH_DICT[record.pop("class")]
+        models.append(cls.from_kwargs(**record))
+    return models
+
+
+def _tracker_record(record: dict[str, Any]) -> TrackerRecord:
+    return TrackerRecord(
+        record["id"],
+        record.get("name", ""),
+        record.get("workspace") or 0,
+        _epoch(record.get("start")),
+        _epoch(record.get("stop")),
+        record.get("duration"),
+        record.get("project"),
+        record.get("tags") or [],
+        _epoch(record.get("timestamp")),
+    )
+
+
+def _msgspec_decoder() -> Callable[[bytes | str], list[TrackerRecord]] | None:
+    if msgspec is None:
+        return None
+
+    class _Tracker(msgspec.Struct):
+        id: int
+        name: str = ""
+        workspace: Optional[int] = None
+        start: Optional[datetime] = None
+        stop: Optional[datetime] = None
+        duration: Optional[float] = None
+        project: Optional[int] = None
+        tags: list[dict[str, Any]] = []
+        timestamp: Optional[datetime] = None
+
+    # NOTE: Built dynamically as local classes can't be named in annotations.
+    cache = msgspec.defstruct("_Cache", [("data", list[_Tracker])])
+    decoder = msgspec.json.Decoder(cache)
+
+    def decode(data: bytes | str) -> list[TrackerRecord]:
+        try:
+            trackers = decoder.decode(data).data
+        except msgspec.DecodeError as err:
+            raise ValueError(str(err)) from err
+        return [
+            TrackerRecord(
+                t.id,
+                t.name,
+                t.workspace or 0,
+                _epoch(t.start),
+                _epoch(t.stop),
+                t.duration,
+                t.project,
+                t.tags,
+                _epoch(t.timestamp),
+            )
+            for t in trackers
+        ]
+
+    return decode
+
+
+_typed_trackers = _msgspec_decoder()
+
+
+def decode_trackers(data: bytes | str) -> list[TrackerRecord]:
+    """Decodes a tracker cache file into flat records without building models.
+
+    With msgspec installed records are decoded against a typed schema with
+    timestamps parsed natively.
+    """
+    if _typed_trackers is not None:
+        return _typed_trackers(data)
+    return [_tracker_record(r) for r in loads(data)["data"]]
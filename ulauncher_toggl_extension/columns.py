@@ -0,0 +1,855 @@
+"""Columnar in-memory store for tracker history.
+
+Materializing every cached tracker as a full model, with nested tags and
+datetimes, dominates memory and CPU for large histories. The tracker cache is
+instead read into a struct of arrays: ids, epochs, project ids, interned
+names and tag bitsets. Filtering, sorting and distinct run over those arrays
+and models are only built for the rows that are actually accessed.
+
+Classes:
+    TrackerColumns: Struct of arrays holding the tracker history.
+    TrackerRows: Lazy sequence of trackers selected from the columns.
+    MappedRows: Lazy sequence of results built from selected trackers.
+    ColumnStore: Splits columns into a hot tier in memory and a cold tier
+        on disk.
+
+Attributes:
+    COLUMNS: Process wide column store.
+
+Examples:
+    >>> columns = COLUMNS.get(Path("cache/cache_tracker.json"))
+    >>> rows = columns.select(reverse=True)
+    >>> rows[0]
+    TogglTracker(...)
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import pickle  # noqa: S403
+import sys
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta, timezone
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Final, Optional, TypeVar, overload
+
+from toggl_api import TogglTag, TogglTracker
+from toggl_api.utility import parse_iso
+
+from ulauncher_toggl_extension.codec import (
+    TrackerRecord,
+    decode_models,
+    decode_trackers,
+)
+from ulauncher_toggl_extension.journal import (
+    JournalOp,
+    journal_path,
+    read_journal,
+    replay,
+)
+from ulauncher_toggl_extension.shards import TrackerShards
+from ulauncher_toggl_extension.snapshot import STAMP, cache_stamp
+from ulauncher_toggl_extension.utils import get_distance
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+_MISSING: Final[float] = math.nan
+
+
+def _epoch(value: datetime | str | None) -> float:
+    if value is None:
+        return _MISSING
+    if isinstance(value, str):
+        return parse_iso(value).timestamp()  # type: ignore[union-attr]
+    return value.timestamp()
+
+
+def _optional_datetime(epoch: float) -> datetime | None:
+    if math.isnan(epoch):
+        return None
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+def _file_stamp(path: Path) -> STAMP | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _date_epoch(value: date | datetime) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp()
+
+
+class TrackerColumns:
+    """Tracker history stored as a struct of arrays.
+
+    Every tracker occupies one row across the arrays. Missing datetimes and
+    durations are stored as NaN and a missing project as zero. Names are
+    interned into a shared table and tags are stored as bitsets over a table
+    of distinct tags.
+
+    Methods:
+        from_cache: Reads a JSON cache file directly into columns.
+        from_models: Converts already loaded trackers into columns.
+        append: Adds a single tracker row.
+        model: Builds the full tracker of a row.
+        find: Looks up a tracker by id or name.
+        last_used: Latest start of every project and tag.
+        select: Filters, sorts and deduplicates rows into a lazy sequence.
+
+    Attributes:
+        stamp: Generation stamp of the cache file the columns were read from.
+        ids: Tracker ids.
+        workspaces: Workspace ids.
+        names: Index of each tracker name in the strings table.
+        starts: Start epochs.
+        stops: Stop epochs. NaN while running.
+        durations: Durations in seconds. NaN if unknown.
+        projects: Project ids. Zero if the tracker has no project.
+        tag_masks: Bitset of the tags of each tracker.
+        timestamps: Epochs of when each tracker was last modified.
+        strings: Interned tracker names.
+        tags: Distinct tags indexed by their bit position.
+    """
+
+    __slots__ = (
+        "_bits",
+        "_interned",
+        "durations",
+        "ids",
+        "names",
+        "projects",
+        "stamp",
+        "starts",
+        "stops",
+        "strings",
+        "tag_masks",
+        "tags",
+        "timestamps",
+        "workspaces",
+    )
+
+    def __init__(self, stamp: Optional[STAMP] = None) -> None:
+        self.stamp = stamp
+        self.ids = array("q")
+        self.workspaces = array("q")
+        self.names = array("L")
+        self.starts = array("d")
+        self.stops = array("d")
+        self.durations = array("d")
+        self.projects = array("q")
+        self.tag_masks: list[int] = []
+        self.timestamps = array("d")
+        self.strings: list[str] = []
+        self.tags: list[TogglTag] = []
+        self._interned: dict[str, int] = {}
+        self._bits: dict[int, int] = {}
+
+    @classmethod
+    def from_cache(cls, path: Path, stamp: Optional[STAMP] = None) -> TrackerColumns:
+        """Reads a tracker cache file without decoding it into models.
+
+        Falls back to decoding models when the cache has journaled changes
+        that have to be replayed first.
+        """
+        return cls.read_cache(path, stamp)[0]
+
+    @classmethod
+    def read_cache(
+        cls,
+        path: Path,
+        stamp: Optional[STAMP] = None,
+    ) -> tuple[TrackerColumns, int]:
+        """Reads a tracker cache file and the journal offset replayed."""
+        entries, offset = read_journal(journal_path(path))
+        if entries:
+            models = replay(decode_models(path.read_bytes()), entries)
+            return cls.from_models(models, stamp), offset  # type: ignore[arg-type]
+
+        return cls.from_records(decode_trackers(path.read_bytes()), stamp), offset
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[TrackerRecord],
+        stamp: Optional[STAMP] = None,
+    ) -> TrackerColumns:
+        columns = cls(stamp)
+        for record in records:
+            columns.append(*record)
+        return columns
+
+    @classmethod
+    def from_models(
+        cls,
+        models: Iterable[TogglTracker],
+        stamp: Optional[STAMP] = None,
+    ) -> TrackerColumns:
+        columns = cls(stamp)
+        for model in models:
+            duration = model.duration
+            columns.append(
+                model.id,
+                model.name,
+                model.workspace,
+                model.start.timestamp(),
+                _epoch(model.stop),
+                duration.total_seconds() if isinstance(duration, timedelta) else None,
+                model.project,
+                model.tags,
+                model.timestamp.timestamp(),
+            )
+        return columns
+
+    def append(  # noqa: PLR0913, PLR0917
+        self,
+        tracker_id: int,
+        name: str,
+        workspace: int,
+        start: float,
+        stop: float,
+        duration: Optional[float],
+        project: Optional[int],
+        tags: Sequence[TogglTag | dict[str, Any]],
+        timestamp: float,
+    ) -> None:
+        self.ids.append(tracker_id)
+        self.workspaces.append(workspace or 0)
+        self.names.append(self._intern(name))
+        self.starts.append(start)
+        self.stops.append(stop)
+        self.durations.append(_MISSING if duration is None else float(duration))
+        self.projects.append(project or 0)
+        self.tag_masks.append(self._mask(tags))
+        self.timestamps.append(timestamp)
+
+    def _intern(self, name: str) -> int:
+        index = self._interned.get(name)
+        if index is None:
+            index = self._interned[name] = len(self.strings)
+            self.strings.append(name)
+        return index
+
+    def _mask(self, tags: Sequence[TogglTag | dict[str, Any]]) -> int:
+        mask = 0
+        for tag in tags:
+            tag_id = tag["id"]
+            bit = self._bits.get(tag_id)
+            if bit is None:
+                bit = self._bits[tag_id] = len(self.tags)
+                self.tags.append(
+                    tag
+                    if isinstance(tag, TogglTag)
+                    else TogglTag(tag_id, tag["name"], workspace=tag["workspace"]),
+                )
+            mask |= 1 << bit
+        return mask
+
+    def _tags(self, mask: int) -> list[TogglTag]:
+        return [tag for bit, tag in enumerate(self.tags) if mask >> bit & 1]
+
+    def take(self, rows: Iterable[int]) -> TrackerColumns:
+        """Copies a selection of rows into new columns with the same stamp."""
+        return self.merge((self, rows), stamp=self.stamp)
+
+    @classmethod
+    def merge(
+        cls,
+        *parts: tuple[TrackerColumns, Iterable[int]],
+        stamp: Optional[STAMP] = None,
+    ) -> TrackerColumns:
+        """Combines rows of multiple columns into new columns."""
+        columns = cls(stamp)
+        for part, rows in parts:
+            for r in rows:
+                duration = part.durations[r]
+                columns.append(
+                    part.ids[r],
+                    part.strings[part.names[r]],
+                    part.workspaces[r],
+                    part.starts[r],
+                    part.stops[r],
+                    None if math.isnan(duration) else duration,
+                    part.projects[r] or None,
+                    part._tags(part.tag_masks[r]),  # noqa: SLF001
+                    part.timestamps[r],
+                )
+        return columns
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory used by the columns."""
+        arrays = (
+            self.ids,
+            self.workspaces,
+            self.names,
+            self.starts,
+            self.stops,
+            self.durations,
+            self.projects,
+            self.timestamps,
+        )
+        size = sum(a.itemsize * len(a) for a in arrays)
+        size += sum(sys.getsizeof(mask) for mask in self.tag_masks)
+        size += sum(sys.getsizeof(name) for name in self.strings)
+        return size
+
+    def last_used(self) -> tuple[dict[int, float], dict[int, float]]:
+        """Latest start epoch of every project and tag without building models.
+
+        Returns:
+            tuple: Start epochs keyed by project id and by tag id.
+        """
+        projects: dict[int, float] = {}
+        masks: dict[int, float] = {}
+        for project, mask, start in zip(self.projects, self.tag_masks, self.starts):
+            if project and start > projects.get(project, -math.inf):
+                projects[project] = start
+            if mask and start > masks.get(mask, -math.inf):
+                masks[mask] = start
+
+        tags: dict[int, float] = {}
+        for mask, start in masks.items():
+            for tag in self._tags(mask):
+                if start > tags.get(tag.id, -math.inf):
+                    tags[tag.id] = start
+        return projects, tags
+
+    def model(self, row: int) -> TogglTracker:
+        """Builds the full tracker stored in a row."""
+        duration = self.durations[row]
+        return TogglTracker(
+            id=self.ids[row],
+            name=self.strings[self.names[row]],
+            workspace=self.workspaces[row],
+            start=datetime.fromtimestamp(self.starts[row], tz=timezone.utc),
+            duration=None if math.isnan(duration) else timedelta(seconds=duration),
+            stop=_optional_datetime(self.stops[row]),
+            project=self.projects[row] or None,
+            tags=self._tags(self.tag_masks[row]),
+            timestamp=datetime.fromtimestamp(self.timestamps[row], tz=timezone.utc),
+        )
+
+    def find(
+        self,
+        key: int | str,
+        expire_after: Optional[timedelta] = None,
+    ) -> TogglTracker | None:
+        """Looks up a tracker by id or name.
+
+        Args:
+            key: Integer id or name of the tracker.
+            expire_after: Treats trackers older than this as missing.
+
+        Returns:
+            TogglTracker | None: The tracker or None if its not present or
+                expired.
+        """
+        try:
+            if isinstance(key, int):
+                row = self.ids.index(key)
+            else:
+                row = self.names.index(self._interned[key])
+        except (KeyError, ValueError):
+            return None
+
+        if expire_after is not None and (
+            self.timestamps[row]
+            <= (datetime.now(timezone.utc) - expire_after).timestamp()
+        ):
+            return None
+        return self.model(row)
+
+    def select(  # noqa: PLR0913
+        self,
+        key: int | str | None = None,
+        *,
+        since: Optional[int | datetime] = None,
+        before: Optional[date] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        expire_after: Optional[timedelta] = None,
+        reverse: bool = False,
+        distinct: bool = False,
+    ) -> TrackerRows:
+        """Selects rows the same way the tracker cache is queried.
+
+        Args:
+            key: Id or name to sort by similarity to. Sorts by stop and start
+                time if not set.
+            since: Only keeps trackers modified after this timestamp.
+            before: Only keeps trackers started before this date.
+            start_date: Only keeps trackers started on or after this date.
+                Used together with end_date.
+            end_date: Only keeps trackers started on or before this date.
+            expire_after: Drops trackers that weren't modified in this period.
+            reverse: Whether to reverse the sort order.
+            distinct: Whether to drop trackers with a name, project and tags
+                that were all already seen.
+
+        Returns:
+            TrackerRows: Lazy sequence of the selected trackers.
+        """
+        rows = self._filter(since, before, start_date, end_date, expire_after)
+        rows.sort(key=self._sort_key(key), reverse=reverse)
+        if distinct:
+            rows = self._distinct(rows)
+        return TrackerRows(self, rows)
+
+    def _filter(
+        self,
+        since: Optional[int | datetime],
+        before: Optional[date],
+        start_date: Optional[date],
+        end_date: Optional[date],
+        expire_after: Optional[timedelta],
+    ) -> list[int]:
+        rows = range(len(self))
+        if expire_after is not None:
+            min_ts = (datetime.now(timezone.utc) - expire_after).timestamp()
+            rows = [r for r in rows if self.timestamps[r] > min_ts]  # type: ignore[assignment]
+
+        if since or before:
+            if since:
+                ts = since if isinstance(since, int) else since.timestamp()
+                rows = [r for r in rows if self.timestamps[r] > ts]  # type: ignore[assignment]
+            if before:
+                ts = _date_epoch(before)
+                rows = [r for r in rows if self.starts[r] < ts]  # type: ignore[assignment]
+        elif start_date and end_date:
+            low, high = _date_epoch(start_date), _date_epoch(end_date)
+            rows = [r for r in rows if low <= self.starts[r] <= high]  # type: ignore[assignment]
+
+        return list(rows)
+
+    def _sort_key(self, key: int | str | None) -> Callable[[int], Any]:
+        if isinstance(key, int):
+            ids = self.ids
+            return lambda r: get_distance(key, ids[r])
+        if isinstance(key, str):
+            # NOTE: Distances are computed once per distinct name.
+            distances = [get_distance(key, name) for name in self.strings]
+            names = self.names
+            return lambda r: distances[names[r]]
+
+        now = datetime.now(timezone.utc).timestamp()
+        starts, stops = self.starts, self.stops
+        return lambda r: (now if math.isnan(stops[r]) else stops[r], starts[r])
+
+    def _distinct(self, rows: list[int]) -> list[int]:
+        names: set[int] = set()
+        projects: set[int] = set()
+        masks: set[int] = set()
+
+        data = []
+        for r in rows:
+            name, project, mask = self.names[r], self.projects[r], self.tag_masks[r]
+            if name in names and project in projects and mask in masks:
+                continue
+            names.add(name)
+            projects.add(project)
+            masks.add(mask)
+            data.append(r)
+
+        return data
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class TrackerRows(Sequence[TogglTracker]):
+    """Lazy sequence of trackers selected from columns.
+
+    Trackers are only built when accessed, so slicing a page out of a large
+    selection only materializes that page.
+
+    Methods:
+        map: Lazily maps the trackers into results.
+    """
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns: TrackerColumns, rows: Iterable[int]) -> None:
+        self.columns = columns
+        self.rows = array("L", rows)
+
+    @overload
+    def __getitem__(self, index: int) -> TogglTracker: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[TogglTracker]: ...
+
+    def __getitem__(self, index: int | slice) -> TogglTracker | list[TogglTracker]:
+        if isinstance(index, slice):
+            return [self.columns.model(r) for r in self.rows[index]]
+        return self.columns.model(self.rows[index])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def map(self, func: Callable[[TogglTracker], R]) -> MappedRows[R]:
+        """Maps trackers lazily. The function needs to be picklable."""
+        return MappedRows(self, func)
+
+
+class MappedRows(Sequence[R]):
+    """Results of a function applied lazily to selected trackers."""
+
+    __slots__ = ("func", "trackers")
+
+    def __init__(
+        self,
+        trackers: TrackerRows,
+        func: Callable[[TogglTracker], R],
+    ) -> None:
+        self.trackers = trackers
+        self.func = func
+
+    @overload
+    def __getitem__(self, index: int) -> R: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[R]: ...
+
+    def __getitem__(self, index: int | slice) -> R | list[R]:
+        if isinstance(index, slice):
+            return [self.func(t) for t in self.trackers[index]]
+        return self.func(self.trackers[index])
+
+    def __len__(self) -> int:
+        return len(self.trackers)
+
+
+class _HotTier:
+    """Hot columns of a cache file and the state needed to keep them current.
+
+    Attributes:
+        columns: Trackers of the hot tier.
+        cutoff: Earliest start epoch the hot tier is complete from.
+        base: Stamp of the base cache file when the tiers were split. Also
+            identifies the cold tier written alongside.
+        offset: Journal offset folded into the hot tier so far.
+        removed: Ids deleted or edited through the journal since the split,
+            whose copies in the cold tier or shards are outdated.
+    """
+
+    __slots__ = ("base", "columns", "cutoff", "offset", "removed")
+
+    def __init__(
+        self,
+        columns: TrackerColumns,
+        cutoff: float,
+        base: STAMP,
+        offset: int,
+        removed: frozenset[int] = frozenset(),
+    ) -> None:
+        self.columns = columns
+        self.cutoff = cutoff
+        self.base = base
+        self.offset = offset
+        self.removed = removed
+
+
+class ColumnStore:
+    """Keeps tracker history in a bounded hot tier with a cold tier on disk.
+
+    Trackers that started within the hot window stay in memory as long as
+    they fit the memory budget. Older trackers of the cache file are moved to
+    a cold tier stored next to it, while closed months live in shards. The
+    cold tier and the shards overlapping the requested range are only loaded
+    for queries reaching past the hot window. Loaded history is kept in a LRU
+    bounded by the same budget, so memory use stays fixed no matter how much
+    history is cached.
+
+    Journaled changes are folded into the hot tier as they are appended, so
+    starting or stopping a tracker only reads the new journal entries. The
+    tiers are split again, rewriting the cold tier, once the cache file
+    itself is rewritten by a checkpoint, a refresh or compaction.
+
+    Methods:
+        configure: Changes the hot window and memory budget.
+        get: Retrieves columns matching the current state of a cache file.
+
+    Attributes:
+        window: How far back trackers are kept in the hot tier.
+        max_bytes: Memory budget of the hot tier and of the loaded history.
+    """
+
+    WINDOW: Final[timedelta] = timedelta(weeks=4)
+    MAX_BYTES: Final[int] = 16 * 1024 * 1024
+    MAGIC: Final[bytes] = b"TGLCOLD"
+    VERSION: Final[int] = 1
+    SUFFIX: Final[str] = ".cold"
+
+    __slots__ = ("_history", "_hot", "_lock", "max_bytes", "window")
+
+    def __init__(
+        self,
+        window: Optional[timedelta] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        self.window = window or self.WINDOW
+        self.max_bytes = max_bytes or self.MAX_BYTES
+        self._hot: dict[Path, _HotTier] = {}
+        self._history: OrderedDict[
+            tuple[Path, tuple[Path, ...]],
+            tuple[TrackerColumns, int, tuple[Optional[STAMP], ...]],
+        ] = OrderedDict()
+        self._lock = Lock()
+
+    def configure(
+        self,
+        window: Optional[timedelta] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        """Changes the tiering and drops everything loaded so far."""
+        with self._lock:
+            self.window = window or self.window
+            self.max_bytes = max_bytes or self.max_bytes
+            self._hot.clear()
+            self._history.clear()
+
+    def get(
+        self,
+        cache_file: Path,
+        *,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        full: bool = False,
+    ) -> TrackerColumns | None:
+        """Retrieves columns matching the current state of a cache file.
+
+        Args:
+            cache_file: JSON cache file holding the trackers.
+            since: Earliest start the caller needs. Loads the cold tier and
+                the shards from then on if it reaches past the hot window.
+            until: Latest start the caller needs. Newer shards are skipped.
+            full: Whether to always include the cold tier and all shards up
+                to `until`.
+
+        Returns:
+            TrackerColumns | None: Hot or complete columns or None if the
+                cache file is missing or can't be read.
+        """
+        stamp = cache_stamp(cache_file)
+        if stamp is None:
+            return None
+
+        with self._lock:
+            tier = self._hot.get(cache_file)
+            if tier is None or tier.columns.stamp != stamp:
+                tier = self._update(cache_file, stamp, tier)
+                if tier is None:
+                    return None
+
+            if not full and (since is None or _date_epoch(since) >= tier.cutoff):
+                return tier.columns
+
+            shards = TrackerShards(cache_file).select(None if full else since, until)
+            return self._load_history(cache_file, tier, shards)
+
+    def _update(
+        self,
+        cache_file: Path,
+        stamp: STAMP,
+        tier: Optional[_HotTier],
+    ) -> _HotTier | None:
+        if tier is not None and _file_stamp(cache_file) == tier.base:
+            folded = self._fold(cache_file, stamp, tier)
+            if folded is not None:
+                self._hot[cache_file] = folded
+                self._drop_history(cache_file)
+                return folded
+        return self._split(cache_file, stamp)
+
+    @staticmethod
+    def _fold(cache_file: Path, stamp: STAMP, tier: _HotTier) -> _HotTier | None:
+        journal = journal_path(cache_file)
+        try:
+            if journal.stat().st_size < tier.offset:
+                return None
+        except FileNotFoundError:
+            return None
+
+        try:
+            entries, offset = read_journal(journal, tier.offset)
+        except (OSError, ValueError, KeyError, TypeError):
+            log.exception("Failed to read the journal of %s.", cache_file)
+            return None
+
+        columns = tier.columns
+        rows = {tracker_id: r for r, tracker_id in enumerate(columns.ids)}
+        dropped: set[int] = set()
+        added: dict[int, TogglTracker] = {}
+        removed = set(tier.removed)
+        for op, value in entries:
+            tracker_id = value if op is JournalOp.DELETE else value.id
+            removed.add(tracker_id)
+            added.pop(tracker_id, None)
+            if tracker_id in rows:
+                dropped.add(rows[tracker_id])
+            if op is JournalOp.PUT:
+                added[tracker_id] = value
+
+        new = TrackerColumns.from_models(added.values())
+        hot = TrackerColumns.merge(
+            (columns, [r for r in range(len(columns)) if r not in dropped]),
+            (new, range(len(new))),
+            stamp=stamp,
+        )
+        log.debug("Folded %s journal entries of %s.", len(entries), cache_file)
+        return _HotTier(hot, tier.cutoff, tier.base, offset, frozenset(removed))
+
+    def _split(self, cache_file: Path, stamp: STAMP) -> _HotTier | None:
+        base = _file_stamp(cache_file)
+        if base is None:
+            return None
+
+        try:
+            columns, offset = TrackerColumns.read_cache(cache_file, stamp)
+        except (OSError, ValueError, KeyError, TypeError):
+            log.exception("Failed to read tracker columns of %s.", cache_file)
+            return None
+
+        cutoff = (datetime.now(timezone.utc) - self.window).timestamp()
+        starts, stops = columns.starts, columns.stops
+        recent = sorted(
+            (
+                r
+                for r in range(len(columns))
+                if starts[r] >= cutoff or math.isnan(stops[r])
+            ),
+            key=starts.__getitem__,
+            reverse=True,
+        )
+
+        # NOTE: Trims the oldest trackers of the window until it fits the budget.
+        limit = int(self.max_bytes * len(columns) / max(columns.nbytes, 1))
+        if len(recent) > limit:
+            cutoff = math.nextafter(starts[recent[limit]], math.inf)
+            recent = recent[:limit]
+
+        hot_rows = set(recent)
+        hot = columns.take(sorted(hot_rows))
+        cold = TrackerColumns.merge(
+            (columns, (r for r in range(len(columns)) if r not in hot_rows)),
+            stamp=base,
+        )
+        self._save_cold(cache_file.with_suffix(self.SUFFIX), cold)
+
+        tier = self._hot[cache_file] = _HotTier(hot, cutoff, base, offset)
+        self._drop_history(cache_file)
+        log.debug(
+            "Split %s trackers into %s hot and %s cold.",
+            len(columns),
+            len(hot),
+            len(cold),
+        )
+        return tier
+
+    def _drop_history(self, cache_file: Path) -> None:
+        for key in [k for k in self._history if k[0] == cache_file]:
+            del self._history[key]
+
+    def _load_history(
+        self,
+        cache_file: Path,
+        tier: _HotTier,
+        shards: list[Path],
+    ) -> TrackerColumns:
+        hot = tier.columns
+        key = cache_file, tuple(shards)
+        stamps = tuple(cache_stamp(shard) for shard in shards)
+        entry = self._history.get(key)
+        if entry is not None and entry[0].stamp == hot.stamp and entry[2] == stamps:
+            self._history.move_to_end(key)
+            return entry[0]
+
+        cold = self._load_cold(cache_file.with_suffix(self.SUFFIX), tier.base)
+        if cold is None:
+            log.warning("Cold tier of %s is outdated. Reading the cache.", cache_file)
+            base = TrackerColumns.from_cache(cache_file, hot.stamp)
+            parts: list[tuple[TrackerColumns, Iterable[int]]] = [
+                (base, range(len(base))),
+            ]
+        else:
+            # NOTE: Journaled changes are only folded into the hot tier.
+            hidden = set(hot.ids) | tier.removed
+            parts = [
+                (hot, range(len(hot))),
+                (cold, [r for r in range(len(cold)) if cold.ids[r] not in hidden]),
+            ]
+
+        # NOTE: Trackers edited after being sharded are also in the cache file,
+        # which takes precedence.
+        ids = {part.ids[r] for part, rows in parts for r in rows} | tier.removed
+        shard_store = TrackerShards(cache_file)
+        for shard in shards:
+            try:
+                columns = TrackerColumns.from_records(
+                    decode_trackers(shard_store.read(shard)),
+                )
+            except (OSError, ValueError, KeyError, TypeError):
+                log.exception("Failed to read tracker shard %s.", shard)
+                continue
+            parts.append(
+                (
+                    columns,
+                    [r for r in range(len(columns)) if columns.ids[r] not in ids],
+                ),
+            )
+
+        columns = TrackerColumns.merge(*parts, stamp=hot.stamp)
+        size = columns.nbytes
+        if size <= self.max_bytes:
+            self._history[key] = columns, size, stamps
+            while sum(n for _, n, _ in self._history.values()) > self.max_bytes:
+                self._history.popitem(last=False)
+
+        return columns
+
+    def _save_cold(self, path: Path, columns: TrackerColumns) -> None:
+        tmp = path.with_suffix(f"{self.SUFFIX}.tmp")
+        try:
+            with tmp.open("wb") as file:
+                file.write(self.MAGIC)
+                pickle.dump(
+                    (self.VERSION, columns.stamp, columns),
+                    file,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            tmp.replace(path)
+        except OSError:
+            log.exception("Failed to write the cold tier %s.", path)
+
+    def _load_cold(self, path: Path, stamp: Optional[STAMP]) -> TrackerColumns | None:
+        try:
+            with path.open("rb") as file:
+                if file.read(len(self.MAGIC)) != self.MAGIC:
+                    return None
+                version, cold_stamp, columns = pickle.load(file)  # noqa: S301
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            log.exception("Failed to load the cold tier %s.", path)
+            return None
+
+        if version != self.VERSION or cold_stamp != stamp:
+            return None
+        return columns
+
+
+COLUMNS: Final[ColumnStore] = ColumnStore()
@@ -9,11 +9,17 @@ Utility Dataclasses:
     - QueryParameters
     - ActionEnum
 
+Routing:
+    - RoutingTable
+    - routing_table: Generated once all commands below are imported.
+
 Classes:
     - CurrentTrackerCommand
     - ContinueCommand
     - StartCommand
     - AddCommand
+    - ImportCommand
+    - ExportCommand
     - DeleteCommand
     - EditCommand
     - StopCommand
@@ -25,6 +31,8 @@ Classes:
         - AddProjectCommand
         - EditProjectCommand
         - DeleteProjectCommand
+        - ArchiveProjectCommand
+        - UnarchiveProjectCommand
         - RefreshProjectCommand
         - Search Projects (Not implemented yet)
     - ClientCommand
@@ -32,6 +40,7 @@ Classes:
         - AddClientCommand
         - EditClientCommand
         - DeleteClientCommand
+        - PruneClientCommand
         - RefreshClientCommand
         - Search Clients (Not implemented yet)
     - TagCommand:
@@ -39,25 +48,51 @@ Classes:
         - AddTagCommand
         - EditTagCommand
         - DeleteTagCommand
+        - PruneTagCommand
         - SearchTags (Not implemented yet)
+    - BulkCommand:
+        - BulkEditCommand
+        - BulkTagCommand
+        - BulkDeleteCommand
     - ReportCommand:
         - DailyReportCommand
         - WeeklyReportCommand
         - MonthlyReportCommand
 """
 
-from .client import AddClientCommand, ClientCommand, DeleteClientCommand
+from .bulk import BulkCommand, BulkDeleteCommand, BulkEditCommand, BulkTagCommand
+from .client import (
+    AddClientCommand,
+    ClientCommand,
+    DeleteClientCommand,
+    PruneClientCommand,
+)
 from .help import HelpCommand
-from .meta import ActionEnum, Command, QueryResults
-from .project import AddProjectCommand, DeleteProjectCommand, ProjectCommand
+from .meta import (
+    ActionEnum,
+    Command,
+    PreviewCost,
+    QueryResults,
+    RoutingTable,
+    routing_table,
+)
+from .project import (
+    AddProjectCommand,
+    ArchiveProjectCommand,
+    DeleteProjectCommand,
+    ProjectCommand,
+    UnarchiveProjectCommand,
+)
 from .report import ReportCommand
-from .tag import AddTagCommand, DeleteTagCommand, TagCommand
+from .tag import AddTagCommand, DeleteTagCommand, PruneTagCommand, TagCommand
 from .tracker import (
     AddCommand,
     ContinueCommand,
     CurrentTrackerCommand,
     DeleteCommand,
     EditCommand,
+    ExportCommand,
+    ImportCommand,
     ListCommand,
     RefreshCommand,
     StartCommand,
@@ -70,6 +105,11 @@ __all__ = (
     "AddCommand",
     "AddProjectCommand",
     "AddTagCommand",
+    "ArchiveProjectCommand",
+    "BulkCommand",
+    "BulkDeleteCommand",
+    "BulkEditCommand",
+    "BulkTagCommand",
     "ClientCommand",
     "Command",
     "ContinueCommand",
@@ -79,13 +119,24 @@ __all__ = (
     "DeleteProjectCommand",
     "DeleteTagCommand",
     "EditCommand",
+    "ExportCommand",
     "HelpCommand",
+    "ImportCommand",
     "ListCommand",
+    "PreviewCost",
     "ProjectCommand",
+    "PruneClientCommand",
+    "PruneTagCommand",
     "QueryResults",
     "RefreshCommand",
     "ReportCommand",
+    "RoutingTable",
     "StartCommand",
     "StopCommand",
     "TagCommand",
+    "UnarchiveProjectCommand",
+    "routing_table",
 )
+
+# NOTE: Generates the routing table once every command has been defined.
+routing_table()
@@ -0,0 +1,433 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from functools import partial
+from typing import TYPE_CHECKING, Any, Final, Optional
+
+from httpx import HTTPStatusError
+from toggl_api import TagEndpoint, TogglTag, TogglTracker, TrackerEndpoint
+
+from ulauncher_toggl_extension.batch import delete_all, patch_all
+from ulauncher_toggl_extension.columns import TrackerColumns
+from ulauncher_toggl_extension.images import DELETE_IMG, EDIT_IMG, TAG_IMG
+from ulauncher_toggl_extension.query import QueryParser
+from ulauncher_toggl_extension.scheduler import Priority
+from ulauncher_toggl_extension.worker import checkpoint
+
+from .meta import ACTION_TYPE, ActionEnum, QueryResults, SubCommand, routing_table
+from .project import ProjectCommand
+from .tag import TagCommand
+from .tracker import CurrentTrackerCommand, ListCommand
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Sequence
+
+    from toggl_api import TogglProject
+
+    from ulauncher_toggl_extension.query import Query
+
+log = logging.getLogger(__name__)
+
+
+EPOCH: Final[datetime] = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class BulkCommand(SubCommand[TogglTracker]):
+    """Change many trackers at once."""
+
+    PREFIX = "bulk"
+    ALIASES = ("batch", "many")
+    ICON = EDIT_IMG
+
+    SEPARATOR: Final[str] = "->"
+
+    def split(self, query: Query) -> tuple[Query, Optional[Query]]:
+        """Splits a query into filters and the changes after the separator.
+
+        Returns:
+            tuple: Query selecting the trackers and the query holding the
+                changes if there is a separator.
+        """
+        args = query.raw_args
+        if self.SEPARATOR not in args:
+            return query, None
+
+        i = args.index(self.SEPARATOR)
+        parser = QueryParser(self.prefix, query.report_format, routing_table().parents)
+        return (
+            parser.parse(" ".join(args[:i])),
+            parser.parse(" ".join([*args[:3], *args[i + 1 :]])),
+        )
+
+    def filtered(self, query: Query) -> bool:
+        """Checks whether a query narrows down the trackers at all.
+
+        Bulk changes need at least one filter, so they never reach every
+        tracker of the hot window by accident.
+        """
+        query, _ = self.split(query)
+        return bool(
+            query.start
+            or query.stop
+            or query.project is not None
+            or query.name
+            or query.add_tags
+            or query.rm_tags,
+        )
+
+    def select(
+        self,
+        query: Query,
+        ids: Optional[Collection[int]] = None,
+    ) -> list[TogglTracker]:
+        """Selects the trackers matching the filters of a query.
+
+        Trackers are filtered by the start date range, project, tags and a
+        case insensitive match of the description. Tags prefixed with '-'
+        exclude trackers instead. Without a start date only trackers within
+        the hot window are considered.
+
+        Args:
+            query: Query holding the filters.
+            ids: Only selects these trackers of the date range instead of
+                filtering them.
+        """
+        query, _ = self.split(query)
+
+        project: Optional[TogglProject] = None
+        if query.project is not None:
+            project = ProjectCommand(self).get_model(query.project)
+            if project is None:
+                return []
+
+        cmd = ListCommand(self)
+        columns = cmd.columns(query.start, query.stop, full=query.start is not None)
+        if columns is None:
+            columns = TrackerColumns.from_models(cmd.collect(query))
+
+        rows = columns.select(
+            start_date=query.start or EPOCH,
+            end_date=query.stop or datetime.now(timezone.utc),
+        )
+        if ids is not None:
+            ids = set(ids)
+            return [tracker for tracker in rows if tracker.id in ids]
+
+        name = query.name.lower() if isinstance(query.name, str) else None
+        include, exclude = set(query.add_tags), set(query.rm_tags)
+        trackers = []
+        for tracker in rows:
+            checkpoint()
+            if project is not None and tracker.project != project.id:
+                continue
+            if name is not None and name not in tracker.name.lower():
+                continue
+            tags = {tag.name for tag in tracker.tags}
+            if not include <= tags or exclude & tags:
+                continue
+            trackers.append(tracker)
+
+        return trackers
+
+    def get_models(self, query: Query, **kwargs: Any) -> list[TogglTracker]:
+        del kwargs
+        return self.select(query)
+
+    def targets(
+        self,
+        query: Query,
+        ids: Optional[Collection[int]] = None,
+    ) -> list[TogglTracker]:
+        """Trackers a bulk change applies to.
+
+        Only the previewed trackers if their ids are given, so trackers that
+        started matching since the preview are left alone. Queries without
+        any filter target nothing.
+        """
+        if not self.filtered(query):
+            return []
+        return self.select(query, ids)
+
+    def get_model(self, model: TogglTracker | int | str | None) -> TogglTracker | None:
+        return ListCommand(self).get_model(model)
+
+    def endpoint(self, workspace_id: Optional[int] = None) -> TrackerEndpoint:
+        return TrackerEndpoint(
+            workspace_id or self.workspace_id,
+            self.auth,
+            ListCommand(self).cache,
+        )
+
+    def batches(
+        self,
+        trackers: Sequence[TogglTracker],
+    ) -> list[tuple[TrackerEndpoint, list[TogglTracker]]]:
+        """Groups trackers with the endpoint of the workspace they belong to.
+
+        Bulk requests only reach the trackers of a single workspace, so each
+        workspace gets its own requests.
+        """
+        groups: dict[int, list[TogglTracker]] = {}
+        for tracker in trackers:
+            groups.setdefault(tracker.workspace or self.workspace_id, []).append(
+                tracker,
+            )
+        return [(self.endpoint(wid), group) for wid, group in groups.items()]
+
+    def resolve_tags(self, names: Sequence[str]) -> list[TogglTag]:
+        """Finds tags by name, creating the ones that don't exist yet."""
+        cmd = TagCommand(self)
+        tags = []
+        for name in names:
+            tag = cmd.get_model(name)
+            if tag is None:
+                endpoint = TagEndpoint(self.workspace_id, self.auth, cmd.cache)
+                tag = endpoint.add(name)
+            tags.append(tag)
+        return tags
+
+    @staticmethod
+    def tag_body(
+        add: Sequence[TogglTag],
+        remove: Sequence[str],
+    ) -> list[dict[str, Any]]:
+        body: list[dict[str, Any]] = []
+        if add:
+            body.append({"op": "add", "path": "/tags", "value": [t.name for t in add]})
+        if remove:
+            body.append({"op": "remove", "path": "/tags", "value": list(remove)})
+        return body
+
+    @staticmethod
+    def apply_tags(
+        tracker: TogglTracker,
+        add: Sequence[TogglTag],
+        remove: Sequence[str],
+    ) -> None:
+        names = {tag.name for tag in tracker.tags}
+        tracker.tags = [
+            *(tag for tag in tracker.tags if tag.name not in remove),
+            *(tag for tag in add if tag.name not in names),
+        ]
+
+    def update_current(self, trackers: Sequence[TogglTracker]) -> None:
+        """Keeps the persisted running tracker in line with edited ones."""
+        cmd = CurrentTrackerCommand(self)
+        for tracker in trackers:
+            cmd.update_tracker(tracker)
+
+    def notify(self, verb: str, done: int, total: int) -> None:
+        msg = f"{verb} {done} trackers!"
+        if done < total:
+            msg += f" {total - done} failed."
+        self.notification(msg=msg)
+
+
+class BulkSelectionCommand(BulkCommand):
+    """Base of the bulk commands previewing the trackers they act on."""
+
+    def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        del kwargs
+        self.amend_query(query.raw_args)
+        return [
+            QueryResults(
+                self.ICON,
+                self.PREFIX.title(),
+                self.__doc__,
+                self.get_cmd(),
+            ),
+        ]
+
+    def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        self.amend_query(query.raw_args)
+        if not self.filtered(query):
+            return [
+                QueryResults(
+                    self.ICON,
+                    f"{self.PREFIX.title()} trackers",
+                    "Filter them by date, @project, #tag or description first.",
+                    ActionEnum.DO_NOTHING,
+                ),
+            ]
+        return self._selection(
+            query,
+            partial(self.select, query),
+            f"{self.PREFIX.title()} {{count}} trackers",
+            self.describe(query),
+            **kwargs,
+        )
+
+    def process_model(
+        self,
+        model: TogglTracker,
+        action: ACTION_TYPE,
+        alt_action: Optional[ACTION_TYPE] = None,
+        *,
+        advanced: bool = False,
+        fmt_str: str = "{prefix} {name}",
+    ) -> list[QueryResults]:
+        return ListCommand(self).process_model(
+            model,
+            action,
+            alt_action,
+            advanced=advanced,
+            fmt_str=fmt_str,
+        )
+
+    def describe(self, query: Query) -> str:  # noqa: PLR6301
+        """Summary of the changes shown above the selected trackers."""
+        del query
+        return ""
+
+
+class BulkEditCommand(BulkSelectionCommand):
+    """Edit every selected tracker."""
+
+    PREFIX = "edit"
+    ALIASES = ("ed", "change", "amend")
+    ICON = EDIT_IMG
+    BACKGROUND = True
+    PRIORITY = Priority.BACKGROUND
+    OPTIONS = ("refresh", ">", "<", '"', "@", "#", "->")
+
+    def describe(self, query: Query) -> str:
+        _, changes = self.split(query)
+        if changes is None:
+            return f"Add '{self.SEPARATOR}' followed by the changes."
+        return "Apply the changes to all of them."
+
+    @staticmethod
+    def edit_body(
+        name: Optional[str],
+        project: Optional[TogglProject],
+    ) -> list[dict[str, Any]]:
+        body: list[dict[str, Any]] = []
+        if name is not None:
+            body.append({"op": "replace", "path": "/description", "value": name})
+        if project is not None:
+            body.append({"op": "replace", "path": "/project_id", "value": project.id})
+        return body
+
+    def handle(self, query: Query, **kwargs: Any) -> bool:
+        _, changes = self.split(query)
+        trackers = self.targets(query, kwargs.get("ids")) if changes is not None else []
+        if changes is None or not trackers:
+            return False
+
+        name = changes.name if isinstance(changes.name, str) else None
+        project = ProjectCommand(self).get_model(changes.project)
+        if changes.project is not None and project is None:
+            self.notification(msg=f"Project {changes.project} doesn't exist!")
+            return False
+
+        try:
+            add = self.resolve_tags(changes.add_tags)
+        except HTTPStatusError as err:
+            self.handle_error(err)
+            return False
+
+        body = self.edit_body(name, project)
+        body.extend(self.tag_body(add, changes.rm_tags))
+        if not body:
+            return False
+
+        def apply(tracker: TogglTracker) -> None:
+            tracker.name = name or tracker.name
+            tracker.project = project.id if project else tracker.project
+            self.apply_tags(tracker, add, changes.rm_tags)
+
+        edited = [
+            tracker
+            for endpoint, group in self.batches(trackers)
+            for tracker in patch_all(endpoint, group, body, apply)
+        ]
+        self.update_current(edited)
+        self.notify("Changed", len(edited), len(trackers))
+        return bool(edited)
+
+
+class BulkTagCommand(BulkSelectionCommand):
+    """Add or remove tags on every selected tracker."""
+
+    PREFIX = "tag"
+    ALIASES = ("tags", "retag")
+    ICON = TAG_IMG
+    BACKGROUND = True
+    PRIORITY = Priority.BACKGROUND
+    OPTIONS = ("refresh", ">", "<", '"', "@", "#", "+", "-")
+
+    @staticmethod
+    def changes(query: Query) -> tuple[list[str], list[str]]:
+        """Tags to add prefixed with '+' and remove prefixed with '-'."""
+        add: list[str] = []
+        remove: list[str] = []
+        for arg in query.raw_args[3:]:
+            if len(arg) < 2 or arg[0] not in "+-" or arg == BulkCommand.SEPARATOR:  # noqa: PLR2004
+                continue
+            (add if arg[0] == "+" else remove).extend(arg[1:].split(","))
+        return add, remove
+
+    def describe(self, query: Query) -> str:
+        add, remove = self.changes(query)
+        if not add and not remove:
+            return "Use '+tag' to add and '-tag' to remove tags."
+        return ", ".join([*(f"+{t}" for t in add), *(f"-{t}" for t in remove)])
+
+    def handle(self, query: Query, **kwargs: Any) -> bool:
+        names, remove = self.changes(query)
+        trackers = self.targets(query, kwargs.get("ids"))
+        if not trackers or not (names or remove):
+            return False
+
+        try:
+            add = self.resolve_tags(names)
+        except HTTPStatusError as err:
+            self.handle_error(err)
+            return False
+
+        body = self.tag_body(add, remove)
+        apply = partial(self.apply_tags, add=add, remove=remove)
+        edited = [
+            tracker
+            for endpoint, group in self.batches(trackers)
+            for tracker in patch_all(endpoint, group, body, apply)
+        ]
+        self.update_current(edited)
+        self.notify("Tagged", len(edited), len(trackers))
+        return bool(edited)
+
+
+class BulkDeleteCommand(BulkSelectionCommand):
+    """Delete every selected tracker."""
+
+    PREFIX = "delete"
+    ALIASES = ("rm", "del", "remove")
+    ICON = DELETE_IMG
+    BACKGROUND = True
+    PRIORITY = Priority.BACKGROUND
+    OPTIONS = ("refresh", ">", "<", '"', "@", "#")
+
+    def describe(self, query: Query) -> str:  # noqa: PLR6301
+        del query
+        return "Permanently delete all of them."
+
+    def handle(self, query: Query, **kwargs: Any) -> bool:
+        trackers = self.targets(query, kwargs.get("ids"))
+        if not trackers:
+            return False
+
+        # NOTE: Toggl has no bulk delete, so single deletes are batched instead.
+        deleted = [
+            tracker
+            for endpoint, group in self.batches(trackers)
+            for tracker in delete_all(endpoint, group)
+        ]
+
+        current_cmd = CurrentTrackerCommand(self)
+        current = current_cmd.tracker
+        if current is not None and any(t.id == current.id for t in deleted):
+            current_cmd.tracker = None
+
+        self.notify("Removed", len(deleted), len(trackers))
+        return bool(deleted)
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime, timedelta, timezone
 from functools import partial
-from typing import TYPE_CHECKING, Any, Literal, Optional
+from typing import TYPE_CHECKING, Any, ClassVar, Final, Literal, Optional
 
 from httpx import HTTPStatusError
-from toggl_api import ClientBody, ClientEndpoint, TogglClient, TogglQuery
+from toggl_api import (
+    ClientBody,
+    ClientEndpoint,
+    ProjectEndpoint,
+    TogglClient,
+    TogglProject,
+    TogglQuery,
+)
 
+from ulauncher_toggl_extension.batch import delete_all
+from ulauncher_toggl_extension.conditional import conditional_collect
 from ulauncher_toggl_extension.images import (
     ADD_IMG,
     BROWSER_IMG,
@@ -15,12 +25,19 @@ from ulauncher_toggl_extension.images import (
     EDIT_IMG,
     REFRESH_IMG,
 )
+from ulauncher_toggl_extension.journal import JournalCache
+from ulauncher_toggl_extension.scheduler import Priority
 from ulauncher_toggl_extension.utils import get_distance
+from ulauncher_toggl_extension.worker import checkpoint
+from ulauncher_toggl_extension.workspaces import fetch_all
 
 from .meta import QueryResults, SubCommand
 
 if TYPE_CHECKING:
+    from collections.abc import Collection
+
     from ulauncher_toggl_extension.query import Query
+    from ulauncher_toggl_extension.workspaces import Workspace
 
 log = logging.getLogger(__name__)
 
@@ -31,17 +48,14 @@ class ClientCommand(SubCommand[TogglClient]):
     PREFIX = "client"
     ALIASES = ("cli", "clients")
     ICON = CLIENT_IMG
-    EXPIRATION = None
+    EXPIRATION: ClassVar[Optional[timedelta]] = None
     OPTIONS = ()
 
     def get_models(self, query: Query, **kwargs: Any) -> list[TogglClient]:
         del kwargs
-        endpoint = ClientEndpoint(self.workspace_id, self.auth, self.cache)
-        try:
-            clients = endpoint.collect(refresh=query.refresh)
-        except HTTPStatusError as err:
-            self.handle_error(err)
-            clients = endpoint.collect()
+        clients = self.collect_all(TogglClient, self.collect, refresh=query.refresh)
+
+        checkpoint()
 
         if isinstance(query.id, int):
             clients.sort(
@@ -58,6 +72,22 @@ class ClientCommand(SubCommand[TogglClient]):
 
         return clients
 
+    def collect(self, workspace: Workspace, *, refresh: bool) -> list[TogglClient]:
+        snapshot = None if refresh else self.snapshot(TogglClient, workspace.cache_path)
+        if snapshot is not None and snapshot.models:
+            return snapshot.recent(self.EXPIRATION)
+
+        endpoint = ClientEndpoint(
+            workspace.id,
+            self.auth,
+            JournalCache(workspace.cache_path, self.EXPIRATION),
+        )
+        try:
+            return conditional_collect(endpoint) if refresh else endpoint.collect()
+        except HTTPStatusError as err:
+            self.handle_error(err)
+            return endpoint.collect()
+
     def get_model(
         self,
         client_id: Optional[int | TogglClient | str] = None,
@@ -67,6 +97,14 @@ class ClientCommand(SubCommand[TogglClient]):
         if client_id is None or isinstance(client_id, TogglClient):
             return client_id
 
+        for snapshot in [] if refresh else self.snapshots(TogglClient):
+            cached = snapshot.find(
+                client_id,
+                self.EXPIRATION if isinstance(client_id, str) else None,
+            )
+            if cached is not None:
+                return cached
+
         endpoint = ClientEndpoint(self.workspace_id, self.auth, self.cache)
         if isinstance(client_id, str):
             client = list(endpoint.query(TogglQuery("name", client_id)))
@@ -132,6 +170,7 @@ class AddClientCommand(ClientCommand):
     PREFIX = "add"
     ALIASES = ("create", "insert")
     ICON = ADD_IMG
+    BACKGROUND = True
     OPTIONS = ("refresh", '"', "^-")
 
     def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
@@ -201,6 +240,7 @@ class DeleteClientCommand(ClientCommand):
     PREFIX = "delete"
     ALIASES = ("del", "rm", "remove")
     ICON = DELETE_IMG
+    BACKGROUND = True
     ESSENTIAL = True
     OPTIONS = ("refresh", ":", "^-")
 
@@ -258,12 +298,115 @@ class DeleteClientCommand(ClientCommand):
         return True
 
 
+class PruneClientCommand(ClientCommand):
+    """Delete clients that no project belongs to."""
+
+    PREFIX = "prune"
+    ALIASES = ("unused", "clean")
+    ICON = DELETE_IMG
+    BACKGROUND = True
+    PRIORITY = Priority.BACKGROUND
+    OPTIONS = ("refresh", ">...<")
+    IDLE: Final[timedelta] = timedelta(weeks=12)
+
+    def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        del kwargs
+        self.amend_query(query.raw_args)
+        return [
+            QueryResults(
+                self.ICON,
+                self.PREFIX.title(),
+                self.__doc__,
+                self.get_cmd(),
+            ),
+        ]
+
+    def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        self.amend_query(query.raw_args)
+        return self._selection(
+            query,
+            partial(self.candidates, query),
+            "Delete {count} clients",
+            "Not used by any project, including archived ones.",
+            **kwargs,
+        )
+
+    def used(self, workspace: Workspace, *, refresh: bool) -> set[int]:
+        """Ids of the clients assigned to any project of a workspace."""
+        snapshot = (
+            None if refresh else self.snapshot(TogglProject, workspace.cache_path)
+        )
+        if snapshot is not None and snapshot.models:
+            return snapshot.referenced("client")
+
+        endpoint = ProjectEndpoint(
+            workspace.id,
+            self.auth,
+            JournalCache(workspace.cache_path, self.EXPIRATION),
+        )
+        try:
+            projects = (
+                conditional_collect(endpoint, since=True)
+                if refresh
+                else endpoint.collect()
+            )
+        except HTTPStatusError as err:
+            self.handle_error(err)
+            projects = endpoint.collect()
+        return {p.client for p in projects if p.client is not None}
+
+    def candidates(
+        self,
+        query: Query,
+        ids: Optional[Collection[int]] = None,
+    ) -> list[TogglClient]:
+        """Clients without projects that weren't changed in the idle period.
+
+        Set the idle period with a duration, e.g. `>30d<`. Only the clients
+        with the given ids are selected if they were previewed.
+        """
+        if ids is not None:
+            ids = set(ids)
+            return [client for client in self.get_models(query) if client.id in ids]
+
+        cutoff = datetime.now(timezone.utc) - (query.duration or self.IDLE)
+        used = set(
+            fetch_all(
+                self.workspaces,
+                partial(self.used, refresh=query.refresh),
+            ),
+        )
+        return [
+            client
+            for client in self.get_models(query)
+            if client.id not in used and client.timestamp < cutoff
+        ]
+
+    def handle(self, query: Query, **kwargs: Any) -> bool:
+        clients = self.candidates(query, kwargs.get("ids"))
+        if not clients:
+            return False
+
+        deleted = 0
+        for workspace, models in self.by_workspace(clients):
+            endpoint = ClientEndpoint(
+                workspace.id,
+                self.auth,
+                JournalCache(workspace.cache_path, self.EXPIRATION),
+            )
+            deleted += len(delete_all(endpoint, models))
+
+        self.notification(msg=f"Deleted {deleted} of {len(clients)} unused clients!")
+        return deleted > 0
+
+
 class EditClientCommand(ClientCommand):
     """Edit a client."""
 
     PREFIX = "edit"
     ALIASES = ("ed", "change", "amend")
     ICON = EDIT_IMG
+    BACKGROUND = True
     ESSENTIAL = True
     OPTIONS = ("refresh", '"', ":", "^-")
 
@@ -4,47 +4,7 @@ from typing import TYPE_CHECKING, Any
 
 from ulauncher_toggl_extension.images import TIP_IMAGES, TipSeverity
 
-from .client import (
-    AddClientCommand,
-    ClientCommand,
-    DeleteClientCommand,
-    EditClientCommand,
-    ListClientCommand,
-    RefreshClientCommand,
-)
-from .meta import Command, QueryResults
-from .project import (
-    AddProjectCommand,
-    DeleteProjectCommand,
-    EditProjectCommand,
-    ListProjectCommand,
-    ProjectCommand,
-    RefreshProjectCommand,
-)
-from .report import (
-    DailyReportCommand,
-    MonthlyReportCommand,
-    ReportCommand,
-    WeeklyReportCommand,
-)
-from .tag import (
-    AddTagCommand,
-    DeleteTagCommand,
-    EditTagCommand,
-    ListTagCommand,
-    TagCommand,
-)
-from .tracker import (
-    AddCommand,
-    ContinueCommand,
-    CurrentTrackerCommand,
-    DeleteCommand,
-    EditCommand,
-    ListCommand,
-    RefreshCommand,
-    StartCommand,
-    StopCommand,
-)
+from .meta import Command, QueryResults, routing_table
 
 if TYPE_CHECKING:
     from toggl_api.models import TogglClass
@@ -56,42 +16,6 @@ if TYPE_CHECKING:
 class HelpCommand(Command):
     """Help command for general hints."""
 
-    # REFACTOR: This could be automated.
-    HINT_COMMANDS: dict[str, type[Command]] = {
-        ContinueCommand.PREFIX: ContinueCommand,
-        ListCommand.PREFIX: ListCommand,
-        CurrentTrackerCommand.PREFIX: CurrentTrackerCommand,
-        StopCommand.PREFIX: StopCommand,
-        StartCommand.PREFIX: StartCommand,
-        AddCommand.PREFIX: AddCommand,
-        EditCommand.PREFIX: EditCommand,
-        DeleteCommand.PREFIX: DeleteCommand,
-        ProjectCommand.PREFIX: ProjectCommand,
-        RefreshCommand.PREFIX: RefreshCommand,
-        ProjectCommand.PREFIX + " " + ListProjectCommand.PREFIX: ListProjectCommand,
-        ProjectCommand.PREFIX + " " + AddProjectCommand.PREFIX: AddProjectCommand,
-        ProjectCommand.PREFIX + " " + DeleteProjectCommand.PREFIX: DeleteProjectCommand,
-        ProjectCommand.PREFIX + " " + EditProjectCommand.PREFIX: EditProjectCommand,
-        ProjectCommand.PREFIX
-        + " "
-        + RefreshProjectCommand.PREFIX: RefreshProjectCommand,
-        ClientCommand.PREFIX: ClientCommand,
-        ClientCommand.PREFIX + " " + ListClientCommand.PREFIX: ListClientCommand,
-        ClientCommand.PREFIX + " " + AddClientCommand.PREFIX: AddClientCommand,
-        ClientCommand.PREFIX + " " + DeleteClientCommand.PREFIX: DeleteClientCommand,
-        ClientCommand.PREFIX + " " + EditClientCommand.PREFIX: EditClientCommand,
-        ClientCommand.PREFIX + " " + RefreshClientCommand.PREFIX: RefreshClientCommand,
-        TagCommand.PREFIX: TagCommand,
-        TagCommand.PREFIX + " " + ListTagCommand.PREFIX: ListTagCommand,
-        TagCommand.PREFIX + " " + AddTagCommand.PREFIX: AddTagCommand,
-        TagCommand.PREFIX + " " + DeleteTagCommand.PREFIX: DeleteTagCommand,
-        TagCommand.PREFIX + " " + EditTagCommand.PREFIX: EditTagCommand,
-        ReportCommand.PREFIX: ReportCommand,
-        ReportCommand.PREFIX + " " + DailyReportCommand.PREFIX: DailyReportCommand,
-        ReportCommand.PREFIX + " " + WeeklyReportCommand.PREFIX: WeeklyReportCommand,
-        ReportCommand.PREFIX + " " + MonthlyReportCommand.PREFIX: MonthlyReportCommand,
-    }
-
     PREFIX = "help"
     ALIASES = ("hint", "guide")
     ICON = TIP_IMAGES[TipSeverity.INFO]
@@ -126,11 +50,9 @@ class HelpCommand(Command):
         if query.subcommand == "help":
             return self.hint()
 
-        cmd = f"{query.subcommand}"
-        if len(query.raw_args) >= 4:  # noqa: PLR2004  # NOTE: Help for subcommands.
-            cmd += f" {query.raw_args[3]}"
-
-        hints = self.HINT_COMMANDS.get(cmd)
+        # NOTE: Help for subcommands is found with the fourth argument.
+        path = query.raw_args[2:4]
+        hints = routing_table().get(*path) if path else None
         if hints:
             return hints.hint()
 
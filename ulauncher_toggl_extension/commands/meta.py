@@ -6,7 +6,7 @@ import math
 from abc import abstractmethod
 from dataclasses import dataclass
 from datetime import timedelta
-from functools import partial
+from functools import cache, partial
 from pathlib import Path
 from typing import (
     TYPE_CHECKING,
@@ -19,9 +19,10 @@ from typing import (
     TypeVar,
 )
 
-from toggl_api import JSONCache
+from toggl_api import TogglTracker
 from toggl_api.models import TogglClass
 
+from ulauncher_toggl_extension.columns import COLUMNS
 from ulauncher_toggl_extension.images import (
     APP_IMG,
     PREV_IMG,
@@ -29,13 +30,23 @@ from ulauncher_toggl_extension.images import (
     TIP_IMAGES,
     TipSeverity,
 )
+from ulauncher_toggl_extension.journal import JournalCache
 from ulauncher_toggl_extension.query import Query
+from ulauncher_toggl_extension.scheduler import Priority, priority
+from ulauncher_toggl_extension.scope import fetch
+from ulauncher_toggl_extension.snapshot import SNAPSHOTS
 from ulauncher_toggl_extension.utils import quote_member, show_notification
+from ulauncher_toggl_extension.worker import checkpoint
+from ulauncher_toggl_extension.workspaces import Workspace, fetch_all, namespaces
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from datetime import date
+
     from httpx import BasicAuth
 
     from ulauncher_toggl_extension.extension import TogglExtension
+    from ulauncher_toggl_extension.snapshot import CacheSnapshot
 
 log = logging.getLogger(__name__)
 
@@ -59,6 +70,18 @@ class ActionEnum(enum.Enum):
 ACTION_TYPE = Optional[ActionEnum | Callable | str]
 
 
+class PreviewCost(enum.IntEnum):
+    """Rough cost of rendering the preview of a command.
+
+    Used for deciding which previews get rendered inline and which ones are
+    deferred to the background while the launcher is waiting on results.
+    """
+
+    STATIC = enum.auto()
+    CACHE = enum.auto()
+    NETWORK = enum.auto()
+
+
 @dataclass(frozen=True)
 class QueryResults:
     icon: Path = APP_IMG
@@ -67,6 +90,7 @@ class QueryResults:
     on_enter: ACTION_TYPE = ActionEnum.DO_NOTHING
     on_alt_enter: ACTION_TYPE = ActionEnum.DO_NOTHING
     small: bool = False
+    pending: bool = False
 
 
 class Singleton(type):
@@ -79,6 +103,7 @@ class Singleton(type):
 
 
 T = TypeVar("T", bound=TogglClass)
+M = TypeVar("M", bound=TogglClass)
 
 
 class Command(Generic[T], metaclass=Singleton):
@@ -92,10 +117,15 @@ class Command(Generic[T], metaclass=Singleton):
 
     Methods:
         preview: Preview method of the command to show up as the extension. Abstract.
+        placeholder: Stand-in for a preview that is still being rendered.
         view: View method for providing quick options, hints and anything thats
             not the command itself. Abstract.
         handle: Executes the actual command logic.
         process_model: Generates a viewable query from a Toggl object.
+        snapshot: Warm-start snapshot for fast model lookups.
+        snapshots: Warm-start snapshots of every workspace.
+        by_workspace: Groups models by their workspace.
+        last_used: Latest tracker start of every project and tag.
         call_pickle: Calls a pickled command.
         pagination: Helper method for creating paginated results.
         handler_error: Helper method for handling and dispatching consistent errors.
@@ -110,6 +140,11 @@ class Command(Generic[T], metaclass=Singleton):
         cache_path: Location of the cache file.
         ICON: Base icon of the command.
         ESSENTIAL: Whether the command will be used in a submenu.
+        COST: How expensive rendering the preview of the command is.
+        BACKGROUND: Whether handle can run off the main thread as it never
+            returns further results to display.
+        PRIORITY: Priority of the API requests sent by the command. Handles
+            of background priority run apart from interactive actions.
         prefix: User set application prefix. Usually defaults to "tgl".
     """
 
@@ -120,6 +155,9 @@ class Command(Generic[T], metaclass=Singleton):
     EXPIRATION: ClassVar[timedelta] = timedelta(weeks=1)
     ICON: ClassVar[Path] = APP_IMG
     ESSENTIAL: ClassVar[bool] = False
+    COST: ClassVar[PreviewCost] = PreviewCost.STATIC
+    BACKGROUND: ClassVar[bool] = False
+    PRIORITY: ClassVar[Priority] = Priority.QUERY
     # NOTE: This could be refactored into a method as some commands are situational.
 
     __slots__ = (
@@ -129,6 +167,7 @@ class Command(Generic[T], metaclass=Singleton):
         "max_results",
         "prefix",
         "workspace_id",
+        "workspace_ids",
     )
 
     def __init__(self, extension: TogglExtension | Command) -> None:
@@ -136,6 +175,9 @@ class Command(Generic[T], metaclass=Singleton):
         self.max_results: int = extension.max_results
         self.auth: BasicAuth = extension.auth
         self.workspace_id: int = extension.workspace_id
+        self.workspace_ids: tuple[int, ...] = tuple(extension.workspace_ids) or (
+            self.workspace_id,
+        )
         self.cache_path: Path = Path(extension.cache_path)
         self.expiration: timedelta = extension.expiration or self.EXPIRATION
 
@@ -145,6 +187,18 @@ class Command(Generic[T], metaclass=Singleton):
         called by the user.
         """
 
+    def placeholder(self) -> list[QueryResults]:
+        """Placeholder shown while an expensive preview is still rendering."""
+        return [
+            QueryResults(
+                self.ICON,
+                self.PREFIX.title(),
+                "Loading...",
+                f"{self.prefix} {self.PREFIX}",
+                pending=True,
+            ),
+        ]
+
     @abstractmethod
     def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
         """View method as the method is called by the user.
@@ -223,7 +277,8 @@ class Command(Generic[T], metaclass=Singleton):
             extra={"arguments": args, "kwargs": kwargs},
         )
         d = cls(extension)
-        return getattr(d, method)(*args, **kwargs)
+        with priority(cls.PRIORITY):
+            return getattr(d, method)(*args, **kwargs)
 
     def process_model(
         self,
@@ -250,7 +305,7 @@ class Command(Generic[T], metaclass=Singleton):
     def _paginator(
         self,
         query: Query,
-        data: list[partial] | list[QueryResults],
+        data: Sequence[partial] | Sequence[QueryResults],
         static: Sequence[QueryResults] = (),
         *,
         page: int = 0,
@@ -275,6 +330,7 @@ class Command(Generic[T], metaclass=Singleton):
         total_pages = (math.ceil(len(data) / results_per_page)) - 1
 
         for t in data[results_per_page * page : results_per_page * (page + 1)]:
+            checkpoint()
             if isinstance(t, QueryResults):
                 page_data.append(t)
             else:
@@ -328,6 +384,41 @@ class Command(Generic[T], metaclass=Singleton):
             )
         return page_data
 
+    def _selection(
+        self,
+        query: Query,
+        select: Callable[[], Sequence[T]],
+        summary: str,
+        description: str = "",
+        **kwargs: Any,
+    ) -> list[QueryResults]:
+        """Paginated models with a leading result handling all of them at once.
+
+        Args:
+            query: Query the models are selected with.
+            select: Selects the models if this is the first page. The ids of
+                the selected models are passed on to `handle` as `ids`.
+            summary: Title of the leading result. Formatted with the `count`
+                of models.
+            description: Description of the leading result.
+            kwargs: Pagination state of the view.
+        """
+        data: Sequence[partial] = kwargs.get("data") or [
+            partial(self.process_model, model, ActionEnum.DO_NOTHING, fmt_str="{name}")
+            for model in select()
+        ]
+        # NOTE: Handling acts on the previewed models instead of selecting again.
+        ids = [item.args[0].id for item in data]
+        static = QueryResults(
+            self.ICON,
+            summary.format(count=len(data)),
+            description,
+            partial(self.call_pickle, method="handle", query=query, ids=ids)
+            if data
+            else ActionEnum.DO_NOTHING,
+        )
+        return self._paginator(query, data, [static], page=kwargs.get("page", 0))
+
     def amend_query(self, query: list[str]) -> None:
         if not query:
             query.append(self.PREFIX)
@@ -347,8 +438,54 @@ class Command(Generic[T], metaclass=Singleton):
         self.notification(str(error))
 
     @property
-    def cache(self) -> JSONCache[T]:
-        return JSONCache(self.cache_path, self.EXPIRATION)
+    def cache(self) -> JournalCache[T]:
+        return JournalCache(self.cache_path, self.EXPIRATION)
+
+    def snapshot(
+        self,
+        model: type[M],
+        cache_path: Optional[Path] = None,
+    ) -> CacheSnapshot[M] | None:
+        """Warm-start snapshot of the cache file holding the model type."""
+        path = cache_path or self.cache_path
+        return SNAPSHOTS.get(path / f"cache_{model.__tablename__}.json")
+
+    def snapshots(self, model: type[M]) -> list[CacheSnapshot[M]]:
+        """Warm-start snapshots of the model type in every workspace."""
+        snapshots = (self.snapshot(model, w.cache_path) for w in self.workspaces)
+        return [snapshot for snapshot in snapshots if snapshot is not None]
+
+    @property
+    def workspaces(self) -> list[Workspace]:
+        """Workspaces with their cache namespaces, default workspace first."""
+        return namespaces(self.cache_path, self.workspace_ids)
+
+    def by_workspace(self, models: Iterable[T]) -> list[tuple[Workspace, list[T]]]:
+        """Groups models by the workspace they belong to, skipping empty ones."""
+        groups: dict[int, list[T]] = {}
+        for model in models:
+            groups.setdefault(getattr(model, "workspace", 0), []).append(model)
+        return [(w, groups[w.id]) for w in self.workspaces if w.id in groups]
+
+    def last_used(
+        self,
+        since: date,
+    ) -> tuple[dict[int, float], dict[int, float]] | None:
+        """Latest tracker start of every project and tag from the cache.
+
+        Args:
+            since: Earliest date the tracker history has to reach back to.
+
+        Returns:
+            tuple | None: Start epochs keyed by project and tag ids. None if
+                the tracker cache can't be read, as nothing can be assumed to
+                be unused then.
+        """
+        columns = COLUMNS.get(
+            self.cache_path / f"cache_{TogglTracker.__tablename__}.json",
+            since=since,
+        )
+        return None if columns is None else columns.last_used()
 
     @classmethod
     def check_autocmp(cls, query: list[str]) -> bool:
@@ -400,13 +537,13 @@ class Command(Generic[T], metaclass=Singleton):
         return hints
 
     @abstractmethod
-    def get_models(self, query: Query, **kwargs: Any) -> list[T]:
-        """Method that collects a list of Toggl objects.
+    def get_models(self, query: Query, **kwargs: Any) -> Sequence[T]:
+        """Method that collects a sequence of Toggl objects.
 
         Will usually apply some sort of sorting and filtering before returning.
 
         Returns:
-            list: A selection of models that were gathered.
+            Sequence: A selection of models that were gathered.
         """
 
     @abstractmethod
@@ -423,11 +560,37 @@ class SubCommand(Command[T]):
         amend_query: Overriden helper method to amend the query as there are
             two different prefixes for calling a subcommand.
         get_cmd: Generate the command for the subcommand
+        collect_all: Collects the models of every workspace once per render.
     """
 
     MIN_ARGS: ClassVar[int] = 3
     OPTIONS = ()
 
+    def collect_all(
+        self,
+        model: type[T],
+        collect: Callable[..., Iterable[T]],
+        *,
+        refresh: bool,
+    ) -> list[T]:
+        """Collects the models of every workspace once per render.
+
+        Args:
+            model: Type of the models collected.
+            collect: Collects the models of a single workspace.
+            refresh: Whether to refresh the models from the API.
+
+        Returns:
+            list: A copy of the models that can be sorted in place.
+        """
+        key = (model.__tablename__, self.cache_path, self.EXPIRATION, refresh)
+        return list(
+            fetch(
+                key,
+                partial(fetch_all, self.workspaces, partial(collect, refresh=refresh)),
+            ),
+        )
+
     def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
         del query, kwargs
         return [
@@ -441,15 +604,20 @@ class SubCommand(Command[T]):
 
     def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
         self.amend_query(query.raw_args)
+        routes = routing_table()
+        subcommands = routes.children(self.__class__)
+
+        if query.subcommand:
+            match = routes.get(self.PREFIX, query.subcommand)
+            if match is not None:
+                return match(self).view(query, **kwargs)
+            subcommands = (
+                routes.complete(query.subcommand, self.__class__) or subcommands
+            )
+
         preview: list[QueryResults] = []
-        for sub in self.__class__.__subclasses__():
-            cmd = sub(self)
-            if query.subcommand and (
-                query.subcommand == cmd.PREFIX
-                or any(x == query.subcommand for x in cmd.ALIASES)
-            ):
-                return cmd.view(query, **kwargs)
-            prev = cmd.preview(query, **kwargs)
+        for sub in subcommands:
+            prev = sub(self).preview(query, **kwargs)
             if prev:
                 preview.append(prev[0])
 
@@ -471,3 +639,148 @@ class SubCommand(Command[T]):
         cmd += f" {self.PREFIX}"
 
         return cmd
+
+
+class _TrieNode:
+    __slots__ = ("children", "commands")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.commands: list[type[Command]] = []
+
+
+class RoutingTable:
+    """Precompiled lookup of every prefix and alias path of the commands.
+
+    Any command declaring a `PREFIX` is routable through its prefix and all
+    of its aliases. Commands deriving from another routable command are
+    registered as its subcommands.
+
+    Methods:
+        register: Adds a command under its parent path.
+        get: Resolves a full path of names to a command in constant time.
+        complete: Lists the commands that have a name starting with a
+            partial name, in registration order.
+        children: Subcommands registered under a command.
+        path: Canonical prefix path of a command.
+        from_hierarchy: Builds a table from the subclasses of a command.
+
+    Attributes:
+        parents: All names of top level commands that contain subcommands.
+    """
+
+    __slots__ = ("_children", "_paths", "_routes", "_tries")
+
+    def __init__(self) -> None:
+        self._routes: dict[tuple[str, ...], type[Command]] = {}
+        self._paths: dict[type[Command], tuple[str, ...]] = {}
+        self._children: dict[type[Command] | None, list[type[Command]]] = {}
+        self._tries: dict[type[Command] | None, _TrieNode] = {}
+
+    def register(
+        self,
+        command: type[Command],
+        parent: Optional[type[Command]] = None,
+    ) -> None:
+        parent_paths: list[tuple[str, ...]] = [()]
+        if parent is not None:
+            parent_paths = [p for p, cmd in self._routes.items() if cmd is parent]
+
+        for path in parent_paths:
+            for name in self.names(command):
+                route = (*path, name)
+                existing = self._routes.setdefault(route, command)
+                if existing is not command:
+                    log.warning(
+                        "Route '%s' of %s is already taken by %s.",
+                        " ".join(route),
+                        command.__name__,
+                        existing.__name__,
+                    )
+
+        parent_path = self.path(parent) if parent is not None else ()
+        self._paths[command] = (*parent_path, command.PREFIX)
+        self._children.setdefault(parent, []).append(command)
+
+        root = self._tries.setdefault(parent, _TrieNode())
+        for name in self.names(command):
+            node = root
+            for char in name:
+                node = node.children.setdefault(char, _TrieNode())
+                if command not in node.commands:
+                    node.commands.append(command)
+
+    def get(self, *path: str) -> type[Command] | None:
+        return self._routes.get(path)
+
+    def complete(
+        self,
+        partial: str,
+        parent: Optional[type[Command]] = None,
+    ) -> list[type[Command]]:
+        node = self._tries.get(parent)
+        if node is None:
+            return []
+        for char in partial:
+            node = node.children.get(char)  # type: ignore[assignment]
+            if node is None:
+                return []
+        return list(node.commands)
+
+    def children(self, command: Optional[type[Command]] = None) -> list[type[Command]]:
+        return list(self._children.get(command, ()))
+
+    def path(self, command: type[Command]) -> tuple[str, ...]:
+        return self._paths.get(command, ())
+
+    @staticmethod
+    def names(command: type[Command]) -> tuple[str, ...]:
+        return (command.PREFIX, *getattr(command, "ALIASES", ()))
+
+    @property
+    def parents(self) -> frozenset[str]:
+        return frozenset(
+            name
+            for command in self.children()
+            if self._children.get(command)
+            for name in self.names(command)
+        )
+
+    @classmethod
+    def from_hierarchy(cls, root: type[Command]) -> RoutingTable:
+        table = cls()
+        seen: set[type[Command]] = set()
+
+        def walk(command: type[Command], parent: Optional[type[Command]]) -> None:
+            for sub in command.__subclasses__():
+                if sub in seen:
+                    continue
+                seen.add(sub)
+
+                # NOTE: Only commands declaring their own prefix are routable.
+                if sub.__dict__.get("PREFIX"):
+                    table.register(sub, parent)
+                    walk(sub, sub)
+                else:
+                    walk(sub, parent)
+
+        walk(root, None)
+        return table
+
+    def __contains__(self, path: tuple[str, ...]) -> bool:
+        return path in self._routes
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+
+@cache
+def routing_table() -> RoutingTable:
+    """Routing table generated from every loaded subclass of `Command`.
+
+    Built once as soon as the `commands` package has imported all of the
+    command modules.
+    """
+    table = RoutingTable.from_hierarchy(Command)  # type: ignore[type-abstract]
+    log.debug("Generated a routing table with %s routes.", len(table))
+    return table
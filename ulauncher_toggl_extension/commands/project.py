@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import logging
+import math
+from datetime import datetime, timedelta, timezone
 from functools import partial
-from typing import TYPE_CHECKING, Any, Literal, Optional
+from typing import TYPE_CHECKING, Any, ClassVar, Final, Literal, Optional
 
 from httpx import HTTPStatusError
 from toggl_api import ProjectBody, ProjectEndpoint, TogglProject, TogglQuery
 
+from ulauncher_toggl_extension.batch import patch_all
+from ulauncher_toggl_extension.conditional import conditional_collect
 from ulauncher_toggl_extension.images import (
     ADD_IMG,
     BROWSER_IMG,
@@ -16,26 +20,36 @@ from ulauncher_toggl_extension.images import (
     PROJECT_IMG,
     REFRESH_IMG,
 )
+from ulauncher_toggl_extension.journal import JournalCache
+from ulauncher_toggl_extension.scheduler import Priority
 from ulauncher_toggl_extension.utils import get_distance, quote_member
+from ulauncher_toggl_extension.worker import checkpoint
+from ulauncher_toggl_extension.workspaces import fetch_all
 
 from .client import ClientCommand
 from .meta import ACTION_TYPE, QueryResults, SubCommand
 
 if TYPE_CHECKING:
+    from collections.abc import Collection
     from pathlib import Path
 
     from ulauncher_toggl_extension.query import Query
+    from ulauncher_toggl_extension.workspaces import Workspace
 
 log = logging.getLogger(__name__)
 
 
+def _set_active(project: TogglProject, *, active: bool) -> None:
+    project.active = active
+
+
 class ProjectCommand(SubCommand[TogglProject]):
     """Subcommand for all project based tasks."""
 
     PREFIX = "project"
     ALIASES = ("proj", "projects")
     ICON = PROJECT_IMG
-    EXPIRATION = None
+    EXPIRATION: ClassVar[Optional[timedelta]] = None
     OPTIONS = ()
 
     def process_model(
@@ -83,12 +97,9 @@ class ProjectCommand(SubCommand[TogglProject]):
 
     def get_models(self, query: Query, **kwargs: Any) -> list[TogglProject]:
         del kwargs
-        user = ProjectEndpoint(self.workspace_id, self.auth, self.cache)
-        try:
-            projects = user.collect(refresh=query.refresh)
-        except HTTPStatusError as err:
-            self.handle_error(err)
-            return []
+        projects = self.collect_all(TogglProject, self.collect, refresh=query.refresh)
+
+        checkpoint()
 
         if query.active:
             projects = [project for project in projects if project.active]
@@ -107,6 +118,28 @@ class ProjectCommand(SubCommand[TogglProject]):
             projects.sort(key=lambda x: x.timestamp, reverse=query.sort_order)
         return projects
 
+    def collect(self, workspace: Workspace, *, refresh: bool) -> list[TogglProject]:
+        snapshot = (
+            None if refresh else self.snapshot(TogglProject, workspace.cache_path)
+        )
+        if snapshot is not None and snapshot.models:
+            return snapshot.recent(self.EXPIRATION)
+
+        endpoint = ProjectEndpoint(
+            workspace.id,
+            self.auth,
+            JournalCache(workspace.cache_path, self.EXPIRATION),
+        )
+        try:
+            return (
+                conditional_collect(endpoint, since=True)
+                if refresh
+                else endpoint.collect()
+            )
+        except HTTPStatusError as err:
+            self.handle_error(err)
+            return []
+
     def get_model(
         self,
         project_id: Optional[int | str | TogglProject] = None,
@@ -116,6 +149,14 @@ class ProjectCommand(SubCommand[TogglProject]):
         if project_id is None or isinstance(project_id, TogglProject):
             return project_id
 
+        for snapshot in [] if refresh else self.snapshots(TogglProject):
+            cached = snapshot.find(
+                project_id,
+                self.EXPIRATION if isinstance(project_id, str) else None,
+            )
+            if cached is not None:
+                return cached
+
         endpoint = ProjectEndpoint(self.workspace_id, self.auth, self.cache)
         if isinstance(project_id, str):
             project = list(endpoint.query(TogglQuery("name", project_id)))
@@ -198,6 +239,25 @@ class ProjectCommand(SubCommand[TogglProject]):
         with path.open("w", encoding="utf-8") as file:
             file.write(svg)
 
+    def set_active(self, projects: list[TogglProject], *, active: bool) -> int:
+        """Archives or restores projects with batched requests per workspace.
+
+        Returns:
+            int: Amount of projects that were changed.
+        """
+        body = [{"op": "replace", "path": "/active", "value": active}]
+        changed = 0
+        for workspace, models in self.by_workspace(projects):
+            endpoint = ProjectEndpoint(
+                workspace.id,
+                self.auth,
+                JournalCache(workspace.cache_path, self.EXPIRATION),
+            )
+            changed += len(
+                patch_all(endpoint, models, body, partial(_set_active, active=active)),
+            )
+        return changed
+
     def generate_color_svg(self, project: TogglProject) -> Path:
         path = self.cache_path / "svg"
         path.mkdir(parents=True, exist_ok=True)
@@ -261,6 +321,7 @@ class AddProjectCommand(ProjectCommand):
     PREFIX = "add"
     ALIASES = ("create", "insert")
     ICON = ADD_IMG
+    BACKGROUND = True
     OPTIONS = ("refresh", "#", "$", '"', ">", "<")
 
     def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
@@ -349,6 +410,7 @@ class EditProjectCommand(ProjectCommand):
     PREFIX = "edit"
     ALIASES = ("ed", "change", "amend")
     ICON = EDIT_IMG
+    BACKGROUND = True
     ESSENTIAL = True
     OPTIONS = ("refresh", "#", "$", '"', ":")
 
@@ -437,6 +499,7 @@ class DeleteProjectCommand(ProjectCommand):
     PREFIX = "delete"
     ALIASES = ("rm", "del", "remove")
     ICON = DELETE_IMG
+    BACKGROUND = True
     ESSENTIAL = True
     OPTIONS = ("refresh", ":", "^-")
 
@@ -506,6 +569,139 @@ class DeleteProjectCommand(ProjectCommand):
         return True
 
 
+class ArchiveProjectCommand(ProjectCommand):
+    """Archive projects without any trackers in a while."""
+
+    PREFIX = "archive"
+    ALIASES = ("arc", "stale")
+    ICON = PROJECT_IMG
+    BACKGROUND = True
+    PRIORITY = Priority.BACKGROUND
+    OPTIONS = ("refresh", ">...<")
+    IDLE: Final[timedelta] = timedelta(weeks=12)
+
+    def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        del kwargs
+        self.amend_query(query.raw_args)
+        return [
+            QueryResults(
+                self.ICON,
+                self.PREFIX.title(),
+                self.__doc__,
+                self.get_cmd(),
+            ),
+        ]
+
+    def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        self.amend_query(query.raw_args)
+        idle = query.duration or self.IDLE
+        return self._selection(
+            query,
+            partial(self.candidates, query),
+            "Archive {count} projects",
+            f"No trackers within the last {idle.days} days.",
+            **kwargs,
+        )
+
+    def candidates(
+        self,
+        query: Query,
+        ids: Optional[Collection[int]] = None,
+    ) -> list[TogglProject]:
+        """Active projects without trackers or changes within the idle period.
+
+        Set the idle period with a duration, e.g. `>30d<`. Only the active
+        projects with the given ids are selected if they were previewed.
+        """
+        if ids is not None:
+            ids = set(ids)
+            return [p for p in self.get_models(query) if p.active and p.id in ids]
+
+        cutoff = datetime.now(timezone.utc) - (query.duration or self.IDLE)
+        usage = self.last_used(cutoff.date())
+        if usage is None:
+            return []
+        used, _ = usage
+        return [
+            project
+            for project in self.get_models(query)
+            if project.active
+            and used.get(project.id, -math.inf) < cutoff.timestamp()
+            and project.timestamp < cutoff
+        ]
+
+    def handle(self, query: Query, **kwargs: Any) -> bool:
+        projects = self.candidates(query, kwargs.get("ids"))
+        if not projects:
+            return False
+
+        archived = self.set_active(projects, active=False)
+        self.notification(msg=f"Archived {archived} of {len(projects)} projects!")
+        return archived > 0
+
+
+class UnarchiveProjectCommand(ProjectCommand):
+    """Restore archived projects."""
+
+    PREFIX = "unarchive"
+    ALIASES = ("restore", "unarc")
+    ICON = PROJECT_IMG
+    BACKGROUND = True
+    PRIORITY = Priority.BACKGROUND
+    OPTIONS = ("refresh", '"')
+
+    def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        del kwargs
+        self.amend_query(query.raw_args)
+        return [
+            QueryResults(
+                self.ICON,
+                self.PREFIX.title(),
+                self.__doc__,
+                self.get_cmd(),
+            ),
+        ]
+
+    def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        self.amend_query(query.raw_args)
+        return self._selection(
+            query,
+            partial(self.candidates, query),
+            "Restore {count} projects",
+            "Projects with a matching name or all archived ones.",
+            **kwargs,
+        )
+
+    def candidates(
+        self,
+        query: Query,
+        ids: Optional[Collection[int]] = None,
+    ) -> list[TogglProject]:
+        """Archived projects with a name containing the query name.
+
+        Only the archived projects with the given ids are selected if they
+        were previewed.
+        """
+        name = query.name.lower() if isinstance(query.name, str) else ""
+        projects = fetch_all(
+            self.workspaces,
+            partial(self.collect, refresh=query.refresh),
+        )
+        if ids is not None:
+            ids = set(ids)
+            return [p for p in projects if not p.active and p.id in ids]
+        return [p for p in projects if not p.active and name in p.name.lower()]
+
+    def handle(self, query: Query, **kwargs: Any) -> bool:
+        projects = self.candidates(query, kwargs.get("ids"))
+        if not projects:
+            return False
+
+        restored = self.set_active(projects, active=True)
+        self.notification(msg=f"Restored {restored} of {len(projects)} projects!")
+        return restored > 0
+
+
 class RefreshProjectCommand(ProjectCommand):
     """Refresh specific projects."""
 
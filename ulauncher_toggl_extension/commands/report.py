@@ -94,6 +94,7 @@ class ReportCommand(SubCommand, ReportMixin):
     PREFIX = "report"
     ALIASES = ("stats", "rep", "statistics")
     ICON = REPORT_IMG
+    BACKGROUND = True
     EXPIRATION = None  # NOTE: Report endpoints don't have cache.
     FRAME: ClassVar[TimeFrame]
     ENDPOINT: ClassVar[type[ReportEndpoint]]
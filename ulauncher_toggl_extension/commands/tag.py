@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import logging
+import math
+from datetime import datetime, timedelta, timezone
 from functools import partial
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar, Final, Optional
 
 from httpx import HTTPStatusError
 from toggl_api import TagEndpoint, TogglQuery, TogglTag
 
+from ulauncher_toggl_extension.batch import delete_all
+from ulauncher_toggl_extension.conditional import conditional_collect
 from ulauncher_toggl_extension.images import (
     ADD_IMG,
     BROWSER_IMG,
@@ -14,12 +18,18 @@ from ulauncher_toggl_extension.images import (
     EDIT_IMG,
     TAG_IMG,
 )
+from ulauncher_toggl_extension.journal import JournalCache
+from ulauncher_toggl_extension.scheduler import Priority
 from ulauncher_toggl_extension.utils import get_distance
+from ulauncher_toggl_extension.worker import checkpoint
 
 from .meta import QueryResults, SubCommand
 
 if TYPE_CHECKING:
+    from collections.abc import Collection
+
     from ulauncher_toggl_extension.query import Query
+    from ulauncher_toggl_extension.workspaces import Workspace
 
 log = logging.getLogger(__name__)
 
@@ -30,16 +40,12 @@ class TagCommand(SubCommand[TogglTag]):
     PREFIX = "tag"
     ALIASES = ("tags",)
     ICON = TAG_IMG
-    EXPIRATION = None
+    EXPIRATION: ClassVar[Optional[timedelta]] = None
     OPTIONS = ()
 
     def get_models(self, query: Query, **_) -> list[TogglTag]:
-        endpoint = TagEndpoint(self.workspace_id, self.auth, self.cache)
-        try:
-            tags = endpoint.collect(refresh=query.refresh)
-        except HTTPStatusError as err:
-            self.handle_error(err)
-            tags = endpoint.collect()
+        tags = self.collect_all(TogglTag, self.collect, refresh=query.refresh)
+        checkpoint()
         if isinstance(query.id, int):
             tags.sort(
                 key=lambda x: get_distance(query.id, x.id),
@@ -57,10 +63,31 @@ class TagCommand(SubCommand[TogglTag]):
             )
         return tags
 
+    def collect(self, workspace: Workspace, *, refresh: bool) -> list[TogglTag]:
+        snapshot = None if refresh else self.snapshot(TogglTag, workspace.cache_path)
+        if snapshot is not None and snapshot.models:
+            return snapshot.recent(self.EXPIRATION)
+
+        endpoint = TagEndpoint(
+            workspace.id,
+            self.auth,
+            JournalCache(workspace.cache_path, self.EXPIRATION),
+        )
+        try:
+            return conditional_collect(endpoint) if refresh else endpoint.collect()
+        except HTTPStatusError as err:
+            self.handle_error(err)
+            return endpoint.collect()
+
     def get_model(self, model: int | str | TogglTag | None) -> TogglTag | None:
         if model is None or isinstance(model, TogglTag):
             return model
 
+        for snapshot in self.snapshots(TogglTag):
+            cached = snapshot.find(model, self.EXPIRATION)
+            if cached is not None:
+                return cached
+
         endpoint = TagEndpoint(self.workspace_id, self.auth, self.cache)
 
         query = list(
@@ -121,6 +148,7 @@ class AddTagCommand(TagCommand):
     PREFIX = "add"
     ALIASES = ("create", "insert")
     ICON = ADD_IMG
+    BACKGROUND = True
     OPTIONS = ("refresh", '"')
 
     def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
@@ -191,6 +219,7 @@ class EditTagCommand(TagCommand):
     PREFIX = "edit"
     ALIASES = ("ed", "change", "amend")
     ICON = EDIT_IMG
+    BACKGROUND = True
     ESSENTIAL = True
     OPTIONS = ("refresh", '"', ":")
 
@@ -267,6 +296,7 @@ class DeleteTagCommand(TagCommand):
     PREFIX = "delete"
     ALIASES = ("rm", "del", "remove")
     ICON = DELETE_IMG
+    BACKGROUND = True
     ESSENTIAL = True
     OPTIONS = ("refresh",)
 
@@ -324,3 +354,81 @@ class DeleteTagCommand(TagCommand):
         self.notification(msg=f"Deleted tag {model.name}!")
 
         return True
+
+
+class PruneTagCommand(TagCommand):
+    """Delete tags without any trackers in a while."""
+
+    PREFIX = "prune"
+    ALIASES = ("unused", "clean")
+    ICON = DELETE_IMG
+    BACKGROUND = True
+    PRIORITY = Priority.BACKGROUND
+    OPTIONS = ("refresh", ">...<")
+    IDLE: Final[timedelta] = timedelta(weeks=12)
+
+    def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        del kwargs
+        self.amend_query(query.raw_args)
+        return [
+            QueryResults(
+                self.ICON,
+                self.PREFIX.title(),
+                self.__doc__,
+                self.get_cmd(),
+            ),
+        ]
+
+    def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        self.amend_query(query.raw_args)
+        idle = query.duration or self.IDLE
+        return self._selection(
+            query,
+            partial(self.candidates, query),
+            "Delete {count} tags",
+            f"No trackers within the last {idle.days} days.",
+            **kwargs,
+        )
+
+    def candidates(
+        self,
+        query: Query,
+        ids: Optional[Collection[int]] = None,
+    ) -> list[TogglTag]:
+        """Tags without trackers or changes within the idle period.
+
+        Set the idle period with a duration, e.g. `>30d<`. Only the tags
+        with the given ids are selected if they were previewed.
+        """
+        if ids is not None:
+            ids = set(ids)
+            return [tag for tag in self.get_models(query) if tag.id in ids]
+
+        cutoff = datetime.now(timezone.utc) - (query.duration or self.IDLE)
+        usage = self.last_used(cutoff.date())
+        if usage is None:
+            return []
+        _, used = usage
+        return [
+            tag
+            for tag in self.get_models(query)
+            if used.get(tag.id, -math.inf) < cutoff.timestamp()
+            and tag.timestamp < cutoff
+        ]
+
+    def handle(self, query: Query, **kwargs: Any) -> bool:
+        tags = self.candidates(query, kwargs.get("ids"))
+        if not tags:
+            return False
+
+        deleted = 0
+        for workspace, models in self.by_workspace(tags):
+            endpoint = TagEndpoint(
+                workspace.id,
+                self.auth,
+                JournalCache(workspace.cache_path, self.EXPIRATION),
+            )
+            deleted += len(delete_all(endpoint, models))
+
+        self.notification(msg=f"Deleted {deleted} of {len(tags)} unused tags!")
+        return deleted > 0
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import json
 import logging
 from datetime import datetime, timedelta, timezone
 from functools import partial
-from typing import TYPE_CHECKING, Any, Literal, Optional
+from pathlib import Path
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Any, Final, Literal, Optional
 
 from httpx import HTTPStatusError
 from toggl_api import (
-    JSONCache,
+    ProjectEndpoint,
+    TagEndpoint,
     TogglProject,
     TogglQuery,
     TogglTracker,
@@ -15,8 +19,18 @@ from toggl_api import (
     TrackerEndpoint,
     UserEndpoint,
 )
+from toggl_api.meta.cache.json_cache import CustomDecoder, CustomEncoder
 
+from ulauncher_toggl_extension.columns import COLUMNS, TrackerColumns
 from ulauncher_toggl_extension.date_time import display_dt, format_seconds, get_local_tz
+from ulauncher_toggl_extension.export import (
+    WRITERS,
+    CSVWriter,
+    TrackerFilter,
+    export_trackers,
+    stream_trackers,
+)
+from ulauncher_toggl_extension.ical import CalendarFeed, month_frames
 from ulauncher_toggl_extension.images import (
     ADD_IMG,
     APP_IMG,
@@ -25,20 +39,29 @@ from ulauncher_toggl_extension.images import (
     DELETE_IMG,
     EDIT_IMG,
     REFRESH_IMG,
+    REPORT_IMG,
     START_IMG,
     STOP_IMG,
     TIP_IMAGES,
     TipSeverity,
 )
+from ulauncher_toggl_extension.importer import ImportCheckpoint, Importer, read_rows
+from ulauncher_toggl_extension.journal import JournalCache
+from ulauncher_toggl_extension.scheduler import Priority, priority
+from ulauncher_toggl_extension.scope import fetch
+from ulauncher_toggl_extension.shards import ShardedCache
 from ulauncher_toggl_extension.utils import get_distance, quote_member
+from ulauncher_toggl_extension.worker import checkpoint
 
-from .meta import ACTION_TYPE, ActionEnum, Command, QueryResults
+from .meta import ACTION_TYPE, ActionEnum, Command, PreviewCost, QueryResults
 from .project import ProjectCommand
 from .tag import TagCommand
 
 if TYPE_CHECKING:
-    from pathlib import Path
+    from collections.abc import Sequence
+    from datetime import date
 
+    from ulauncher_toggl_extension.columns import TrackerRows
     from ulauncher_toggl_extension.query import Query
 
 
@@ -78,9 +101,10 @@ class TrackerCommand(Command[TogglTracker]):
         ]
         if advanced:
             dates = self.format_datetime(model)
+            # NOTE: Running trackers tick locally from their start.
             total_time = (
                 model.duration
-                if isinstance(model.duration, timedelta)
+                if isinstance(model.duration, timedelta) and not model.running()
                 else datetime.now(timezone.utc) - model.start
             )
 
@@ -138,11 +162,56 @@ class TrackerCommand(Command[TogglTracker]):
 
         return path
 
-    def get_models(self, query: Query, **kwargs: Any) -> list[TogglTracker]:
-        """Collects trackers and filters and sorts them for further use."""
+    def get_models(self, query: Query, **kwargs: Any) -> TrackerRows:
+        """Selects, filters and sorts trackers from the columnar store.
+
+        Only falls back to collecting full trackers if refreshing or if the
+        cache file can't be read into columns. Selections are memoized for
+        the rest of the render.
+        """
+        key = (
+            TogglTracker.__tablename__,
+            self.cache_path,
+            self.EXPIRATION,
+            query.id,
+            query.refresh,
+            query.sort_order,
+            query.distinct,
+            *(kwargs.get(k) for k in ("since", "before", "start_date", "end_date")),
+        )
+        return fetch(key, partial(self._select, query, **kwargs))
+
+    def _select(self, query: Query, **kwargs: Any) -> TrackerRows:
+        # NOTE: Only explicit date ranges reach into the cold tier and shards.
+        since = kwargs.get("start_date")
+        until = kwargs.get("before") or kwargs.get("end_date")
+        full = bool(kwargs.get("before"))
+        columns = None if query.refresh else self.columns(since, until, full=full)
+        if columns is None:
+            trackers = self.collect(query, **kwargs)
+            columns = self.columns(
+                since,
+                until,
+                full=full,
+            ) or TrackerColumns.from_models(trackers)
+
+        checkpoint()
+
+        return columns.select(
+            query.id,
+            since=kwargs.get("since"),
+            before=kwargs.get("before"),
+            start_date=kwargs.get("start_date"),
+            end_date=kwargs.get("end_date"),
+            expire_after=self.EXPIRATION,
+            reverse=query.sort_order,
+            distinct=query.distinct,
+        )
+
+    def collect(self, query: Query, **kwargs: Any) -> list[TogglTracker]:
         user = UserEndpoint(self.workspace_id, self.auth, self.cache)
         try:
-            trackers = user.collect(
+            return user.collect(
                 kwargs.get("since"),
                 kwargs.get("before"),
                 kwargs.get("end_date"),
@@ -151,60 +220,67 @@ class TrackerCommand(Command[TogglTracker]):
             )
         except ValueError as err:
             self.handle_error(err)
-            trackers = user.collect(query.refresh)
+            return user.collect(query.refresh)
         except HTTPStatusError as err:
             self.handle_error(err)
-            trackers = user.collect(
+            return user.collect(
                 kwargs.get("since"),
                 kwargs.get("before"),
                 kwargs.get("end_date"),
                 kwargs.get("start_date"),
             )
 
-        if isinstance(query.id, int):
-            trackers.sort(
-                key=lambda x: get_distance(query.id, x.id),
-                reverse=query.sort_order,
-            )
-        elif isinstance(query.id, str):
-            trackers.sort(
-                key=lambda x: get_distance(query.id, x.name),
-                reverse=query.sort_order,
-            )
-        else:
-            trackers.sort(
-                key=lambda x: (x.stop or datetime.now(tz=timezone.utc), x.start),
-                reverse=query.sort_order,
-            )
-
-        if query.distinct:
-            trackers = self._distinct(trackers)
-
-        return trackers
-
-    @staticmethod
-    def _distinct(trackers: list[TogglTracker]) -> list[TogglTracker]:
-        data: list[TogglTracker] = []
-
-        names, projects, tags = set(), set(), set()
-
-        for tracker in trackers:
-            tracker_tags = str(tracker.tags)
-            if (
-                tracker.name in names
-                and tracker.project in projects
-                and tracker_tags in tags
-            ):
-                continue
-            names.add(tracker.name)
-            projects.add(tracker.project)
-            tags.add(tracker_tags)
-
-            data.append(tracker)
+    def columns(
+        self,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        *,
+        full: bool = False,
+    ) -> TrackerColumns | None:
+        """Columnar store of the tracker cache.
+
+        Args:
+            since: Earliest start needed. Older history is loaded from the
+                cold tier and shards if this reaches past the hot window.
+            until: Latest start needed. Shards of later months are skipped.
+            full: Whether to load the complete history up to `until`.
+        """
+        return COLUMNS.get(
+            self.cache_path / f"cache_{TogglTracker.__tablename__}.json",
+            since=since,
+            until=until,
+            full=full,
+        )
 
-        return data
+    def result(
+        self,
+        model: TogglTracker,
+        query: Query,
+        options: dict[str, Any],
+        *,
+        fmt_str: str = "{prefix} {name}",
+    ) -> partial:
+        """Lazily rendered result of a tracker that handles it on enter."""
+        return partial(
+            self.process_model,
+            model,
+            partial(
+                self.call_pickle,
+                method="handle",
+                query=query,
+                model=model,
+                **options,
+            ),
+            fmt_str=fmt_str,
+        )
 
     def get_current_tracker(self, *, refresh: bool = True) -> TogglTracker | None:
+        return fetch(
+            ("current", self.cache_path, refresh),
+            partial(self._current_tracker, refresh=refresh),
+        )
+
+    def _current_tracker(self, *, refresh: bool) -> TogglTracker | None:
         user = UserEndpoint(self.workspace_id, self.auth, self.cache)
         try:
             return user.current(refresh=refresh)
@@ -279,8 +355,8 @@ class TrackerCommand(Command[TogglTracker]):
         return autocomplete
 
     @property
-    def cache(self) -> JSONCache[TogglTracker]:
-        return JSONCache(self.cache_path, self.expiration)
+    def cache(self) -> ShardedCache:
+        return ShardedCache(self.cache_path, self.expiration, window=COLUMNS.window)
 
     def handle(self, query: Query, **kwargs: Any) -> bool | list[QueryResults]:
         handle = super().handle(query, **kwargs)
@@ -302,6 +378,18 @@ class TrackerCommand(Command[TogglTracker]):
         if model_id is None or isinstance(model_id, TogglTracker):
             return model_id
 
+        # NOTE: Checks recent trackers before loading the cold tier.
+        for full in (False, True):
+            columns = None if refresh else self.columns(full=full)
+            if columns is None:
+                break
+            cached = columns.find(
+                model_id,
+                self.expiration if isinstance(model_id, str) else None,
+            )
+            if cached is not None:
+                return cached
+
         endpoint = UserEndpoint(self.workspace_id, self.auth, self.cache)
 
         if isinstance(model_id, str):
@@ -321,23 +409,105 @@ class CurrentTrackerCommand(TrackerCommand):
     EXPIRATION = timedelta(seconds=10)
     ICON = APP_IMG
     OPTIONS = ("refresh",)
+    COST = PreviewCost.CACHE
+    PRIORITY = Priority.INTERACTIVE
+    STATE_FILE: Final[str] = "current_tracker.json"
 
-    __slots__ = ("_tracker", "_ts")
+    __slots__ = ("_lock", "_reconciler", "_refreshing", "_tracker", "_ts")
 
     def __init__(self, *args, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
         self._ts: Optional[datetime] = None
         self._tracker: Optional[TogglTracker] = None
+        self._refreshing = False
+        self._reconciler: Optional[Thread] = None
+        self._lock = Lock()
 
     def get_current_tracker(self, *, refresh: bool = False) -> TogglTracker | None:
-        if (
-            self._ts is None
-            or refresh
-            or datetime.now(timezone.utc) - self.EXPIRATION >= self._ts
-        ):
+        """Retrieves the running tracker.
+
+        The last known tracker is persisted and served right away. Once it
+        is older than EXPIRATION, it is reconciled with the API in the
+        background. Only an explicit refresh or a missing state file waits
+        on the API.
+        """
+        return fetch(
+            ("running", self.cache_path, refresh),
+            partial(self._running_tracker, refresh=refresh),
+        )
+
+    def _running_tracker(self, *, refresh: bool) -> TogglTracker | None:
+        if self._ts is None and not refresh:
+            self.load_state()
+
+        if self._ts is None or refresh:
             self.tracker = super().get_current_tracker(refresh=True)
+        elif datetime.now(timezone.utc) - self.EXPIRATION >= self._ts:
+            self.reconcile()
+
         return self.tracker
 
+    def reconcile(self) -> None:
+        """Refreshes the running tracker from the API in the background."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self._reconciler = Thread(
+                target=self._reconcile,
+                name="toggl-current",
+                daemon=True,
+            )
+            self._reconciler.start()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Waits for a background reconcile. Returns whether it finished."""
+        thread = self._reconciler
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _reconcile(self) -> None:
+        try:
+            with priority(Priority.SYNC):
+                self.tracker = super().get_current_tracker(refresh=True)
+        except Exception:
+            log.exception("Failed to reconcile the running tracker.")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def load_state(self) -> None:
+        path = self.cache_path / self.STATE_FILE
+        try:
+            with path.open("r", encoding="utf-8") as file:
+                data = json.load(file, cls=CustomDecoder)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError):
+            log.exception("Failed to load the running tracker state.")
+            return
+
+        tracker = data.get("tracker")
+        if tracker is not None and not isinstance(tracker, TogglTracker):
+            return
+
+        self._tracker = tracker
+        self._ts = data.get("timestamp")
+
+    def save_state(self) -> None:
+        path = self.cache_path / self.STATE_FILE
+        data = {"timestamp": self._ts, "tracker": self._tracker}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with tmp.open("w", encoding="utf-8") as file:
+                json.dump(data, file, cls=CustomEncoder)
+            tmp.replace(path)
+        except OSError:
+            log.exception("Failed to persist the running tracker state.")
+
     def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
         self.amend_query(query.raw_args)
         tracker = self.get_current_tracker()
@@ -415,9 +585,17 @@ class CurrentTrackerCommand(TrackerCommand):
         return self._tracker
 
     @tracker.setter
-    def tracker(self, tracker: TogglTracker) -> None:
+    def tracker(self, tracker: TogglTracker | None) -> None:
         self._tracker = tracker
         self._ts = datetime.now(timezone.utc)
+        self.save_state()
+
+    def update_tracker(self, tracker: TogglTracker) -> None:
+        """Keeps the persisted running tracker in line with an edited one."""
+        if tracker.running():
+            self.tracker = tracker
+        elif self._tracker is not None and self._tracker.id == tracker.id:
+            self.tracker = None
 
 
 class ListCommand(TrackerCommand):
@@ -448,21 +626,31 @@ class ListCommand(TrackerCommand):
             if kwargs["model"]:
                 return self.handle(query, **kwargs)  # type: ignore[return-value]
 
-        data: list[partial] = kwargs.get("data", [])
+        data: Sequence[partial] = kwargs.get("data", [])
         if not data:
             query.distinct = not query.distinct
-            data = [
-                partial(
-                    self.process_model,
-                    tracker,
-                    f"{self.prefix} {self.PREFIX} :{tracker.id}",
-                    fmt_str="{name}",
-                )
-                for tracker in self.get_models(query, **kwargs)
-            ]
+            data = self.get_models(query, **kwargs).map(
+                partial(self.result, query=query, options=kwargs),
+            )
 
         return self._paginator(query, data, page=kwargs.get("page", 0))
 
+    def result(
+        self,
+        model: TogglTracker,
+        query: Query,
+        options: dict[str, Any],
+        *,
+        fmt_str: str = "{name}",
+    ) -> partial:
+        del query, options
+        return partial(
+            self.process_model,
+            model,
+            f"{self.prefix} {self.PREFIX} :{model.id}",
+            fmt_str=fmt_str,
+        )
+
 
 class ContinueCommand(TrackerCommand):
     """Continue the last or selected tracker."""
@@ -470,7 +658,10 @@ class ContinueCommand(TrackerCommand):
     PREFIX = "continue"
     ALIASES = ("cnt", "restart", "cont")
     ICON = CONTINUE_IMG
+    BACKGROUND = True
+    PRIORITY = Priority.INTERACTIVE
     ESSENTIAL = True
+    COST = PreviewCost.NETWORK
 
     OPTIONS = ("refresh", "distinct", ">", "^-", ":")
 
@@ -504,7 +695,7 @@ class ContinueCommand(TrackerCommand):
         ]
 
     def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
-        data: list[partial] = kwargs.get("data", [])
+        data: Sequence[partial] = kwargs.get("data", [])
         if not self.get_models(query, **kwargs):
             return [
                 QueryResults(
@@ -525,20 +716,9 @@ class ContinueCommand(TrackerCommand):
             ]
 
         if not data:
-            data = [
-                partial(
-                    self.process_model,
-                    tracker,
-                    partial(
-                        self.call_pickle,
-                        method="handle",
-                        query=query,
-                        model=tracker,
-                        **kwargs,
-                    ),
-                )
-                for tracker in self.get_models(query, **kwargs)
-            ]
+            data = self.get_models(query, **kwargs).map(
+                partial(self.result, query=query, options=kwargs),
+            )
 
         return self._paginator(
             query,
@@ -600,6 +780,8 @@ class StartCommand(TrackerCommand):
     PREFIX = "start"
     ALIASES = ("stt", "begin")
     ICON = START_IMG
+    BACKGROUND = True
+    PRIORITY = Priority.INTERACTIVE
     OPTIONS = ("refresh", "distinct", ">", '"', "@", "#")
 
     def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
@@ -621,17 +803,12 @@ class StartCommand(TrackerCommand):
 
     def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
         cmp = self.autocomplete(query, **kwargs)
-        data: list[partial] = kwargs.get("data", [])
+        data: Sequence[partial] = kwargs.get("data", [])
 
         if not data:
-            data = [
-                partial(
-                    self.process_model,
-                    tracker,
-                    self.generate_query(tracker),
-                )
-                for tracker in self.get_models(query, **kwargs)
-            ]
+            data = self.get_models(query, **kwargs).map(
+                partial(self.result, query=query, options=kwargs),
+            )
 
         return self._paginator(
             query,
@@ -640,6 +817,22 @@ class StartCommand(TrackerCommand):
             page=kwargs.get("page", 0),
         )
 
+    def result(
+        self,
+        model: TogglTracker,
+        query: Query,
+        options: dict[str, Any],
+        *,
+        fmt_str: str = "{prefix} {name}",
+    ) -> partial:
+        del query, options
+        return partial(
+            self.process_model,
+            model,
+            self.generate_query(model),
+            fmt_str=fmt_str,
+        )
+
     def generate_query(self, model: TogglTracker) -> str:
         query = f'{self.prefix} {self.PREFIX} "{model.name}"'
         now = datetime.now(tz=get_local_tz())
@@ -685,6 +878,9 @@ class StopCommand(TrackerCommand):
     PREFIX = "stop"
     ALIASES = ("end", "stp")
     ICON = STOP_IMG
+    BACKGROUND = True
+    PRIORITY = Priority.INTERACTIVE
+    COST = PreviewCost.CACHE
     OPTIONS = ("refresh", "distinct", "<")
 
     def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
@@ -778,6 +974,7 @@ class AddCommand(TrackerCommand):
     PREFIX = "add"
     ALIASES = ("create", "insert")
     ICON = ADD_IMG
+    BACKGROUND = True
     OPTIONS = ("refresh", "distinct", ">", '"', "@", "#", "<")
 
     def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
@@ -799,17 +996,12 @@ class AddCommand(TrackerCommand):
 
     def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
         cmp = self.autocomplete(query, **kwargs)
-        data: list[partial] = kwargs.get("data", [])
+        data: Sequence[partial] = kwargs.get("data", [])
 
         if not data:
-            data = [
-                partial(
-                    self.process_model,
-                    tracker,
-                    self.generate_query(tracker),
-                )
-                for tracker in self.get_models(query, **kwargs)
-            ]
+            data = self.get_models(query, **kwargs).map(
+                partial(self.result, query=query, options=kwargs),
+            )
 
         return self._paginator(
             query,
@@ -818,6 +1010,22 @@ class AddCommand(TrackerCommand):
             page=kwargs.get("page", 0),
         )
 
+    def result(
+        self,
+        model: TogglTracker,
+        query: Query,
+        options: dict[str, Any],
+        *,
+        fmt_str: str = "{prefix} {name}",
+    ) -> partial:
+        del query, options
+        return partial(
+            self.process_model,
+            model,
+            self.generate_query(model),
+            fmt_str=fmt_str,
+        )
+
     def generate_query(self, model: TogglTracker) -> str:
         query = f'{self.prefix} {self.PREFIX} "{model.name}"'
         now = datetime.now(tz=get_local_tz())
@@ -864,12 +1072,243 @@ class AddCommand(TrackerCommand):
         return False
 
 
+class ImportCommand(TrackerCommand):
+    """Import trackers from a CSV file."""
+
+    PREFIX = "import"
+    ALIASES = ("imp", "load")
+    ICON = ADD_IMG
+    BACKGROUND = True
+    PRIORITY = Priority.BACKGROUND
+    OPTIONS = ("~",)
+
+    def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        del kwargs
+        self.amend_query(query.raw_args)
+        return [
+            QueryResults(
+                self.ICON,
+                self.PREFIX.title(),
+                self.__doc__,
+                self.get_cmd(),
+            ),
+        ]
+
+    def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        del kwargs
+        self.amend_query(query.raw_args)
+        path = query.path
+        if path is None or not path.is_file():
+            return [
+                QueryResults(
+                    self.ICON,
+                    "Choose a CSV file",
+                    "Add the path of the file starting with '~'.",
+                    ActionEnum.DO_NOTHING,
+                ),
+            ]
+
+        state = ImportCheckpoint.from_cache(self.cache_path, path)
+        description = "Description, start and stop or duration columns required."
+        if state.offset or state.finished:
+            description = f"Resume after {state.offset} imported rows."
+
+        return [
+            QueryResults(
+                self.ICON,
+                f"Import {path.name}",
+                description,
+                partial(self.call_pickle, method="handle", query=query),
+            ),
+        ]
+
+    def handle(self, query: Query, **kwargs: Any) -> bool:
+        del kwargs
+        path = query.path
+        if path is None or not path.is_file():
+            self.notification(msg="Choose an existing CSV file to import!")
+            return False
+
+        importer = Importer(
+            TrackerEndpoint(self.workspace_id, self.auth, self.cache),
+            ProjectEndpoint(self.workspace_id, self.auth, ProjectCommand(self).cache),
+            TagEndpoint(self.workspace_id, self.auth, TagCommand(self).cache),
+            ImportCheckpoint.from_cache(self.cache_path, path),
+        )
+        try:
+            result = importer.run(read_rows(path))
+        except (OSError, UnicodeDecodeError) as err:
+            log.exception("Failed to read %s.", path)
+            self.notification(msg=f"Failed to read {path.name}: {err}")
+            return False
+
+        msg = f"Imported {result.imported} trackers!"
+        if result.invalid:
+            msg += f" Skipped {result.invalid} invalid rows."
+        if result.failed:
+            msg += f" {result.failed} failed, run the import again to resume."
+        self.notification(msg=msg)
+        return result.imported > 0
+
+
+class ExportCommand(TrackerCommand):
+    """Export tracker history from the cache."""
+
+    PREFIX = "export"
+    ALIASES = ("dump", "backup")
+    ICON = REPORT_IMG
+    BACKGROUND = True
+    PRIORITY = Priority.BACKGROUND
+    OPTIONS = ("~", ">", "<", "@", "#", "ics")
+
+    EXPORT_PATH: Final[Path] = Path.home() / ".cache/ulauncher_toggl_extension/export/"
+    FEED: Final[str] = "ics"
+    FEED_RANGE: Final[timedelta] = timedelta(weeks=52)
+
+    def preview(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        del kwargs
+        self.amend_query(query.raw_args)
+        return [
+            QueryResults(
+                self.ICON,
+                self.PREFIX.title(),
+                self.__doc__,
+                self.get_cmd(),
+            ),
+        ]
+
+    def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
+        del kwargs
+        self.amend_query(query.raw_args)
+        target = self.target(query)
+        return [
+            QueryResults(
+                self.ICON,
+                f"Export trackers to {target.name}",
+                f"Saves into {target.parent} without using the network.",
+                partial(self.call_pickle, method="handle", query=query),
+            ),
+        ]
+
+    def target(self, query: Query) -> Path:
+        """File to export into.
+
+        A path with a supported suffix is used as is. Otherwise it is treated
+        as a folder with the report format picking the file type, while
+        calendar feeds keep a fixed name for subscriptions.
+        """
+        path = query.path or self.EXPORT_PATH
+        if path.suffix.lstrip(".") in {*WRITERS, self.FEED}:
+            return path
+        if self.FEED in query.raw_args[2:]:
+            return path / f"trackers.{self.FEED}"
+        suffix = (
+            query.report_format if query.report_format in WRITERS else CSVWriter.SUFFIX
+        )
+        today = datetime.now(tz=get_local_tz()).date()
+        return path / f"{today.isoformat()}_trackers.{suffix}"
+
+    def project_names(self) -> dict[int, str]:
+        """Names of every cached project keyed by id."""
+        names = {}
+        for workspace in self.workspaces:
+            snapshot = self.snapshot(TogglProject, workspace.cache_path)
+            if snapshot is not None and snapshot.models:
+                names.update({p.id: p.name for p in snapshot.models})
+                continue
+            endpoint = ProjectEndpoint(
+                workspace.id,
+                self.auth,
+                JournalCache(workspace.cache_path, ProjectCommand.EXPIRATION),
+            )
+            names.update({p.id: p.name for p in endpoint.load_cache()})
+        return names
+
+    @staticmethod
+    def match_project(
+        project: int | str | None,
+        names: dict[int, str],
+    ) -> Optional[int]:
+        if project is None or isinstance(project, int):
+            return project
+        return next(
+            (i for i, name in names.items() if name.casefold() == project.casefold()),
+            None,
+        )
+
+    def handle(self, query: Query, **kwargs: Any) -> bool:
+        del kwargs
+        names = self.project_names()
+        project = self.match_project(query.project, names)
+        if query.project is not None and project is None:
+            self.notification(msg=f"Project {query.project} doesn't exist!")
+            return False
+
+        # NOTE: Exports include cached trackers however long ago they were fetched.
+        cache = ShardedCache(self.cache_path, window=COLUMNS.window)
+        hot = list(TrackerEndpoint(self.workspace_id, self.auth, cache).load_cache())
+        trackers = stream_trackers(
+            cache.cache_path,
+            hot,
+            since=query.start.date() if query.start else None,
+            until=query.stop.date() if query.stop else None,
+        )
+        select = TrackerFilter(
+            query.start,
+            query.stop,
+            project,
+            frozenset(query.add_tags),
+            frozenset(query.rm_tags),
+        )
+        target = self.target(query)
+        try:
+            if target.suffix == f".{self.FEED}":
+                msg = self.feed(query, target, hot, names, select)
+            else:
+                count = export_trackers(target, trackers, names, select)
+                msg = f"Exported {count} trackers to {target}"
+        except (OSError, ValueError, ModuleNotFoundError) as err:
+            log.exception("Failed to export trackers to %s.", target)
+            self.notification(msg=f"Failed to export trackers: {err}")
+            return False
+
+        self.notification(msg=msg)
+        return True
+
+    def feed(
+        self,
+        query: Query,
+        target: Path,
+        hot: list[TogglTracker],
+        names: dict[int, str],
+        select: TrackerFilter,
+    ) -> str:
+        """Updates the changed months of an iCalendar feed.
+
+        Covers the last year unless a start or stop is given. Takes the same
+        hot trackers as file exports, regardless of their age.
+        """
+        now = datetime.now(timezone.utc)
+        start = query.start or now - self.FEED_RANGE
+        frames = list(month_frames(start.date(), (query.stop or now).date()))
+        rebuilt = CalendarFeed(target).update(
+            self.cache_path / f"cache_{TogglTracker.__tablename__}.json",
+            hot,
+            frames,
+            names,
+            select=select,
+            options=repr(select),
+        )
+        return f"Updated {rebuilt} of {len(frames)} months in {target}"
+
+
 class EditCommand(TrackerCommand):
     """Edit a tracker."""
 
     PREFIX = "edit"
     ALIASES = ("ed", "change", "amend")
     ICON = EDIT_IMG
+    BACKGROUND = True
     ESSENTIAL = True
 
     OPTIONS = ("refresh", "distinct", ">", "<", '"', "@", "#")
@@ -888,25 +1327,13 @@ class EditCommand(TrackerCommand):
 
     def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
         cmp = self.autocomplete(query, **kwargs)
-        data: list[partial] = kwargs.get("data", [])
+        data: Sequence[partial] = kwargs.get("data", [])
 
         if not data:
             query.distinct = not query.distinct
-            data = [
-                partial(
-                    self.process_model,
-                    tracker,
-                    partial(
-                        self.call_pickle,
-                        method="handle",
-                        query=query,
-                        model=tracker,
-                        **kwargs,
-                    ),
-                    self.generate_query(tracker),
-                )
-                for tracker in self.get_models(query, **kwargs)
-            ]
+            data = self.get_models(query, **kwargs).map(
+                partial(self.result, query=query, options=kwargs),
+            )
 
         return self._paginator(
             query,
@@ -915,6 +1342,28 @@ class EditCommand(TrackerCommand):
             page=kwargs.get("page", 0),
         )
 
+    def result(
+        self,
+        model: TogglTracker,
+        query: Query,
+        options: dict[str, Any],
+        *,
+        fmt_str: str = "{prefix} {name}",
+    ) -> partial:
+        return partial(
+            self.process_model,
+            model,
+            partial(
+                self.call_pickle,
+                method="handle",
+                query=query,
+                model=model,
+                **options,
+            ),
+            self.generate_query(model),
+            fmt_str=fmt_str,
+        )
+
     def generate_query(self, model: TogglTracker) -> str:
         query = f'{self.prefix} {self.PREFIX} "{model.name}"'
         if model.project:
@@ -964,6 +1413,7 @@ class EditCommand(TrackerCommand):
         else:
             if tracker is None:
                 return False
+            CurrentTrackerCommand(self).update_tracker(tracker)
             self.notification(msg=f"Changed tracker {tracker.name}!")
             return True
 
@@ -976,6 +1426,7 @@ class DeleteCommand(TrackerCommand):
     PREFIX = "delete"
     ALIASES = ("rm", "del", "remove")
     ICON = DELETE_IMG
+    BACKGROUND = True
     ESSENTIAL = True
     OPTIONS = ("refresh", "distinct", ":")
 
@@ -992,24 +1443,13 @@ class DeleteCommand(TrackerCommand):
         ]
 
     def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
-        data: list[partial] = kwargs.get("data", [])
+        data: Sequence[partial] = kwargs.get("data", [])
 
         if not data:
             query.distinct = not query.distinct
-            data = [
-                partial(
-                    self.process_model,
-                    tracker,
-                    partial(
-                        self.call_pickle,
-                        method="handle",
-                        query=query,
-                        model=tracker,
-                        **kwargs,
-                    ),
-                )
-                for tracker in self.get_models(query, **kwargs)
-            ]
+            data = self.get_models(query, **kwargs).map(
+                partial(self.result, query=query, options=kwargs),
+            )
 
         return self._paginator(query, data, page=kwargs.get("page", 0))
 
@@ -1053,25 +1493,13 @@ class RefreshCommand(TrackerCommand):
         return []
 
     def view(self, query: Query, **kwargs: Any) -> list[QueryResults]:
-        data: list[partial] = kwargs.get("data", [])
+        data: Sequence[partial] = kwargs.get("data", [])
         if not data:
             query.distinct = not query.distinct
 
-            data = [
-                partial(
-                    self.process_model,
-                    tracker,
-                    partial(
-                        self.call_pickle,
-                        method="handle",
-                        query=query,
-                        model=tracker,
-                        **kwargs,
-                    ),
-                    fmt_str="{name}",
-                )
-                for tracker in self.get_models(query, **kwargs)
-            ]
+            data = self.get_models(query, **kwargs).map(
+                partial(self.result, query=query, options=kwargs, fmt_str="{name}"),
+            )
 
         return self._paginator(query, data, page=kwargs.get("page", 0))
 
@@ -0,0 +1,412 @@
+"""Retention rules and compaction of the cache directory.
+
+Superseded records, generated icons of removed projects, old reports and
+files derived from caches that no longer exist would otherwise pile up in
+the cache directory forever. Compaction applies a retention policy to all of
+them, rewrites the cache files without the dropped records and moves closed
+months of tracker history into shards. Workspace namespaces below the cache
+directory are compacted the same way.
+
+Classes:
+    RetentionPolicy: What to keep in the cache directory.
+    CompactionReport: How much a compaction run reclaimed.
+    Compactor: Runs compaction in the background once the extension is idle.
+
+Functions:
+    compact: Applies a retention policy to a cache directory.
+
+Examples:
+    >>> report = compact(Path("cache"), RetentionPolicy(timedelta(weeks=4)))
+    >>> report.records
+    42
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Optional
+
+from toggl_api.utility import parse_iso
+
+from ulauncher_toggl_extension.codec import dumps, loads
+from ulauncher_toggl_extension.columns import COLUMNS
+from ulauncher_toggl_extension.journal import checkpoint
+from ulauncher_toggl_extension.shards import TrackerShards, archive
+from ulauncher_toggl_extension.snapshot import cache_stamp
+from ulauncher_toggl_extension.worker import IdleTimer
+from ulauncher_toggl_extension.workspaces import NAMESPACE
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from ulauncher_toggl_extension.extension import TogglExtension
+
+log = logging.getLogger(__name__)
+
+
+DERIVED_SUFFIXES: Final[tuple[str, ...]] = (
+    ".snapshot",
+    ".cold",
+    ".journal",
+    ".validators",
+)
+REBUILT_SUFFIXES: Final[frozenset[str]] = frozenset((".snapshot", ".cold", ".svg"))
+STALE_TMP: Final[timedelta] = timedelta(hours=1)
+TRACKER_CACHE: Final[str] = "cache_tracker.json"
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Rules deciding what stays in the cache directory.
+
+    Attributes:
+        max_age: Stopped trackers not modified and reports not written
+            within this period are dropped. Tracker history is kept forever
+            by default. Projects, tags, clients and running trackers are
+            never dropped by age.
+        max_size: Size in bytes the whole directory is trimmed to. Files
+            that are rebuilt on demand go first, then the oldest reports,
+            the oldest shards and finally the oldest stopped trackers. Not
+            enforced by default.
+        orphans: Whether to remove icons of projects that no longer exist
+            and files derived from caches that were removed.
+    """
+
+    max_age: Optional[timedelta] = field(default=None)
+    max_size: Optional[int] = field(default=None)
+    orphans: bool = field(default=True)
+
+
+@dataclass
+class CompactionReport:
+    """Summary of a compaction run.
+
+    Attributes:
+        files: Amount of files rewritten or removed.
+        records: Amount of cached records dropped.
+        size: Bytes reclaimed on disk.
+    """
+
+    files: int = field(default=0)
+    records: int = field(default=0)
+    size: int = field(default=0)
+
+    def __str__(self) -> str:
+        return (
+            f"Reclaimed {self.size / 1024:.1f} KiB and {self.records} records "
+            f"across {self.files} files."
+        )
+
+
+def compact(path: Path, policy: RetentionPolicy) -> CompactionReport:
+    """Applies a retention policy to a cache directory.
+
+    Journals are checkpointed first and cache files are then rewritten
+    compactly and atomically. A cache file that is modified while being
+    compacted is skipped and handled on the next run. Afterwards closed
+    months are moved into shards, which are dropped as a whole once their
+    month expired. Workspace namespaces are compacted alongside the root.
+
+    Args:
+        path: Cache directory to compact.
+        policy: Retention rules to apply.
+
+    Returns:
+        CompactionReport: What was reclaimed.
+    """
+    report = CompactionReport()
+    if not path.is_dir():
+        return report
+
+    cutoff = (
+        datetime.now(timezone.utc) - policy.max_age
+        if policy.max_age is not None
+        else None
+    )
+    namespaces = path / NAMESPACE
+    for folder in (
+        path,
+        *sorted(f for f in namespaces.glob("*") if f.is_dir()),
+    ):
+        _compact_namespace(folder, cutoff, policy, report)
+
+    reports = sorted(
+        (f for f in (path / "report").glob("*") if f.is_file()),
+        key=lambda f: f.stat().st_mtime,
+    )
+    if cutoff is not None:
+        expired = [f for f in reports if f.stat().st_mtime < cutoff.timestamp()]
+        _remove(expired, report)
+        reports = reports[len(expired) :]
+
+    if policy.max_size is not None:
+        _enforce_size(path, policy.max_size, reports, report)
+
+    return report
+
+
+def _compact_namespace(
+    path: Path,
+    cutoff: Optional[datetime],
+    policy: RetentionPolicy,
+    report: CompactionReport,
+) -> None:
+    for cache_file in sorted(path.glob("cache_*.json")):
+        _compact_cache(cache_file, cutoff, report)
+
+    try:
+        archive(path / TRACKER_CACHE, COLUMNS.window)
+    except (OSError, ValueError, KeyError):
+        log.exception("Failed to move closed trackers of %s into shards.", path)
+
+    shards = TrackerShards(path / TRACKER_CACHE)
+    if cutoff is not None:
+        _remove(shards.select(until=_previous_month(cutoff.date())), report)
+
+    if policy.orphans:
+        _remove_orphans(path, report)
+
+
+def _previous_month(day: date) -> date:
+    return (day.replace(day=1) - timedelta(days=1)).replace(day=1)
+
+
+def _keep(entry: dict[str, Any], cutoff: Optional[datetime]) -> bool:
+    if cutoff is None or not entry.get("timestamp"):
+        return True
+    # NOTE: Reference models are served from the cache without refreshing.
+    if entry.get("class") != "tracker" or entry.get("stop") is None:
+        return True
+    return parse_iso(entry["timestamp"]) >= cutoff  # type: ignore[operator]
+
+
+def _latest(entries: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    latest: dict[Any, dict[str, Any]] = {}
+    for entry in entries:
+        key = entry.get("id")
+        existing = latest.get(key)
+        if existing is None or entry.get("timestamp", "") >= existing.get(
+            "timestamp",
+            "",
+        ):
+            latest[key] = entry
+    return list(latest.values())
+
+
+def _compact_cache(
+    cache_file: Path,
+    cutoff: Optional[datetime],
+    report: CompactionReport,
+    trim: int = 0,
+) -> None:
+    try:
+        checkpoint(cache_file)
+    except (OSError, ValueError, KeyError):
+        log.exception("Failed to checkpoint the journal of %s.", cache_file)
+        return
+
+    stamp = cache_stamp(cache_file)
+    if stamp is None:
+        return
+
+    try:
+        data = loads(cache_file.read_bytes())
+        entries: list[dict[str, Any]] = data["data"]
+    except (OSError, ValueError, KeyError):
+        log.exception("Skipping compaction of unreadable cache %s.", cache_file)
+        return
+
+    kept = [e for e in _latest(entries) if _keep(e, cutoff)]
+    if trim:
+        # NOTE: Trims the oldest stopped trackers first.
+        stopped = sorted(
+            (e for e in kept if e.get("stop") is not None),
+            key=lambda e: e.get("start") or "",
+        )
+        dropped = {id(e) for e in stopped[:trim]}
+        kept = [e for e in kept if id(e) not in dropped]
+
+    data["data"] = kept
+    payload = dumps(data)
+    if len(kept) == len(entries) and len(payload) >= stamp[1]:
+        return
+
+    tmp = cache_file.with_suffix(".compact.tmp")
+    tmp.write_bytes(payload)
+    if cache_stamp(cache_file) != stamp:
+        log.info("Cache %s changed during compaction. Skipping.", cache_file)
+        tmp.unlink(missing_ok=True)
+        return
+    tmp.replace(cache_file)
+
+    report.files += 1
+    report.records += len(entries) - len(kept)
+    report.size += stamp[1] - len(payload)
+
+
+def _remove(files: Iterable[Path], report: CompactionReport) -> None:
+    for file in files:
+        try:
+            size = file.stat().st_size
+            file.unlink()
+        except OSError:
+            log.exception("Failed to remove %s.", file)
+            continue
+        report.files += 1
+        report.size += size
+
+
+def _project_colors(path: Path) -> set[str] | None:
+    try:
+        data = loads((path / "cache_project.json").read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        log.exception("Failed to read project colors from %s.", path)
+        return None
+    return {p["color"] for p in data.get("data", []) if p.get("color")}
+
+
+def _remove_orphans(path: Path, report: CompactionReport) -> None:
+    colors = _project_colors(path)
+    if colors is not None:
+        _remove(
+            (f for f in (path / "svg").glob("*.svg") if f.stem not in colors),
+            report,
+        )
+
+    orphans = [
+        f
+        for suffix in DERIVED_SUFFIXES
+        for f in path.glob(f"cache_*{suffix}")
+        if not f.with_suffix(".json").exists()
+    ]
+    stale = time.time() - STALE_TMP.total_seconds()
+    orphans.extend(f for f in path.glob("*.tmp") if f.stat().st_mtime < stale)
+    _remove(orphans, report)
+
+
+def _drop_oldest(
+    files: list[Path],
+    total: int,
+    max_size: int,
+    report: CompactionReport,
+) -> int:
+    while total > max_size and files:
+        oldest = files.pop(0)
+        size = oldest.stat().st_size
+        _remove([oldest], report)
+        total -= size
+    return total
+
+
+def _enforce_size(
+    path: Path,
+    max_size: int,
+    reports: list[Path],
+    report: CompactionReport,
+) -> None:
+    files = [f for f in path.rglob("*") if f.is_file()]
+    total = sum(f.stat().st_size for f in files)
+
+    # NOTE: Snapshots, cold tiers and icons are rebuilt when next needed.
+    rebuilt = sorted(
+        (f for f in files if f.suffix in REBUILT_SUFFIXES),
+        key=lambda f: f.stat().st_mtime,
+    )
+    total = _drop_oldest(rebuilt, total, max_size, report)
+    total = _drop_oldest(reports, total, max_size, report)
+    shards = TrackerShards(path / TRACKER_CACHE).select()
+    total = _drop_oldest(shards, total, max_size, report)
+
+    tracker_cache = path / TRACKER_CACHE
+    if total <= max_size or not tracker_cache.exists():
+        return
+
+    count = len(loads(tracker_cache.read_bytes()).get("data", []))
+    if not count:
+        return
+
+    size = tracker_cache.stat().st_size
+    excess = total - max_size
+    trim = min(count, -(-excess * count // size))
+    log.info("Cache exceeds %s bytes. Trimming %s trackers.", max_size, trim)
+    _compact_cache(tracker_cache, None, report, trim)
+
+
+class Compactor:
+    """Compacts the cache directory in the background once idle.
+
+    Every query pushes the idle deadline of a single long lived timer thread
+    back. Once no query arrived for the idle period a compaction run is
+    queued on the job executor, so it never overlaps with bulk commands or
+    holds up interactive actions. Runs happen at most once per interval.
+
+    Methods:
+        touch: Registers activity and reschedules the idle run.
+        run: Compacts the cache directory right away.
+
+    Attributes:
+        extension: Extension the cache location comes from.
+        policy: Retention rules to apply.
+        idle: How long the extension has to be idle before compacting.
+        interval: Minimum time between compaction runs.
+        report: Summary of the last compaction run.
+    """
+
+    IDLE: Final[timedelta] = timedelta(minutes=2)
+    INTERVAL: Final[timedelta] = timedelta(hours=12)
+
+    __slots__ = (
+        "_idle",
+        "_last_run",
+        "extension",
+        "idle",
+        "interval",
+        "policy",
+        "report",
+    )
+
+    def __init__(
+        self,
+        extension: TogglExtension,
+        policy: Optional[RetentionPolicy] = None,
+        idle: Optional[timedelta] = None,
+        interval: Optional[timedelta] = None,
+    ) -> None:
+        self.extension = extension
+        self.policy = policy or RetentionPolicy()
+        self.idle = idle or self.IDLE
+        self.interval = interval or self.INTERVAL
+        self.report: Optional[CompactionReport] = None
+        self._last_run: Optional[float] = None
+        self._idle = IdleTimer(self._on_idle, self.idle, "toggl-compaction")
+
+    def touch(self) -> None:
+        self._idle.touch()
+
+    def _on_idle(self) -> None:
+        if (
+            self._last_run is not None
+            and time.monotonic() - self._last_run < self.interval.total_seconds()
+        ):
+            return
+        self.extension.jobs.submit(self.run)
+
+    def run(self) -> CompactionReport:
+        self._last_run = time.monotonic()
+        try:
+            report = compact(Path(self.extension.cache_path), self.policy)
+        except Exception:
+            log.exception("Failed to compact the cache.")
+            return CompactionReport()
+
+        self.report = report
+        log.info("Compacted the cache. %s", report)
+        if report.records:
+            self.extension.invalidate()
+        return report
@@ -0,0 +1,226 @@
+"""Conditional refreshes of rarely changing models.
+
+Refreshing projects, tags and clients downloads their complete lists, even
+though they hardly ever change. The validators of the last refresh are kept
+next to the cache file and sent along with the next one:
+
+- `ETag` and `Last-Modified` headers are replayed as `If-None-Match` and
+    `If-Modified-Since`.
+- Endpoints supporting `since` only request the models changed after the
+    previous refresh, which are then journaled into the cache.
+- A digest of the response body detects unchanged lists the API sent in
+    full anyway.
+
+An unchanged response only records when the cache was validated, so the
+cache file itself is neither downloaded nor rewritten.
+
+Classes:
+    Validators: Validators of the last refresh of a cache file.
+
+Functions:
+    conditional_collect: Refreshes models with a conditional request.
+
+Attributes:
+    SUFFIX: Suffix of the validator file next to a cache file.
+    FULL_SYNC: Maximum age of the last full refresh for `since` requests.
+    CLOCK_SKEW: Overlap of `since` requests to cover clock differences.
+
+Examples:
+    >>> endpoint = ProjectEndpoint(231231, BasicAuth(...), JournalCache(...))
+    >>> conditional_collect(endpoint, since=True)
+    [TogglProject(...), ...]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, fields
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Final, Optional, TypeVar, cast
+
+from httpx import HTTPStatusError, Response, codes
+from toggl_api.meta import RequestMethod
+from toggl_api.models import TogglClass
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from toggl_api.meta.cached_endpoint import TogglCachedEndpoint
+
+log = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=TogglClass)
+
+SUFFIX: Final[str] = ".validators"
+FULL_SYNC: Final[timedelta] = timedelta(days=30)
+CLOCK_SKEW: Final[timedelta] = timedelta(minutes=1)
+
+
+@dataclass
+class Validators:
+    """Validators of the last refresh of a cache file.
+
+    Attributes:
+        etag: `ETag` header of the last full response.
+        last_modified: `Last-Modified` header of the last full response.
+        digest: SHA1 of the last full response body.
+        count: Amount of models cached after the last refresh. Validators
+            are ignored if the cache no longer matches it.
+        since: Unix timestamp the last refresh started at.
+        synced: Unix timestamp the last full refresh started at.
+        checked: Unix timestamp the cache was last confirmed to be current.
+    """
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    digest: Optional[str] = None
+    count: int = 0
+    since: Optional[int] = None
+    synced: Optional[int] = None
+    checked: Optional[int] = None
+
+    @staticmethod
+    def path(cache_file: Path) -> Path:
+        return cache_file.with_suffix(SUFFIX)
+
+    @classmethod
+    def load(cls, cache_file: Path) -> Validators:
+        try:
+            with cls.path(cache_file).open("r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError):
+            log.exception("Failed to load the validators of %s.", cache_file)
+            return cls()
+
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+    def save(self, cache_file: Path) -> None:
+        path = self.path(cache_file)
+        tmp = path.with_suffix(f"{SUFFIX}.tmp")
+        try:
+            with tmp.open("w", encoding="utf-8") as file:
+                json.dump(asdict(self), file)
+            tmp.replace(path)
+        except OSError:
+            log.exception("Failed to save the validators of %s.", cache_file)
+
+    def headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha1(content).hexdigest()  # noqa: S324
+
+
+def _apply_changes(
+    endpoint: TogglCachedEndpoint[M],
+    cached: list[M],
+    data: list[dict[str, Any]],
+) -> list[M]:
+    # NOTE: Deleted models are only reported through their deletion stamp.
+    deleted = {d["id"] for d in data if d.get("server_deleted_at")}
+    changed = endpoint.process_models(
+        [d for d in data if not d.get("server_deleted_at")],
+    )
+    removed = [model for model in cached if model.id in deleted]
+
+    if changed:
+        endpoint.cache.save_cache(changed, RequestMethod.PUT)
+    if removed:
+        endpoint.cache.delete_entries(removed)
+        endpoint.cache.commit()
+    return list(endpoint.load_cache()) if changed or removed else cached
+
+
+def conditional_collect(
+    endpoint: TogglCachedEndpoint[M],
+    *,
+    since: bool = False,
+) -> list[M]:
+    """Refreshes models, only downloading and saving them if they changed.
+
+    Validators are only used while the cache still holds the models of the
+    last refresh. Otherwise, or once the last full refresh is older than
+    `FULL_SYNC`, everything is fetched again.
+
+    Args:
+        endpoint: Endpoint listing every model with a plain GET request.
+        since: Whether the endpoint accepts a `since` parameter that lists
+            models changed after a unix timestamp, including deleted ones.
+
+    Raises:
+        HTTPStatusError: If the API responds with an error.
+
+    Returns:
+        list: The cached models, updated if the API reported changes.
+    """
+    cache_file = endpoint.cache.cache_path
+    previous = Validators.load(cache_file)
+    cached = list(endpoint.load_cache())
+    valid = bool(cached) and previous.count == len(cached)
+
+    started = int(time.time() - CLOCK_SKEW.total_seconds())
+    incremental = (
+        since
+        and valid
+        and previous.since is not None
+        and previous.synced is not None
+        and started - previous.synced < FULL_SYNC.total_seconds()
+    )
+    headers = {**endpoint.HEADERS, **(previous.headers() if valid else {})}
+    try:
+        response = cast(
+            Response,
+            endpoint.request(
+                f"?since={previous.since}" if incremental else "",
+                headers=headers,
+                refresh=True,
+                raw=True,
+            ),
+        )
+    except HTTPStatusError as err:
+        if not incremental or err.response.status_code != codes.BAD_REQUEST:
+            raise
+        log.warning("Rejected changes since %s. Refreshing fully.", previous.since)
+        Validators().save(cache_file)
+        return conditional_collect(endpoint, since=since)
+
+    name = cast("type[TogglClass]", endpoint.MODEL).__tablename__
+    if response.status_code == codes.NOT_MODIFIED:
+        log.info("Cached %s are current.", name)
+        previous.checked = started
+        previous.save(cache_file)
+        return cached
+
+    data = response.json() or []
+    digest = None if incremental else _digest(response.content)
+    if incremental:
+        models = _apply_changes(endpoint, cached, data)
+    elif valid and digest == previous.digest:
+        log.info("Cached %s are unchanged.", name)
+        models = cached
+    else:
+        models = endpoint.process_models(data)
+        endpoint.cache.save_cache(models, RequestMethod.GET)
+
+    Validators(
+        etag=response.headers.get("ETag") or previous.etag,
+        last_modified=response.headers.get("Last-Modified") or previous.last_modified,
+        digest=digest or previous.digest,
+        count=len(models),
+        since=started,
+        synced=previous.synced if incremental else started,
+        checked=started,
+    ).save(cache_file)
+    return models
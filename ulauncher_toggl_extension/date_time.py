@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import enum
+import re
 from calendar import monthrange
 from dataclasses import dataclass, field
-from datetime import date, datetime, timedelta, timezone
-from functools import cache
+from datetime import date, datetime, time, timedelta, timezone
+from functools import cache, lru_cache
 from typing import Final
 
 NOON: Final[int] = 12
@@ -55,6 +56,37 @@ DT_FORMATS: Final[tuple[str, ...]] = (
     "%dT%I:%M %p",
 )
 
+DT_SHAPE = tuple[bool, bool, int, bool]
+"""Structure of a datetime string: date separator, time separator, colons, meridiem."""
+
+
+def _format_shape(fmt: str) -> DT_SHAPE:
+    return "-" in fmt, "T" in fmt, fmt.count(":"), "%p" in fmt
+
+
+def _text_shape(ts_text: str) -> DT_SHAPE:
+    # NOTE: strptime matches literals case insensitively, so a lowercase 't'
+    # is still a valid date & time separator.
+    upper = ts_text.upper()
+    return (
+        "-" in ts_text,
+        "T" in upper,
+        ts_text.count(":"),
+        upper.endswith(("AM", "PM")),
+    )
+
+
+def _group_formats() -> dict[DT_SHAPE, tuple[str, ...]]:
+    groups: dict[DT_SHAPE, list[str]] = {}
+    for fmt in DT_FORMATS:
+        groups.setdefault(_format_shape(fmt), []).append(fmt)
+    return {shape: tuple(fmts) for shape, fmts in groups.items()}
+
+
+DT_SHAPES: Final[dict[DT_SHAPE, tuple[str, ...]]] = _group_formats()
+
+CLOCK_PATTERN: Final[re.Pattern[str]] = re.compile(r"([01]?\d|2[0-3]):([0-5]?\d)")
+
 TIME_SUFFIX: Final[dict[str, str]] = {
     "h": "hours",
     "m": "minutes",
@@ -94,9 +126,26 @@ def parse_timedelta(ts_text: str) -> timedelta:
     raise ValueError(msg)
 
 
+@lru_cache(256)
+def _parse_clock(ts_text: str) -> time | None:
+    match = CLOCK_PATTERN.fullmatch(ts_text)
+    if match is None:
+        return None
+    return time(int(match[1]), int(match[2]))
+
+
 def parse_datetime(ts_text: str) -> datetime:
-    """Utility to parse various dateformats into datetime objects."""
-    for fmt in DT_FORMATS:
+    """Utility to parse various dateformats into datetime objects.
+
+    Classifies the structure of the text first in order to only try formats
+    that could possibly match. Plain *HH:MM* times skip `strptime` completely.
+    """
+    clock = _parse_clock(ts_text)
+    if clock is not None:
+        today = date.today()  # noqa: DTZ011
+        return datetime.combine(today, clock, tzinfo=get_local_tz())
+
+    for fmt in DT_SHAPES.get(_text_shape(ts_text), ()):
         try:
             dt = datetime.strptime(ts_text, fmt)  # noqa: DTZ007
         except ValueError:
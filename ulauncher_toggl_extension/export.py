@@ -0,0 +1,323 @@
+"""Streaming export of tracker history straight from the local cache.
+
+Trackers are read a monthly shard at a time followed by the hot tracker
+cache, filtered and written out immediately. Memory stays bound by a single
+month of history no matter how many years are exported and the Toggl API is
+never contacted.
+
+Uses `pyarrow` for Parquet files if it is installed.
+
+Classes:
+    TrackerFilter: Date range, project and tag filters.
+    ExportWriter: Base of the file format writers.
+    CSVWriter: Writes comma separated rows.
+    JSONLinesWriter: Writes a JSON object per line.
+    ParquetWriter: Writes row groups of a Parquet file.
+
+Functions:
+    stream_trackers: Yields cached trackers oldest month first.
+    export_trackers: Writes filtered trackers into a file.
+
+Attributes:
+    FIELDS: Columns of every exported tracker.
+    WRITERS: Writers keyed by the file suffix they handle.
+
+Examples:
+    >>> trackers = stream_trackers(cache_file, hot_trackers, since=date(2023, 1, 1))
+    >>> export_trackers(Path("history.jsonl"), trackers, projects)
+    4812
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, ClassVar, Final, Optional
+
+from ulauncher_toggl_extension.shards import TrackerShards
+from ulauncher_toggl_extension.worker import checkpoint
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+    from io import TextIOWrapper
+    from pathlib import Path
+    from types import TracebackType
+
+    from toggl_api import TogglTracker
+    from typing_extensions import Self
+
+log = logging.getLogger(__name__)
+
+
+FIELDS: Final[tuple[str, ...]] = (
+    "id",
+    "description",
+    "start",
+    "stop",
+    "duration",
+    "project_id",
+    "project",
+    "tags",
+    "workspace_id",
+)
+
+
+@dataclass
+class TrackerFilter:
+    """Filters applied to trackers while they are streamed.
+
+    Attributes:
+        start: Earliest start of a tracker.
+        stop: Latest start of a tracker.
+        project: Id of the project trackers have to belong to.
+        include: Tag names every tracker needs.
+        exclude: Tag names no tracker may have.
+    """
+
+    start: Optional[datetime] = None
+    stop: Optional[datetime] = None
+    project: Optional[int] = None
+    include: frozenset[str] = field(default_factory=frozenset)
+    exclude: frozenset[str] = field(default_factory=frozenset)
+
+    def __call__(self, tracker: TogglTracker) -> bool:
+        if self.start is not None and tracker.start < self.start:
+            return False
+        if self.stop is not None and tracker.start > self.stop:
+            return False
+        if self.project is not None and tracker.project != self.project:
+            return False
+        if not self.include and not self.exclude:
+            return True
+        tags = {tag.name for tag in tracker.tags}
+        return self.include <= tags and not self.exclude & tags
+
+
+def stream_trackers(
+    cache_file: Path,
+    hot: Iterable[TogglTracker],
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+) -> Iterator[TogglTracker]:
+    """Yields cached trackers without touching the network.
+
+    Shards are decoded one at a time, oldest first, and the hot trackers
+    follow once the shards ran out. Trackers present in both are taken from
+    the hot cache, as it always holds the latest version.
+
+    Args:
+        cache_file: Tracker cache file the shards belong to.
+        hot: Trackers loaded from the tracker cache itself.
+        since: Skips shards of months before this date.
+        until: Skips shards of months after this date.
+
+    Yields:
+        TogglTracker: Cached trackers, sorted by start within every month.
+    """
+    recent = sorted(hot, key=lambda t: t.start)
+    ids = {tracker.id for tracker in recent}
+
+    shards = TrackerShards(cache_file)
+    for shard in shards.select(since, until):
+        checkpoint()
+        for tracker in shards.load(shard):
+            if tracker.id not in ids:
+                yield tracker
+
+    yield from recent
+
+
+def _duration(tracker: TogglTracker) -> Optional[int]:
+    if isinstance(tracker.duration, timedelta):
+        return int(tracker.duration.total_seconds())
+    return None
+
+
+def _iso(value: datetime | str | None) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _record(tracker: TogglTracker, projects: Mapping[int, str]) -> dict[str, Any]:
+    return {
+        "id": tracker.id,
+        "description": tracker.name,
+        "start": _iso(tracker.start),
+        "stop": _iso(tracker.stop),
+        "duration": _duration(tracker),
+        "project_id": tracker.project,
+        "project": projects.get(tracker.project) if tracker.project else None,
+        "tags": [tag.name for tag in tracker.tags],
+        "workspace_id": tracker.workspace,
+    }
+
+
+class ExportWriter(ABC):
+    """Writes exported records into a file.
+
+    Methods:
+        write: Writes a single record. Abstract.
+        close: Flushes anything buffered and closes the file.
+    """
+
+    SUFFIX: ClassVar[str]
+
+    __slots__ = ("file",)
+
+    def __init__(self, path: Path) -> None:
+        self.file: TextIOWrapper = path.open("w", encoding="utf-8", newline="")
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    @abstractmethod
+    def write(self, record: dict[str, Any]) -> None:
+        """Writes a single exported tracker."""
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class CSVWriter(ExportWriter):
+    """Comma separated rows with a header and comma joined tags."""
+
+    SUFFIX = "csv"
+
+    __slots__ = ("writer",)
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        self.writer = csv.DictWriter(self.file, FIELDS)
+        self.writer.writeheader()
+
+    def write(self, record: dict[str, Any]) -> None:
+        self.writer.writerow({**record, "tags": ",".join(record["tags"])})
+
+
+class JSONLinesWriter(ExportWriter):
+    """A single JSON object per line."""
+
+    SUFFIX = "jsonl"
+
+    __slots__ = ()
+
+    def write(self, record: dict[str, Any]) -> None:
+        self.file.write(json.dumps(record, separators=(",", ":")))
+        self.file.write("\n")
+
+
+class ParquetWriter(ExportWriter):
+    """Parquet file written in row groups of `ROW_GROUP` trackers."""
+
+    SUFFIX = "parquet"
+    ROW_GROUP: Final[int] = 10_000
+
+    __slots__ = ("buffer", "writer")
+
+    def __init__(self, path: Path) -> None:
+        if pa is None:
+            msg = "Parquet exports require pyarrow to be installed."
+            raise ModuleNotFoundError(msg)
+
+        self.buffer: list[dict[str, Any]] = []
+        self.writer = pq.ParquetWriter(str(path), self.schema())
+
+    @staticmethod
+    def schema() -> Any:
+        return pa.schema(
+            [
+                ("id", pa.int64()),
+                ("description", pa.string()),
+                ("start", pa.string()),
+                ("stop", pa.string()),
+                ("duration", pa.int64()),
+                ("project_id", pa.int64()),
+                ("project", pa.string()),
+                ("tags", pa.list_(pa.string())),
+                ("workspace_id", pa.int64()),
+            ],
+        )
+
+    def write(self, record: dict[str, Any]) -> None:
+        self.buffer.append(record)
+        if len(self.buffer) >= self.ROW_GROUP:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            table = pa.Table.from_pylist(self.buffer, schema=self.writer.schema)
+            self.writer.write_table(table)
+            self.buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+
+WRITERS: Final[dict[str, type[ExportWriter]]] = {
+    writer.SUFFIX: writer for writer in (CSVWriter, JSONLinesWriter, ParquetWriter)
+}
+
+
+def export_trackers(
+    path: Path,
+    trackers: Iterable[TogglTracker],
+    projects: Mapping[int, str],
+    select: Optional[TrackerFilter] = None,
+) -> int:
+    """Writes trackers into a file in the format of its suffix.
+
+    The file is written next to the target and only moved in place once
+    complete, so a cancelled export never leaves a truncated file behind.
+
+    Args:
+        path: File to write. The suffix picks the writer.
+        trackers: Trackers to export, usually from `stream_trackers`.
+        projects: Project names keyed by their ids.
+        select: Filters a tracker has to pass.
+
+    Raises:
+        ValueError: If there is no writer for the suffix.
+        ModuleNotFoundError: If the writer needs a missing dependency.
+
+    Returns:
+        int: Amount of trackers exported.
+    """
+    writer = WRITERS.get(path.suffix.lstrip("."))
+    if writer is None:
+        msg = f"Can't export trackers into '{path.suffix}' files."
+        raise ValueError(msg)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f"{path.suffix}.tmp")
+    count = 0
+    try:
+        with writer(tmp) as output:
+            for tracker in trackers:
+                if select is None or select(tracker):
+                    output.write(_record(tracker, projects))
+                    count += 1
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    tmp.replace(path)
+    log.info("Exported %s trackers to %s.", count, path)
+    return count
@@ -1,10 +1,13 @@
 # ruff: noqa: E402
 from __future__ import annotations
 
+import copy
 import logging
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import TYPE_CHECKING, Callable, Final, Iterable, Optional, cast
+from typing import TYPE_CHECKING, Any, Callable, Final, Iterable, Optional, cast
 
 from ulauncher.api.client.EventListener import EventListener
 from ulauncher.api.client.Extension import Extension
@@ -27,6 +30,7 @@ from ulauncher.api.shared.event import (
 )
 from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
 from ulauncher.api.shared.item.ExtensionSmallResultItem import ExtensionSmallResultItem
+from ulauncher.api.shared.Response import Response
 from ulauncher.utils.fuzzy_search import get_score
 
 from ulauncher_toggl_extension.commands import (
@@ -40,6 +44,7 @@ from ulauncher_toggl_extension.commands import (
     EditCommand,
     HelpCommand,
     ListCommand,
+    PreviewCost,
     ProjectCommand,
     QueryResults,
     RefreshCommand,
@@ -47,8 +52,18 @@ from ulauncher_toggl_extension.commands import (
     StartCommand,
     StopCommand,
     TagCommand,
+    routing_table,
 )
+from ulauncher_toggl_extension.compaction import Compactor
+from ulauncher_toggl_extension.images import APP_IMG, TIP_IMAGES, TipSeverity
+from ulauncher_toggl_extension.prefetch import Prefetcher
 from ulauncher_toggl_extension.query import Query, QueryParser
+from ulauncher_toggl_extension.render import PreviewRenderer, PreviewTask, ResultCache
+from ulauncher_toggl_extension.scheduler import Priority
+from ulauncher_toggl_extension.scope import RenderScope, bind
+from ulauncher_toggl_extension.utils import show_notification
+from ulauncher_toggl_extension.webhook import WebhookReceiver
+from ulauncher_toggl_extension.worker import QueryWorker, checkpoint
 
 from .preferences import (
     PreferencesEventListener,
@@ -68,6 +83,10 @@ class TogglExtension(Extension):
     Methods:
         process_query: Processes query and returns results to be displayed
             inside the launcher.
+        respond: Sends results evaluated by the query worker to the launcher.
+        submit_action: Queues a selected action off the main thread.
+        run_action: Executes a selected action off the main thread.
+        serve_webhooks: Starts or stops the webhook receiver.
         generate_results: Converts results from TogglCli into ULauncher items.
 
     """
@@ -103,14 +122,25 @@ class TogglExtension(Extension):
     }
 
     __slots__ = (
+        "actions",
         "auth",
         "cache_path",
+        "compactor",
         "expiration",
         "hints",
+        "jobs",
         "max_results",
+        "prefetcher",
         "prefix",
+        "previews",
         "report_format",
+        "result_cache",
+        "webhook",
+        "webhook_port",
+        "webhook_secret",
+        "worker",
         "workspace_id",
+        "workspace_ids",
     )
 
     def __init__(self) -> None:
@@ -138,8 +168,26 @@ class TogglExtension(Extension):
         self.max_results = 10
         self.auth = None
         self.workspace_id = None
+        self.workspace_ids: tuple[int, ...] = ()
         self.expiration = None
         self.report_format: REPORT_FORMATS = "pdf"
+        self.webhook_port: Optional[int] = None
+        self.webhook_secret: Optional[str] = None
+        self.webhook: Optional[WebhookReceiver] = None
+        self.result_cache: ResultCache[list[ExtensionResultItem]] = ResultCache()
+        self.previews: PreviewRenderer[QueryResults] = PreviewRenderer()
+        self.prefetcher = Prefetcher(self)
+        self.compactor = Compactor(self)
+        self.worker: QueryWorker[
+            KeywordQueryEvent,
+            Query,
+            list[ExtensionResultItem],
+        ] = QueryWorker(self.process_query, self.respond, self._query_error)
+        # NOTE: A single worker keeps writes to the cache files ordered, while
+        # long bulk and maintenance jobs queue up separately so they never
+        # hold up starting or stopping a tracker.
+        self.actions = ThreadPoolExecutor(1, thread_name_prefix="toggl-action")
+        self.jobs = ThreadPoolExecutor(1, thread_name_prefix="toggl-job")
 
     def default_results(
         self,
@@ -147,47 +195,261 @@ class TogglExtension(Extension):
         **kwargs,
     ) -> list[QueryResults]:
         log.debug("Loading Default Results!")
-        results: list[QueryResults] = []
-        for obj in self.COMMANDS.values():
+        return self.previews.render(
+            self.preview_tasks(query, self.COMMANDS.values(), **kwargs),
+        )
+
+    def preview_tasks(
+        self,
+        query: Query,
+        commands: Iterable[type[Command]],
+        **kwargs,
+    ) -> list[PreviewTask[QueryResults]]:
+        """Wraps command previews into tasks for the preview renderer.
+
+        Previews that might reach the API are deferred to the background
+        with their own copy of the query, as previews amend the query in
+        place. They keep sharing the render scope of the query.
+
+        Args:
+            query: Query the previews are rendered for.
+            commands: Commands to preview in order.
+
+        Returns:
+            list: Tasks for rendering each of the previews.
+        """
+        key = self.cache_key(query)
+        tasks: list[PreviewTask[QueryResults]] = []
+        for obj in commands:
             cmd = obj(self)
-            results.extend(cmd.preview(query, **kwargs))
-        return results
+            if cmd.COST < PreviewCost.NETWORK:
+                func = partial(cmd.preview, query, **kwargs)
+                tasks.append(PreviewTask(f"{cmd.PREFIX}:{key}", func))
+                continue
+
+            func = bind(partial(cmd.preview, copy.deepcopy(query), **kwargs))
+            tasks.append(
+                PreviewTask(
+                    f"{cmd.PREFIX}:{key}",
+                    func,
+                    cmd.placeholder(),
+                    deferred=True,
+                ),
+            )
+        return tasks
+
+    def invalidate(self) -> None:
+        """Drops all rendered results after the underlying data changed."""
+        self.result_cache.invalidate()
+        self.previews.invalidate()
 
     def process_query(self, query: Query) -> list[ExtensionResultItem]:
         """Main method that handles querying for functionality.
 
-        Could be refactored to be more readable as needed if more functions are
-        being added.
+        Repeated queries are served from the rendered result cache. Queries
+        that refresh from the API invalidate the cache instead. Results still
+        containing placeholders for pending previews are never cached.
+
+        Every fetch of the render is memoized within its own `RenderScope`.
 
         Args:
-            query (list[str]): List of query terms to parse.
+            query: Parsed user query.
 
         Returns:
-            query (list[str]) | Callable: List of query terms to display.
+            list: Rendered results to display in the launcher.
         """
+        self.compactor.touch()
+        if query.refresh:
+            self.invalidate()
+            with RenderScope():
+                return self.generate_results(self._process_query(query))
+
+        key = self.cache_key(query)
+        results = self.result_cache.get(key)
+        if results is None:
+            generation = self.result_cache.generation
+            with RenderScope():
+                raw_results = self._process_query(query)
+            results = self.generate_results(raw_results)
+            if not any(item.pending for item in raw_results):
+                self.result_cache.set(key, results, generation)
+
+        self.prefetcher.visit(self.view_key(query))
 
-        if not query.command:
-            return self.generate_results(self.default_results(query))
+        return results
 
-        match = self.COMMANDS.get(query.command) or self.match_aliases(
-            query.command,
+    def respond(
+        self,
+        event: KeywordQueryEvent,
+        results: list[ExtensionResultItem],
+    ) -> None:
+        """Sends results evaluated off the main thread back to the launcher."""
+        self._client.send(Response(event, RenderResultListAction(results)))
+
+    def _query_error(self, error: Exception) -> list[ExtensionResultItem]:
+        # NOTE: Replaces the previous results, so the failure is not hidden.
+        return self.generate_results(
+            [
+                QueryResults(
+                    TIP_IMAGES[TipSeverity.ERROR],
+                    "Error",
+                    str(error) or type(error).__name__,
+                    f"{self.prefix} ",
+                ),
+            ],
         )
 
+    def serve_webhooks(self) -> None:
+        """Starts or stops the webhook receiver to match the preferences."""
+        if self.webhook is not None:
+            self.webhook.stop()
+            self.webhook = None
+
+        if self.webhook_port is None:
+            return
+
+        webhook = WebhookReceiver(self, self.webhook_port, self.webhook_secret)
+        try:
+            webhook.start()
+        except OSError as err:
+            log.exception("Failed to start the webhook receiver.")
+            show_notification(str(err), APP_IMG.absolute())
+        else:
+            self.webhook = webhook
+
+    @staticmethod
+    def background_command(action: Any) -> Optional[type[Command]]:
+        """Command of a selected action that can be executed off the main thread.
+
+        Only pickled `handle` calls of commands that never return further
+        results qualify.
+        """
+        if not isinstance(action, partial):
+            return None
+
+        func = action.func
+        owner = getattr(func, "__self__", None)
+        if owner is None:
+            return None
+
+        method = func.__name__
+        if method == "call_pickle":
+            method = action.keywords.get("method", next(iter(action.args), None))
+
+        cmd = owner if isinstance(owner, type) else type(owner)
+        if method == "handle" and issubclass(cmd, Command) and cmd.BACKGROUND:
+            return cmd
+        return None
+
+    @classmethod
+    def runs_in_background(cls, action: Any) -> bool:
+        """Checks whether a selected action can be executed off the main thread."""
+        return cls.background_command(action) is not None
+
+    def submit_action(self, action: Any) -> bool:
+        """Queues a selected action off the main thread if it qualifies.
+
+        Commands of sync or background priority run on the job worker, so
+        imports, exports and bulk edits never delay interactive actions.
+
+        Returns:
+            bool: Whether the action was queued.
+        """
+        cmd = self.background_command(action)
+        if cmd is None:
+            return False
+
+        executor = self.jobs if cmd.PRIORITY >= Priority.SYNC else self.actions
+        executor.submit(self.run_action, action)
+        return True
+
+    def run_action(self, action: Callable[..., Any]) -> None:
+        """Executes a selected action and refreshes rendered results after."""
+        try:
+            action(extension=self)
+        except Exception as err:
+            log.exception("Failed to execute %s in the background.", action)
+            show_notification(str(err), APP_IMG.absolute())
+        else:
+            log.info("Successfuly excecuted %s", action)
+        finally:
+            self.invalidate()
+
+    def _process_query(self, query: Query) -> list[QueryResults]:
+        if not query.command:
+            return self.default_results(query)
+
+        match = self.match_aliases(query.command)
+
         if match is None:
-            return self.generate_results(self.match_results(query))
+            return self.match_results(query)
 
         cmd = match(self)
-        results = cmd.view(query)
+        return cmd.view(query)
 
-        return self.generate_results(results)
+    def cache_key(self, query: Query) -> str:
+        """Normalizes a query into a key for caching rendered results.
 
-    def match_aliases(self, query: str) -> type[Command] | None:
-        # OPTIMIZE: There is probably a better way to do this.
-        for cmd in self.COMMANDS.values():
-            if query in cmd.ALIASES:
-                return cmd
+        Collapses whitespace and resolves command aliases to their prefix so
+        that identical requests share the same results.
+        """
+        args = list(query.raw_args)
+        if query.command:
+            match = self.match_aliases(query.command)
+            if match is not None:
+                args[1] = match.PREFIX
+        return " ".join(args)
 
-        return None
+    @staticmethod
+    def view_key(query: Query) -> str | None:
+        """Canonical path of a plain navigational view such as 'project list'.
+
+        Returns:
+            str | None: Path of the view or None if the query contains any
+                other arguments or does not match a command.
+        """
+        if not query.command:
+            return ""
+
+        routes = routing_table()
+        match = routes.get(query.command)
+        if match is None:
+            return None
+
+        extra = query.raw_args[2:]
+        if extra and routes.children(match):
+            match = routes.get(query.command, extra[0])
+            if match is None:
+                return None
+            extra = extra[1:]
+
+        view = routes.path(match)
+        return None if extra else " ".join(view)
+
+    def parse_query(self, raw_query: str) -> Query:
+        return QueryParser(
+            self.prefix,
+            self.report_format,
+            KeywordQueryEventListener.SUBCOMMANDS,
+        ).parse(raw_query)
+
+    def warm(self, view: str) -> None:
+        """Renders a view ahead of time into the result cache."""
+        query = self.parse_query(f"{self.prefix} {view}")
+        key = self.cache_key(query)
+        if key in self.result_cache:
+            return
+
+        generation = self.result_cache.generation
+        log.debug("Prefetching view '%s'.", view)
+        with RenderScope():
+            results = self._process_query(query)
+        if not any(item.pending for item in results):
+            self.result_cache.set(key, self.generate_results(results), generation)
+
+    @staticmethod
+    def match_aliases(query: str) -> type[Command] | None:
+        return routing_table().get(query)
 
     @staticmethod
     def match_query(
@@ -199,8 +461,12 @@ class TogglExtension(Extension):
         return get_score(query, target) >= threshold
 
     def match_results(self, query: Query, max_results: int = 5) -> list[QueryResults]:
-        """Fuzzy matches query terms against a dictionary of functions using
-        the `match_query` method.
+        """Matches a partial command against the available commands.
+
+        Commands with a prefix or alias starting with the partial command are
+        found through the routing trie and come first. The remaining commands
+        follow in order of their fuzzy `match_query` score. Previews are
+        rendered within the latency budget of the preview renderer.
 
         Will ignore any other parameters supplied with *_ parameters.
 
@@ -215,25 +481,22 @@ class TogglExtension(Extension):
         if query.command is None:
             return self.default_results(query)
 
-        raw_results = list(self.COMMANDS.values())
-        raw_results.sort(
-            key=lambda x: self.match_query(
-                cast(str, query.command),
-                x.PREFIX,
+        command = cast(str, query.command)
+        # NOTE: Commands outside the defaults are only suggested by their prefix.
+        raw_results = routing_table().complete(command)
+        raw_results.extend(
+            sorted(
+                (cmd for cmd in self.COMMANDS.values() if cmd not in raw_results),
+                key=lambda x: self.match_query(command, x.PREFIX),
+                reverse=True,
             ),
         )
+        checkpoint()
 
-        results = []
-        i = 0
-        for result in raw_results:
-            preview = result(self).preview(query)
-            if preview:
-                results.extend(preview)
-                i += len(preview)
-            if i >= max_results:
-                break
-
-        return results
+        return self.previews.render(
+            self.preview_tasks(query, raw_results),
+            limit=max_results,
+        )
 
     def create_action(
         self,
@@ -304,33 +567,20 @@ class TogglExtension(Extension):
 class KeywordQueryEventListener(EventListener):
     """Event listener for keyword query events."""
 
-    SUBCOMMANDS: Final[frozenset[str]] = frozenset(
-        (
-            ProjectCommand.PREFIX,
-            ClientCommand.PREFIX,
-            HelpCommand.PREFIX,
-            TagCommand.PREFIX,
-            *ProjectCommand.ALIASES,
-            *ClientCommand.ALIASES,
-            *HelpCommand.ALIASES,
-            *TagCommand.ALIASES,
-        ),
+    # NOTE: Help takes the path of another command as its arguments.
+    SUBCOMMANDS: Final[frozenset[str]] = routing_table().parents | frozenset(
+        (HelpCommand.PREFIX, *HelpCommand.ALIASES),
     )
 
-    def on_event(
+    def on_event(  # noqa: PLR6301
         self,
         event: KeywordQueryEvent,
         extension: TogglExtension,
     ) -> None:
-        raw_args = event.get_query()
-        query = QueryParser(
-            extension.prefix,
-            extension.report_format,
-            self.SUBCOMMANDS,
-        ).parse(raw_args)
-
-        processed_query = extension.process_query(query)
-        return RenderResultListAction(processed_query)
+        # NOTE: Results are sent back by the worker once evaluated as long as
+        # no newer query superseded this one in the meantime.
+        query = extension.parse_query(event.get_query())
+        extension.worker.submit(event, query)
 
 
 class ItemEnterEventListener(EventListener):
@@ -341,11 +591,20 @@ class ItemEnterEventListener(EventListener):
     ) -> None:
         data = event.get_data()
 
+        # NOTE: Commands report their own success or failure through
+        # notifications, so the launcher can close right away.
+        if extension.submit_action(data):
+            return HideWindowAction()
+
         execution = data(extension=extension)
         if execution and isinstance(execution, list):
             results = extension.generate_results(execution)
             return RenderResultListAction(results)
 
+        # NOTE: Anything that is not a list of results went through a
+        # commands handle method and might have modified data.
+        extension.invalidate()
+
         if not execution:
             return SetUserQueryAction("tgl ")
 
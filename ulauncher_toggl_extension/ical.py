@@ -0,0 +1,272 @@
+"""iCalendar feeds of cached trackers.
+
+A feed is assembled from monthly segments, each holding the events of a
+single `DateTimeFrame` month. Segments are stored next to the feed with a
+fingerprint of their source: the stat of the month's shard for closed
+history and a digest of the month's trackers still within the hot cache.
+Regenerating a feed only rebuilds the segments whose fingerprint changed
+and then concatenates all of them into the feed file, so neither the
+trackers nor the document are ever held in memory as a whole.
+
+Classes:
+    CalendarFeed: Feed file with its cached segments.
+
+Functions:
+    month_frames: Monthly frames covering a date range.
+    event: Formats a tracker as a VEVENT.
+
+Examples:
+    >>> feed = CalendarFeed(Path("~/tracked.ics"))
+    >>> feed.update(cache_file, hot_trackers, month_frames(start, end), projects)
+    2
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import shutil
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Final, Optional
+
+from ulauncher_toggl_extension.date_time import DateTimeFrame, TimeFrame
+from ulauncher_toggl_extension.shards import TrackerShards
+from ulauncher_toggl_extension.worker import checkpoint
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+    from pathlib import Path
+
+    from toggl_api import TogglTracker
+
+log = logging.getLogger(__name__)
+
+
+CRLF: Final[str] = "\r\n"
+LINE_LENGTH: Final[int] = 75
+PRODID: Final[str] = "-//ulauncher-toggl-extension//Tracked Time//EN"
+
+
+def month_frames(start: date, end: date) -> Iterator[DateTimeFrame]:
+    """Monthly frames from the month of the start up to the month of the end."""
+    day = date(start.year, start.month, 1)
+    while day <= end:
+        yield DateTimeFrame.from_date(day, TimeFrame.MONTH)
+        day = (day + timedelta(days=32)).replace(day=1)
+
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Folds a content line into chunks of at most 75 octets."""
+    if len(line.encode()) <= LINE_LENGTH:
+        return line + CRLF
+
+    chunks: list[str] = []
+    chunk, size, limit = "", 0, LINE_LENGTH
+    for char in line:
+        width = len(char.encode())
+        if size + width > limit:
+            chunks.append(chunk)
+            chunk, size, limit = "", 0, LINE_LENGTH - 1
+        chunk += char
+        size += width
+    chunks.append(chunk)
+    return f"{CRLF} ".join(chunks) + CRLF
+
+
+def _stamp(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def event(tracker: TogglTracker, projects: Mapping[int, str]) -> str:
+    """Formats a stopped tracker as a VEVENT with CRLF line endings."""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{tracker.id}@track.toggl.com",
+        f"DTSTAMP:{_stamp(tracker.timestamp)}",
+        f"DTSTART:{_stamp(tracker.start)}",
+        f"DTEND:{_stamp(tracker.stop)}",  # type: ignore[arg-type]
+        f"SUMMARY:{_escape(tracker.name)}",
+    ]
+    project = projects.get(tracker.project) if tracker.project else None
+    if project:
+        lines.append(f"DESCRIPTION:{_escape(project)}")
+    if tracker.tags:
+        lines.append(f"CATEGORIES:{','.join(_escape(t.name) for t in tracker.tags)}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+class CalendarFeed:
+    """An .ics feed built from cached monthly segments.
+
+    Methods:
+        update: Rebuilds changed segments and rewrites the feed.
+
+    Attributes:
+        path: Feed file.
+        segments: Directory holding the segments and their manifest.
+    """
+
+    VERSION: Final[int] = 1
+    SUFFIX: Final[str] = ".segments"
+    MANIFEST: Final[str] = "manifest.json"
+
+    __slots__ = ("path", "segments")
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.segments = path.with_suffix(f"{path.suffix}{self.SUFFIX}")
+
+    def _load_manifest(self, options: str) -> dict[str, str]:
+        try:
+            with (self.segments / self.MANIFEST).open("r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+        if data.get("version") != self.VERSION or data.get("options") != options:
+            log.info("Rebuilding every segment of %s.", self.path)
+            return {}
+        return data.get("months", {})
+
+    def _save_manifest(self, options: str, months: dict[str, str]) -> None:
+        data = {"version": self.VERSION, "options": options, "months": months}
+        tmp = self.segments / f"{self.MANIFEST}.tmp"
+        with tmp.open("w", encoding="utf-8") as file:
+            json.dump(data, file)
+        tmp.replace(self.segments / self.MANIFEST)
+
+    def update(  # noqa: PLR0913
+        self,
+        cache_file: Path,
+        hot: Iterable[TogglTracker],
+        frames: Sequence[DateTimeFrame],
+        projects: Mapping[int, str],
+        *,
+        select: Optional[Callable[[TogglTracker], bool]] = None,
+        options: str = "",
+    ) -> int:
+        """Rebuilds the segments that changed and rewrites the feed.
+
+        Args:
+            cache_file: Tracker cache file the shards belong to.
+            hot: Trackers loaded from the tracker cache itself.
+            frames: Months the feed covers, oldest first.
+            projects: Project names keyed by their ids.
+            select: Filters a tracker has to pass to be included.
+            options: Identifies the filters and names used. Every segment is
+                rebuilt if it differs from the previous update.
+
+        Returns:
+            int: Amount of segments rebuilt.
+        """
+        options = hashlib.sha1(  # noqa: S324
+            json.dumps([options, sorted(projects.items())]).encode(),
+        ).hexdigest()
+        previous = self._load_manifest(options)
+
+        recent: defaultdict[date, list[TogglTracker]] = defaultdict(list)
+        for tracker in hot:
+            recent[TrackerShards.key(tracker)].append(tracker)
+        ids = {tracker.id for month in recent.values() for tracker in month}
+
+        shards = TrackerShards(cache_file)
+        self.segments.mkdir(parents=True, exist_ok=True)
+        months: dict[str, str] = {}
+        rebuilt = 0
+        for frame in frames:
+            checkpoint()
+            month = frame.start.date()
+            key = f"{month:%Y-%m}"
+            shard = shards.shard(month)
+            fingerprint = self._fingerprint(shard, recent.get(month, []))
+            months[key] = fingerprint
+            segment = self.segments / f"{key}.ics"
+            if previous.get(key) == fingerprint and segment.exists():
+                continue
+
+            trackers = [t for t in shards.load(shard) if t.id not in ids]
+            trackers.extend(recent.get(month, []))
+            trackers.sort(key=lambda t: t.start)
+            self._write_segment(segment, trackers, frame, projects, select)
+            rebuilt += 1
+
+        for stale in self.segments.glob("*.ics"):
+            if stale.stem not in months:
+                stale.unlink()
+
+        self._save_manifest(options, months)
+        self._write_feed(sorted(months))
+        log.info("Rebuilt %s of %s segments of %s.", rebuilt, len(months), self.path)
+        return rebuilt
+
+    @staticmethod
+    def _fingerprint(shard: Path, hot: list[TogglTracker]) -> str:
+        try:
+            stat = shard.stat()
+            closed = f"{stat.st_size}:{stat.st_mtime_ns}"
+        except FileNotFoundError:
+            closed = ""
+
+        digest = hashlib.sha1()  # noqa: S324
+        for tracker in sorted(hot, key=lambda t: t.id):
+            digest.update(f"{tracker.id}:{tracker.timestamp};".encode())
+        return f"{closed}|{digest.hexdigest()}"
+
+    @staticmethod
+    def _write_segment(
+        segment: Path,
+        trackers: list[TogglTracker],
+        frame: DateTimeFrame,
+        projects: Mapping[int, str],
+        select: Optional[Callable[[TogglTracker], bool]],
+    ) -> None:
+        tmp = segment.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8", newline="") as file:
+            for tracker in trackers:
+                if (
+                    tracker.stop is None
+                    or not frame.start <= tracker.start <= frame.end
+                ):
+                    continue
+                if select is not None and not select(tracker):
+                    continue
+                file.write(event(tracker, projects))
+        tmp.replace(segment)
+
+    def _write_feed(self, months: list[str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f"{self.path.suffix}.tmp")
+        with tmp.open("w", encoding="utf-8", newline="") as feed:
+            feed.write(
+                "".join(
+                    _fold(line)
+                    for line in (
+                        "BEGIN:VCALENDAR",
+                        "VERSION:2.0",
+                        f"PRODID:{PRODID}",
+                        "CALSCALE:GREGORIAN",
+                        "X-WR-CALNAME:Toggl Track",
+                    )
+                ),
+            )
+            for month in months:
+                with (self.segments / f"{month}.ics").open(
+                    "r",
+                    encoding="utf-8",
+                    newline="",
+                ) as segment:
+                    shutil.copyfileobj(segment, feed)
+            feed.write(_fold("END:VCALENDAR"))
+        tmp.replace(self.path)
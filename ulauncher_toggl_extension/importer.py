@@ -0,0 +1,389 @@
+"""Streaming import of time entries from CSV files.
+
+Rows are read lazily and submitted one window at a time, so memory stays
+bound by the window size instead of the file size. Missing projects and
+tags of a window are created before its trackers, which are then sent in
+rate limited batches and cached with a single write.
+
+Progress is persisted to a checkpoint after every window. An import that
+failed or got cancelled resumes after the rows that already went through
+instead of starting from zero.
+
+Classes:
+    ImportRow: Single tracker parsed from a CSV row.
+    ImportCheckpoint: Persisted progress of importing a file.
+    ImportResult: Counts of an import run.
+    Importer: Submits parsed rows through the Toggl API.
+
+Functions:
+    read_rows: Streams raw rows of a CSV file with their line number.
+    parse_row: Parses a raw row into a tracker.
+
+Attributes:
+    WINDOW: Amount of rows resolved and submitted at once.
+    COLUMNS: Accepted header names for every field.
+
+Examples:
+    >>> checkpoint = ImportCheckpoint.from_cache(cache_path, Path("history.csv"))
+    >>> importer = Importer(trackers, projects, tags, checkpoint)
+    >>> importer.run(read_rows(Path("history.csv")))
+    ImportResult(imported=9812, invalid=3, failed=0)
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Final, NamedTuple, Optional, cast
+
+from httpx import Response
+from toggl_api import ProjectBody, TogglTracker, TrackerBody
+from toggl_api.meta import RequestMethod
+
+from ulauncher_toggl_extension.batch import run_batches
+from ulauncher_toggl_extension.date_time import (
+    localize_timezone,
+    parse_datetime,
+    parse_timedelta,
+)
+from ulauncher_toggl_extension.worker import checkpoint
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+
+    from toggl_api import ProjectEndpoint, TagEndpoint, TrackerEndpoint
+
+log = logging.getLogger(__name__)
+
+WINDOW: Final[int] = 200
+COLUMNS: Final[dict[str, tuple[str, ...]]] = {
+    "name": ("description", "name"),
+    "start": ("start", "start date"),
+    "start_time": ("start time",),
+    "stop": ("stop", "end", "end date"),
+    "stop_time": ("end time", "stop time"),
+    "duration": ("duration",),
+    "project": ("project",),
+    "tags": ("tags",),
+}
+
+
+class ImportRow(NamedTuple):
+    """Tracker parsed from a single CSV row."""
+
+    line: int
+    name: str
+    start: datetime
+    stop: datetime
+    project: Optional[str]
+    tags: tuple[str, ...]
+
+
+@dataclass
+class ImportResult:
+    """Counts of rows handled by an import run.
+
+    Attributes:
+        imported: Rows that were created as trackers.
+        invalid: Rows that couldn't be parsed and were skipped.
+        failed: Rows the API rejected. These are retried on the next run.
+    """
+
+    imported: int = 0
+    invalid: int = 0
+    failed: int = 0
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed
+
+
+def read_rows(path: Path) -> Iterator[tuple[int, dict[str, str]]]:
+    """Streams the rows of a CSV file with lower case header names.
+
+    Args:
+        path: CSV file with a header row.
+
+    Yields:
+        tuple: Number of the row starting from one, not counting blank
+            lines, and the row keyed by header.
+    """
+    with path.open("r", encoding="utf-8-sig", newline="") as file:
+        reader = csv.reader(file)
+        header = [name.strip().lower() for name in next(reader, [])]
+        rows = (values for values in reader if any(values))
+        for line, values in enumerate(rows, start=1):
+            yield line, dict(zip(header, values))
+
+
+def _field(row: dict[str, str], name: str) -> str:
+    for key in COLUMNS[name]:
+        value = row.get(key, "").strip()
+        if value:
+            return value
+    return ""
+
+
+def _parse_time(text: str) -> datetime:
+    try:
+        ts = datetime.fromisoformat(text)
+    except ValueError:
+        return parse_datetime(text)
+    return ts if ts.tzinfo is not None else localize_timezone(ts)
+
+
+def _parse_duration(text: str) -> timedelta:
+    parts = text.split(":")
+    if len(parts) == 3:  # noqa: PLR2004
+        hours, minutes, seconds = map(int, parts)
+        return timedelta(hours=hours, minutes=minutes, seconds=seconds)
+    if text.isdigit():
+        return timedelta(seconds=int(text))
+    return parse_timedelta(text)
+
+
+def parse_row(line: int, row: dict[str, str]) -> ImportRow:
+    """Parses a raw CSV row into a tracker.
+
+    Accepts Toggl's own detailed CSV export with separate date and time
+    columns as well as ISO 8601 `start`/`stop` columns. The stop falls back
+    to the start plus the duration.
+
+    Raises:
+        ValueError: If the description or start is missing, any value fails
+            to parse or the tracker wouldn't have stopped.
+    """
+    name = _field(row, "name")
+    start = " ".join(filter(None, (_field(row, "start"), _field(row, "start_time"))))
+    if not name or not start:
+        msg = f"Row {line} is missing a description or start."
+        raise ValueError(msg)
+
+    begin = _parse_time(start)
+    stop = " ".join(filter(None, (_field(row, "stop"), _field(row, "stop_time"))))
+    duration = _field(row, "duration")
+    if stop:
+        end = _parse_time(stop)
+    elif duration:
+        end = begin + _parse_duration(duration)
+    else:
+        msg = f"Row {line} has neither a stop nor a duration."
+        raise ValueError(msg)
+
+    if end < begin:
+        msg = f"Row {line} stops before it starts."
+        raise ValueError(msg)
+
+    tags = tuple(tag.strip() for tag in _field(row, "tags").split(",") if tag.strip())
+    return ImportRow(line, name, begin, end, _field(row, "project") or None, tags)
+
+
+class ImportCheckpoint:
+    """Rows of a file that already went through.
+
+    Everything below `offset` is done. Rows past it that finished while an
+    earlier one failed are tracked separately, so a resumed import neither
+    duplicates nor skips them.
+
+    Methods:
+        done: Whether a row already went through.
+        mark: Records rows as done.
+        save: Persists the progress.
+        clear: Removes the checkpoint once the import completed.
+    """
+
+    VERSION: Final[int] = 1
+    FOLDER: Final[str] = "imports"
+
+    __slots__ = ("finished", "offset", "path")
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.offset = 0
+        self.finished: set[int] = set()
+
+    @classmethod
+    def from_cache(cls, cache_path: Path, source: Path) -> ImportCheckpoint:
+        """Loads the checkpoint of a source file, keyed by its path and size."""
+        source = source.resolve()
+        key = f"{source}:{source.stat().st_size}".encode()
+        state = cls(
+            cache_path / cls.FOLDER / f"{hashlib.sha1(key).hexdigest()}.json",  # noqa: S324
+        )
+        state.load()
+        return state
+
+    def done(self, line: int) -> bool:
+        return line <= self.offset or line in self.finished
+
+    def mark(self, lines: Iterable[int]) -> None:
+        self.finished.update(lines)
+        while self.offset + 1 in self.finished:
+            self.offset += 1
+            self.finished.remove(self.offset)
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            log.exception("Failed to load the import checkpoint at %s.", self.path)
+            return
+
+        if data.get("version") != self.VERSION:
+            log.info("Discarding import checkpoint with an outdated version.")
+            return
+
+        self.offset = data.get("offset", 0)
+        self.finished = set(data.get("finished", ()))
+
+    def save(self) -> None:
+        data = {
+            "version": self.VERSION,
+            "offset": self.offset,
+            "finished": sorted(self.finished),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as file:
+            json.dump(data, file)
+        tmp.replace(self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class Importer:
+    """Creates trackers from parsed rows, a window at a time.
+
+    Project and tag names are resolved through indexes built once from the
+    cache. Names that are still missing get created in batches before the
+    trackers referencing them.
+
+    Methods:
+        run: Imports every row that isn't done yet.
+    """
+
+    __slots__ = ("_projects", "_tags", "checkpoint", "projects", "tags", "trackers")
+
+    def __init__(
+        self,
+        trackers: TrackerEndpoint,
+        projects: ProjectEndpoint,
+        tags: TagEndpoint,
+        checkpoint: ImportCheckpoint,
+    ) -> None:
+        self.trackers = trackers
+        self.projects = projects
+        self.tags = tags
+        self.checkpoint = checkpoint
+        self._projects = {p.name.casefold(): p.id for p in projects.load_cache()}
+        self._tags = {t.name.casefold() for t in tags.load_cache()}
+
+    def run(self, rows: Iterable[tuple[int, dict[str, str]]]) -> ImportResult:
+        """Imports rows until they run out or a window fails.
+
+        The checkpoint is saved after every window and cleared once every
+        row went through.
+        """
+        result = ImportResult()
+        pending = ((line, row) for line, row in rows if not self.checkpoint.done(line))
+        while window := list(islice(pending, WINDOW)):
+            checkpoint()
+            parsed = self._parse(window, result)
+            self._resolve(parsed)
+            self._submit(parsed, result)
+            self.checkpoint.save()
+            if not result.complete:
+                return result
+
+        self.checkpoint.clear()
+        return result
+
+    def _parse(
+        self,
+        window: list[tuple[int, dict[str, str]]],
+        result: ImportResult,
+    ) -> list[ImportRow]:
+        parsed = []
+        for line, row in window:
+            try:
+                parsed.append(parse_row(line, row))
+            except ValueError as err:  # noqa: PERF203
+                log.warning("Skipping an invalid row: %s", err)
+                result.invalid += 1
+                self.checkpoint.mark((line,))
+        return parsed
+
+    def _resolve(self, rows: list[ImportRow]) -> None:
+        projects = {
+            row.project.casefold(): row.project
+            for row in rows
+            if row.project and row.project.casefold() not in self._projects
+        }
+        for name, project in run_batches(
+            list(projects.values()),
+            self._add_project,
+        ).done:
+            self._projects[name.casefold()] = project.id
+
+        tags = {
+            tag.casefold(): tag
+            for row in rows
+            for tag in row.tags
+            if tag.casefold() not in self._tags
+        }
+        for name, _ in run_batches(list(tags.values()), self.tags.add).done:
+            self._tags.add(name.casefold())
+
+    def _add_project(self, name: str) -> Any:
+        return self.projects.add(ProjectBody(name=name, active=True))
+
+    def _body(self, row: ImportRow) -> dict[str, Any]:
+        project = self._projects.get(row.project.casefold()) if row.project else None
+        body = TrackerBody(
+            row.name,
+            project_id=project,
+            start=row.start,
+            stop=row.stop,
+            tags=list(row.tags),
+            tag_action="add",
+            created_with="ulauncher-toggl-extension",
+        )
+        return body.format("add", workspace_id=self.trackers.workspace_id)
+
+    def _post(self, row: ImportRow) -> TogglTracker:
+        response = self.trackers.request(
+            "",
+            body=self._body(row),
+            method=RequestMethod.POST,
+            refresh=True,
+            raw=True,
+        )
+        return TogglTracker.from_kwargs(**cast(Response, response).json())
+
+    def _submit(self, rows: list[ImportRow], result: ImportResult) -> None:
+        # NOTE: Rows of projects that failed to be created are left for a retry.
+        resolved = [
+            row
+            for row in rows
+            if row.project is None or row.project.casefold() in self._projects
+        ]
+        result.failed += len(rows) - len(resolved)
+
+        batch = run_batches(resolved, self._post)
+        created = [tracker for _, tracker in batch.done]
+        if created:
+            self.trackers.cache.save_cache(created, RequestMethod.PUT)
+
+        self.checkpoint.mark(row.line for row, _ in batch.done)
+        result.imported += len(batch.done)
+        result.failed += len(batch.failed)
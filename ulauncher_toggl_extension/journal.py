@@ -0,0 +1,370 @@
+"""Append-only journal for the JSON cache.
+
+Saving a single model through the JSON cache rewrites the whole cache file,
+so starting or stopping one tracker costs as much disk I/O as the entire
+history. The journaled cache appends each mutation to a journal file next to
+the cache file instead and readers replay it over the base file. Once the
+journal outgrows the base file or a bulk refresh happens the journal is
+folded back into the base file with a checkpoint.
+
+Every journal entry is a single line prefixed with the CRC32 of its payload,
+so a write torn by a crash is detected and discarded when replaying. Writers
+hold an exclusive lock on the journal, so caches of different threads or
+processes sharing a file never clobber each other's entries.
+
+Classes:
+    JournalSession: JSON session replaying the journal over the base file.
+    JournalCache: JSON cache appending single mutations to a journal.
+
+Functions:
+    journal_path: Location of the journal belonging to a cache file.
+    read_journal: Reads the intact entries of a journal.
+    replay: Applies journal entries to a list of models.
+    checkpoint: Folds the journal of a cache file back into it.
+
+Examples:
+    >>> cache = JournalCache(Path("cache"), timedelta(days=1))
+    >>> TrackerEndpoint(231231, BasicAuth(...), cache).stop(1)
+"""
+
+from __future__ import annotations
+
+import enum
+import fcntl
+import json
+import logging
+import os
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import starmap
+from typing import TYPE_CHECKING, Any, Final, Optional, TypeVar
+
+from toggl_api import JSONCache
+from toggl_api.meta import RequestMethod
+from toggl_api.meta.cache.json_cache import CustomDecoder, CustomEncoder, JSONSession
+from toggl_api.models import TogglClass
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from datetime import timedelta
+    from pathlib import Path
+    from typing import BinaryIO
+
+    from toggl_api.meta.cached_endpoint import TogglCachedEndpoint
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=TogglClass)
+
+
+class JournalOp(str, enum.Enum):
+    PUT = "put"
+    DELETE = "delete"
+
+
+ENTRY = tuple[JournalOp, Any]
+
+SUFFIX: Final[str] = ".journal"
+
+
+def journal_path(cache_file: Path) -> Path:
+    return cache_file.with_suffix(SUFFIX)
+
+
+def _frame(op: JournalOp, value: Any) -> bytes:
+    payload = json.dumps(
+        [op.value, value],
+        cls=CustomEncoder,
+        separators=(",", ":"),
+    ).encode()
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def _unframe(line: bytes, decoder: CustomDecoder) -> ENTRY | None:
+    checksum, _, payload = line.rstrip(b"\n").partition(b" ")
+    if not line.endswith(b"\n") or checksum != b"%08x" % zlib.crc32(payload):
+        return None
+    try:
+        op, value = decoder.decode(payload.decode())
+        return JournalOp(op), value
+    except (ValueError, TypeError):
+        return None
+
+
+def read_journal(path: Path, offset: int = 0) -> tuple[list[ENTRY], int]:
+    """Reads the intact entries of a journal.
+
+    Reading stops at the first entry that is incomplete or fails its
+    checksum, as anything after a torn write can't be trusted.
+
+    Args:
+        path: Journal file to read.
+        offset: Byte offset to start reading from.
+
+    Returns:
+        tuple: Decoded entries and the offset right after the last intact
+            entry.
+    """
+    try:
+        with path.open("rb") as file:
+            file.seek(offset)
+            data = file.read()
+    except FileNotFoundError:
+        return [], 0
+
+    entries: list[ENTRY] = []
+    decoder = CustomDecoder()
+    for line in data.splitlines(keepends=True):
+        entry = _unframe(line, decoder)
+        if entry is None:
+            log.warning("Discarding torn journal entries in %s.", path)
+            break
+        entries.append(entry)
+        offset += len(line)
+
+    return entries, offset
+
+
+def replay(models: Iterable[T], entries: Iterable[ENTRY]) -> list[T]:
+    """Applies journal entries to models in order.
+
+    Args:
+        models: Models of the base cache file.
+        entries: Journal entries to apply.
+
+    Returns:
+        list: Models with additions and edits in place and deletions removed.
+    """
+    data: list[Optional[T]] = list(models)
+    index = {model.id: i for i, model in enumerate(data) if model is not None}
+    for op, value in entries:
+        if op is JournalOp.DELETE:
+            i = index.pop(value, None)
+            if i is not None:
+                data[i] = None
+        elif value.id in index:
+            data[index[value.id]] = value
+        else:
+            index[value.id] = len(data)
+            data.append(value)
+    return [model for model in data if model is not None]
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[BinaryIO]:
+    """Opens a journal for appending while holding an exclusive lock.
+
+    Opens the journal again if a checkpoint removed it while waiting.
+    """
+    while True:
+        with path.open("a+b") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                linked = os.fstat(file.fileno()).st_ino == path.stat().st_ino
+            except FileNotFoundError:
+                linked = False
+            if linked:
+                yield file
+                return
+
+
+def checkpoint(cache_file: Path) -> bool:
+    """Folds the journal of a cache file back into the cache file.
+
+    Args:
+        cache_file: JSON cache file to checkpoint.
+
+    Returns:
+        bool: Whether there was a journal to fold.
+    """
+    if not journal_path(cache_file).exists():
+        return False
+    session: JournalSession = JournalSession()
+    session.load(cache_file)
+    session.commit(cache_file)
+    return True
+
+
+@dataclass
+class JournalSession(JSONSession[T]):
+    """JSON session that replays the journal over the base cache file.
+
+    Methods:
+        append: Appends entries to the journal.
+
+    Attributes:
+        offset: Byte offset of the journal that was already replayed.
+    """
+
+    offset: int = field(init=False, default=0)
+
+    def refresh(self, path: Path) -> bool:
+        if super().refresh(path):
+            # NOTE: The base file was checkpointed by someone else.
+            self.offset = 0
+            self._replay(path)
+            return True
+        return self._replay(path)
+
+    def load(self, path: Path) -> None:
+        super().load(path)
+        self.offset = 0
+        self._replay(path)
+
+    def commit(self, path: Path) -> None:
+        journal = journal_path(path)
+        with _locked(journal):
+            super().commit(path)
+            journal.unlink(missing_ok=True)
+        self.offset = 0
+
+    def _save(self, path: Path, data: dict[str, Any]) -> None:  # noqa: PLR6301
+        tmp = path.with_suffix(".checkpoint.tmp")
+        with tmp.open("w", encoding="utf-8") as file:
+            json.dump(data, file, cls=CustomEncoder)
+        tmp.replace(path)
+
+    def _replay(self, path: Path) -> bool:
+        journal = journal_path(path)
+        try:
+            if journal.stat().st_size < self.offset:
+                self.offset = 0
+        except FileNotFoundError:
+            self.offset = 0
+            return False
+
+        entries, self.offset = read_journal(journal, self.offset)
+        if not entries:
+            return False
+        self.data = replay(self.data, entries)
+        return True
+
+    def append(self, path: Path, entries: Iterable[ENTRY]) -> None:
+        """Appends entries to the journal with a single synced write.
+
+        Entries appended by other writers in the meantime are replayed
+        first, while a torn tail left behind by a crash is truncated.
+        """
+        entries = list(entries)
+        payload = b"".join(starmap(_frame, entries))
+        journal = journal_path(path)
+        with _locked(journal) as file:
+            end = file.seek(0, os.SEEK_END)
+            if end != self.offset:
+                self._recover(journal, file, end, entries)
+            file.write(payload)
+            file.flush()
+            os.fsync(file.fileno())
+            self.offset = file.tell()
+
+    def _recover(
+        self,
+        journal: Path,
+        file: BinaryIO,
+        end: int,
+        entries: list[ENTRY],
+    ) -> None:
+        # NOTE: A journal shorter than expected was started over by a checkpoint.
+        start = self.offset if end > self.offset else 0
+        others, valid = read_journal(journal, start)
+        if valid < end:
+            log.warning("Truncating torn journal entries of %s.", journal)
+            file.truncate(valid)
+        if others:
+            # NOTE: Entries of other writers end up before these.
+            self.data = replay(self.data, [*others, *entries])
+
+
+class JournalCache(JSONCache[T]):
+    """JSON cache that journals single mutations instead of rewriting.
+
+    Adding, editing and deleting models appends to the journal, while bulk
+    refreshes and oversized journals are folded into the base file through
+    a checkpoint.
+
+    Attributes:
+        CHECKPOINT: Journal size in bytes always allowed before a checkpoint.
+            Past that the journal is checkpointed once it outgrows the base
+            file.
+    """
+
+    CHECKPOINT: Final[int] = 256 * 1024
+
+    __slots__ = ("_pending",)
+
+    def __init__(
+        self,
+        path: Path,
+        expire_after: Optional[timedelta | int] = None,
+        parent: Optional[TogglCachedEndpoint[T]] = None,
+        *,
+        max_length: int = 10_000,
+    ) -> None:
+        super().__init__(path, expire_after, parent, max_length=max_length)
+        self.session: JournalSession[T] = JournalSession(max_length=max_length)
+        self._pending: list[ENTRY] = []
+        if parent is not None:
+            self.session.load(self.cache_path)
+
+    def save_cache(self, update: Iterable[T] | T, method: RequestMethod) -> None:
+        if method == RequestMethod.GET:
+            # NOTE: Pending entries would otherwise be journaled in place of
+            # the full rewrite.
+            if self._pending:
+                self.commit()
+            super().save_cache(update, method)
+            return
+
+        func = self.find_method(method)
+        if func is None:
+            return
+        self.session.refresh(self.cache_path)
+        func(update)
+        models = update if isinstance(update, list) else [update]
+        self._pending.extend((JournalOp.PUT, model) for model in models)
+        self.commit()
+
+    def add_entries(self, update: list[T] | T, **kwargs: Any) -> None:
+        if not isinstance(update, list):
+            super().add_entries(update, **kwargs)
+            return
+
+        # NOTE: Replaces models in a single pass instead of a scan per model.
+        self.session.refresh(self.cache_path)
+        existing = {model.id for model in self.session.data}
+        now = datetime.now(timezone.utc)
+        for model in update:
+            if model.id in existing:
+                model.timestamp = now
+        self.session.data = replay(
+            self.session.data,
+            [(JournalOp.PUT, model) for model in update],
+        )
+
+    def delete_entries(self, update: list[T] | T, **kwargs: Any) -> None:
+        models = update if isinstance(update, list) else [update]
+        entries = [(JournalOp.DELETE, model.id) for model in models]
+        if isinstance(update, list):
+            self.session.refresh(self.cache_path)
+            self.session.data = replay(self.session.data, entries)
+        else:
+            super().delete_entries(update, **kwargs)
+        self._pending.extend(entries)
+
+    def commit(self) -> None:
+        pending, self._pending = self._pending, []
+        path = self.cache_path
+        if pending and self._journal_fits(path):
+            log.debug("Journaling %s cache entries.", len(pending))
+            self.session.append(path, pending)
+            return
+        super().commit()
+
+    def _journal_fits(self, path: Path) -> bool:
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return False
+        return self.session.offset < max(self.CHECKPOINT, size)
@@ -2,16 +2,20 @@ from __future__ import annotations
 
 import logging
 import os
+from dataclasses import replace
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Final, Optional
 
 from httpx import BasicAuth
 from toggl_api import UserEndpoint
 from toggl_api.config import AuthenticationError, generate_authentication, use_togglrc
 from ulauncher.api.client.EventListener import EventListener
 
+from ulauncher_toggl_extension.columns import COLUMNS
+from ulauncher_toggl_extension.compaction import RetentionPolicy
 from ulauncher_toggl_extension.date_time import parse_timedelta
 from ulauncher_toggl_extension.images import TIP_IMAGES, TipSeverity
+from ulauncher_toggl_extension.scheduler import ScheduledAuth
 from ulauncher_toggl_extension.utils import show_notification
 
 if TYPE_CHECKING:
@@ -36,9 +40,12 @@ class PreferencesEventListener(EventListener):
     Methods:
         authentication: Generates and verifies authentication credentials.
         on_event: Updates extension preferences and checks for changes.
-        workspace_id: Sets up the workspace id.
+        workspaces: Sets up the default and additional workspace ids.
         max_results: Checks if max search results are set.
         expiration: Parses custom expiration date for trackers.
+        webhook_port: Parses the port of the webhook receiver.
+        tiering: Configures the hot tier of the tracker history.
+        retention: Parses the retention policy of the cache directory.
     """
 
     def on_event(
@@ -53,14 +60,27 @@ class PreferencesEventListener(EventListener):
         extension.max_results = self.max_results(
             event.preferences["max_search_results"],
         )
-        wid = self.workspace(
+        extension.workspace_ids = self.workspaces(
             os.environ.get("TOGGL_WORKSPACE_ID") or event.preferences["workspace"],
         )
-        extension.workspace_id = wid
+        extension.workspace_id = extension.workspace_ids[0]
         extension.hints = event.preferences["hints"] == "true"
         extension.auth = self.authentication(event.preferences["api_token"])
         extension.expiration = self.parse_expiration(event.preferences["expiration"])
         extension.report_format = event.preferences["report_format"]
+        extension.webhook_port = self.webhook_port(
+            event.preferences.get("webhook_port"),
+        )
+        extension.webhook_secret = event.preferences.get("webhook_secret") or None
+        extension.serve_webhooks()
+        self.tiering(
+            event.preferences.get("hot_window"),
+            event.preferences.get("hot_memory"),
+        )
+        extension.compactor.policy = self.retention(
+            event.preferences.get("retention"),
+            event.preferences.get("cache_size"),
+        )
 
     @staticmethod
     def authentication(api_key: Optional[str] = None) -> BasicAuth:
@@ -72,7 +92,7 @@ class PreferencesEventListener(EventListener):
             AuthenticationError: If authentication fails or is missing.
 
         Returns:
-            BasicAuth: BasicAuth object that is used with httpx client.
+            BasicAuth: Credentials routed through the request scheduler.
         """
         if api_key:
             auth = BasicAuth(api_key, "api_token")
@@ -96,15 +116,26 @@ class PreferencesEventListener(EventListener):
             show_notification(err, TIP_IMAGES[TipSeverity.ERROR])
             raise AuthenticationError(err)
 
-        return auth
+        return ScheduledAuth(auth)
 
     @staticmethod
-    def workspace(workspace_id: Optional[str] = None) -> int:
-        if workspace_id is not None:
+    def workspaces(workspace_ids: Optional[str] = None) -> tuple[int, ...]:
+        """Parses a comma separated list of workspace ids.
+
+        The first workspace is the default one new models are created in.
+        """
+        if workspace_ids is not None:
             try:
-                return int(workspace_id)
+                ids = tuple(
+                    dict.fromkeys(
+                        int(wid) for wid in workspace_ids.split(",") if wid.strip()
+                    ),
+                )
             except ValueError:
-                log.exception("Workspace ID is not an integer. %s")
+                log.exception("Workspace IDs are not integers. %s")
+            else:
+                if ids:
+                    return ids
 
         err = "Workspace ID is not setup correctly!"
         show_notification(err, TIP_IMAGES[TipSeverity.ERROR])
@@ -120,6 +151,58 @@ class PreferencesEventListener(EventListener):
         log.info("Max search results are not setup. Using default.")
         return 10
 
+    @staticmethod
+    def webhook_port(port: Optional[str] = None) -> int | None:
+        if not port:
+            return None
+        try:
+            return int(port)
+        except ValueError:
+            msg = "Invalid webhook port set: %s."
+            show_notification(msg % port, TIP_IMAGES[TipSeverity.ERROR])
+            log.exception(msg, port)
+            return None
+
+    @staticmethod
+    def tiering(
+        window: Optional[str] = None,
+        memory: Optional[str] = None,
+    ) -> None:
+        """Sets the hot window and the memory budget in megabytes."""
+        try:
+            COLUMNS.configure(
+                parse_timedelta(window) if window else None,
+                int(memory) * 1024 * 1024 if memory else None,
+            )
+        except ValueError:
+            msg = "Invalid tracker history tiering set: %s, %s MB."
+            show_notification(msg % (window, memory), TIP_IMAGES[TipSeverity.ERROR])
+            log.exception(msg, window, memory)
+
+    @staticmethod
+    def retention(
+        max_age: Optional[str] = None,
+        max_size: Optional[str] = None,
+        policy: Optional[RetentionPolicy] = None,
+    ) -> RetentionPolicy:
+        """Parses the retention of cache records and the size limit in MB.
+
+        Empty values switch the respective rule off.
+        """
+        policy = policy or RetentionPolicy()
+        try:
+            if max_age is not None:
+                age = parse_timedelta(max_age) if max_age else None
+                policy = replace(policy, max_age=age)
+            if max_size is not None:
+                size = int(max_size) * 1024 * 1024 if max_size else None
+                policy = replace(policy, max_size=size)
+        except ValueError:
+            msg = "Invalid cache retention set: %s, %s MB."
+            show_notification(msg % (max_age, max_size), TIP_IMAGES[TipSeverity.ERROR])
+            log.exception(msg, max_age, max_size)
+        return policy
+
     @staticmethod
     def parse_expiration(expiration: str) -> timedelta | None:
         if not expiration:
@@ -139,7 +222,18 @@ class PreferencesEventListener(EventListener):
 
 
 class PreferencesUpdateEventListener(EventListener):
-    def on_event(  # noqa: PLR6301
+    BACKGROUND: Final[frozenset[str]] = frozenset(
+        {
+            "webhook_port",
+            "webhook_secret",
+            "hot_window",
+            "hot_memory",
+            "retention",
+            "cache_size",
+        },
+    )
+
+    def on_event(
         self,
         event: PreferencesUpdateEvent,
         ext: TogglExtension,
@@ -153,10 +247,10 @@ class PreferencesUpdateEventListener(EventListener):
         elif event.id == "max_search_results":
             ext.max_results = PreferencesEventListener.max_results(event.new_value)
         elif event.id == "workspace":
-            wid = PreferencesEventListener.workspace(
+            ext.workspace_ids = PreferencesEventListener.workspaces(
                 os.environ.get("TOGGL_WORKSPACE_ID") or event.new_value,
             )
-            ext.workspace_id = wid
+            ext.workspace_id = ext.workspace_ids[0]
         elif event.id == "hints":
             ext.hints = event.new_value == "true"
         elif event.id == "api_token":
@@ -165,5 +259,36 @@ class PreferencesUpdateEventListener(EventListener):
             ext.expiration = PreferencesEventListener.parse_expiration(event.new_value)
         elif event.id == "report_format":
             ext.report_format = event.new_value
+        elif event.id in self.BACKGROUND:
+            self.update_background(ext, event.id, event.new_value)
 
+        ext.invalidate()
         log.info("Updated %s preference!", event.id.replace("_", " "))
+
+    @staticmethod
+    def update_background(ext: TogglExtension, key: str, value: str) -> None:
+        """Reconfigures the webhook receiver, history tiering or compaction."""
+        if key == "retention":
+            ext.compactor.policy = PreferencesEventListener.retention(
+                value,
+                policy=ext.compactor.policy,
+            )
+            return
+        if key == "cache_size":
+            ext.compactor.policy = PreferencesEventListener.retention(
+                max_size=value,
+                policy=ext.compactor.policy,
+            )
+            return
+        if key == "hot_window":
+            PreferencesEventListener.tiering(window=value)
+            return
+        if key == "hot_memory":
+            PreferencesEventListener.tiering(memory=value)
+            return
+
+        if key == "webhook_port":
+            ext.webhook_port = PreferencesEventListener.webhook_port(value)
+        else:
+            ext.webhook_secret = value or None
+        ext.serve_webhooks()
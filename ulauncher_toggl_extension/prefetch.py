@@ -0,0 +1,252 @@
+"""Speculative rendering of the views a user is most likely to open next.
+
+Classes:
+    QueryHistory: Persisted transition frequencies between visited views.
+    Prefetcher: Renders predicted views in the background within a time budget.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Final, Optional
+
+from ulauncher_toggl_extension.scheduler import Priority, priority
+from ulauncher_toggl_extension.worker import (
+    IdleTimer,
+    QueryCancelledError,
+    time_limit,
+)
+
+if TYPE_CHECKING:
+    from ulauncher_toggl_extension.extension import TogglExtension
+
+log = logging.getLogger(__name__)
+
+
+class QueryHistory:
+    """Counts how often a user moves from one view to another.
+
+    Views are identified by their canonical command path with the default
+    view being an empty string. e.g. `""` -> `"list"` -> `"project list"`.
+
+    Methods:
+        record: Counts a transition between two views.
+        predict: Most likely next views from the current one.
+        load: Loads the transitions from disk.
+        save: Persists the transitions if anything changed.
+
+    Attributes:
+        dirty: Whether transitions were recorded since the last save.
+    """
+
+    VERSION: Final[int] = 1
+    FILE_NAME: Final[str] = "history.json"
+
+    __slots__ = ("_dirty", "_lock", "path", "transitions")
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.transitions: defaultdict[str, Counter[str]] = defaultdict(Counter)
+        self._dirty = False
+        self._lock = Lock()
+
+    @classmethod
+    def from_cache(cls, cache_path: Path) -> QueryHistory:
+        history = cls(Path(cache_path) / cls.FILE_NAME)
+        history.load()
+        return history
+
+    @property
+    def dirty(self) -> bool:
+        with self._lock:
+            return self._dirty
+
+    def record(self, previous: str, current: str) -> None:
+        with self._lock:
+            self.transitions[previous][current] += 1
+            self._dirty = True
+
+    def predict(self, current: str, limit: int = 2) -> list[str]:
+        with self._lock:
+            counter = self.transitions.get(current)
+            if not counter:
+                return []
+            return [view for view, _ in counter.most_common(limit)]
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            log.exception("Failed to load the query history at %s.", self.path)
+            return
+
+        if data.get("version") != self.VERSION:
+            log.info("Discarding query history with an outdated version.")
+            return
+
+        with self._lock:
+            for previous, counts in data.get("transitions", {}).items():
+                self.transitions[previous].update(counts)
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": self.VERSION,
+                "transitions": {k: dict(v) for k, v in self.transitions.items()},
+            }
+            self._dirty = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as file:
+            json.dump(data, file)
+        tmp.replace(self.path)
+
+
+class Prefetcher:
+    """Renders the likely next views while the current one is being shown.
+
+    Predictions come from the local query history. Rendered views land in
+    the extensions result cache so opening them is served from memory.
+
+    Only views the user settled on count. A visited view has to stay on
+    screen for the settle delay before its transition is recorded and its
+    predictions are prefetched, so intermediate views passed while typing
+    never pollute the history. Both happen on a single idle thread.
+
+    Each run stops once the time budget is spent, cancelling a view that is
+    still rendering at its next checkpoint. Views that alone exceed the
+    budget are not prefetched again during the session. The history is
+    saved once no transition was recorded for the save delay.
+
+    Methods:
+        visit: Registers a rendered view to settle on.
+        join: Waits for pending prefetching and history saves to finish.
+
+    Attributes:
+        budget: Wall time a single prefetching run is allowed to take.
+        max_views: Maximum amount of views to prefetch per visit.
+        previous: Last view that was settled on.
+    """
+
+    BUDGET: Final[timedelta] = timedelta(milliseconds=500)
+    SETTLE: Final[timedelta] = timedelta(milliseconds=750)
+    SAVE_DELAY: Final[timedelta] = timedelta(seconds=30)
+
+    __slots__ = (
+        "_expensive",
+        "_history",
+        "_pending",
+        "_saver",
+        "_settler",
+        "budget",
+        "extension",
+        "max_views",
+        "previous",
+    )
+
+    def __init__(
+        self,
+        extension: TogglExtension,
+        budget: Optional[timedelta] = None,
+        max_views: int = 2,
+        settle: Optional[timedelta] = None,
+        save_delay: Optional[timedelta] = None,
+    ) -> None:
+        self.extension = extension
+        self.budget = budget or self.BUDGET
+        self.max_views = max_views
+        self.previous: Optional[str] = None
+        self._history: Optional[QueryHistory] = None
+        self._expensive: set[str] = set()
+        self._pending: Optional[str] = None
+        self._settler = IdleTimer(
+            self._settle,
+            self.SETTLE if settle is None else settle,
+            "toggl-prefetch",
+        )
+        self._saver = IdleTimer(
+            self._save,
+            self.SAVE_DELAY if save_delay is None else save_delay,
+            "toggl-history",
+        )
+
+    def visit(self, view: Optional[str]) -> None:
+        """Registers a rendered view, which is settled on once left alone.
+
+        Args:
+            view: Canonical path of the view or None if the query was not a
+                plain navigational view.
+        """
+        self._pending = view
+        self._settler.touch()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Waits for pending work. Returns whether everything finished."""
+        return self._settler.wait(timeout) and self._saver.wait(timeout)
+
+    def _settle(self) -> None:
+        view = self._pending
+        if view is None:
+            return
+
+        history = self.history
+        if self.previous is not None and self.previous != view:
+            history.record(self.previous, view)
+            self._saver.touch()
+        self.previous = view
+
+        predictions = [
+            v
+            for v in history.predict(view, self.max_views + len(self._expensive))
+            if v != view and v not in self._expensive
+        ][: self.max_views]
+        self._run(predictions)
+
+    def _run(self, views: list[str]) -> None:
+        deadline = time.monotonic() + self.budget.total_seconds()
+        try:
+            for view in views:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    log.debug("Prefetch budget spent. Skipping '%s'.", view)
+                    break
+                self._warm(view, timedelta(seconds=remaining))
+        except Exception:
+            log.exception("Failed to prefetch %s.", views)
+
+    def _save(self) -> None:
+        try:
+            self.history.save()
+        except OSError:
+            log.exception("Failed to save the query history.")
+
+    def _warm(self, view: str, remaining: timedelta) -> None:
+        start = time.monotonic()
+        try:
+            with priority(Priority.BACKGROUND), time_limit(remaining):
+                self.extension.warm(view)
+        except QueryCancelledError:
+            log.debug("Ran out of time prefetching '%s'.", view)
+
+        if time.monotonic() - start >= self.budget.total_seconds():
+            log.info("View '%s' is too expensive to prefetch.", view)
+            self._expensive.add(view)
+
+    @property
+    def history(self) -> QueryHistory:
+        path = Path(self.extension.cache_path)
+        if self._history is None or self._history.path.parent != path:
+            self._history = QueryHistory.from_cache(path)
+        return self._history
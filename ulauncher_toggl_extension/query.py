@@ -284,7 +284,7 @@ class QueryParser:
         quoted = False
 
         total = 3 if args[1] in self._subcommands else 2
-        for i, arg in enumerate(args[total:], start=2):
+        for i, arg in enumerate(args[total:], start=total):
             if not arg:
                 continue
 
@@ -0,0 +1,274 @@
+"""Helpers for rendering query results inside the launcher.
+
+Classes:
+    ResultCache: Short lived cache of rendered results keyed by query.
+    PreviewTask: A single preview to render.
+    PreviewRenderer: Renders previews within a latency budget.
+
+Examples:
+    >>> cache = ResultCache(timedelta(seconds=5))
+    >>> cache.set("tgl list", results)
+    >>> cache.get("tgl list")
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import timedelta
+from itertools import chain
+from threading import Lock
+from typing import TYPE_CHECKING, Final, Generic, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ResultCache(Generic[T]):
+    """Thread safe cache for results that were already rendered once.
+
+    Every entry is stamped with the generation it was computed in. Bumping the
+    generation with `invalidate` drops every entry at once, which is done
+    whenever the underlying data changes through a command or a sync.
+
+    Methods:
+        get: Retrieves a cached entry if its still fresh.
+        peek: Retrieves a cached entry of the current generation even if it
+            expired.
+        set: Stores an entry as long as no invalidation happened while it
+            was being computed.
+        invalidate: Clears the cache and increments the generation counter.
+
+    Attributes:
+        expiration: How long an entry can be served for.
+        max_size: Maximum amount of entries before the oldest are evicted.
+        generation: Counter that increments on every invalidation.
+    """
+
+    EXPIRATION: Final[timedelta] = timedelta(seconds=5)
+
+    __slots__ = ("_data", "_lock", "expiration", "generation", "max_size")
+
+    def __init__(
+        self,
+        expiration: Optional[timedelta] = None,
+        max_size: int = 32,
+    ) -> None:
+        self.expiration = expiration or self.EXPIRATION
+        self.max_size = max_size
+        self.generation = 0
+        self._data: OrderedDict[str, tuple[int, float, T]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> T | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            generation, ts, value = entry
+            if (
+                generation != self.generation
+                or time.monotonic() - ts > self.expiration.total_seconds()
+            ):
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+
+        log.debug("Serving rendered results for '%s' from memory.", key)
+        return value
+
+    def peek(self, key: str) -> tuple[T, bool] | None:
+        """Retrieves an entry until the generation changes, regardless of age.
+
+        Returns:
+            tuple | None: The value and whether it is still fresh or None if
+                there is no entry of the current generation.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != self.generation:
+                return None
+            _, ts, value = entry
+            self._data.move_to_end(key)
+
+        return value, time.monotonic() - ts <= self.expiration.total_seconds()
+
+    def set(self, key: str, value: T, generation: Optional[int] = None) -> bool:
+        """Stores rendered results.
+
+        Args:
+            key: Normalized query the results belong to.
+            value: Rendered results.
+            generation: Generation the computation started in. If the cache
+                was invalidated in the meantime the value is discarded.
+
+        Returns:
+            bool: Whether the value was stored.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+
+            self._data[key] = (self.generation, time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+        return True
+
+    def invalidate(self) -> int:
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+            log.debug("Invalidated rendered results. Generation %s.", self.generation)
+            return self.generation
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+@dataclass(frozen=True)
+class PreviewTask(Generic[T]):
+    """Single preview that needs to be rendered.
+
+    Attributes:
+        key: Identifier of the preview for reusing in-flight and finished work.
+        func: Callable rendering the preview.
+        placeholder: Results shown if a deferred preview misses the deadline.
+        deferred: Whether the preview is expensive and should be rendered on
+            the background pool instead of inline.
+    """
+
+    key: str = field()
+    func: Callable[[], list[T]] = field()
+    placeholder: list[T] = field(default_factory=list)
+    deferred: bool = field(default=False)
+
+
+class PreviewRenderer(Generic[T]):
+    """Renders previews within a fixed latency budget.
+
+    Cheap previews are rendered inline while expensive ones are submitted to
+    a small thread pool, so the cheap ones render while the expensive ones
+    are still running. Whatever expensive previews are not done by the
+    deadline get replaced with their placeholders and keep running in the
+    background. Once finished they are stored and served on every render
+    until the results are invalidated. Expired ones are still served while
+    they are rendered again in the background.
+
+    Methods:
+        render: Renders a sequence of previews in order.
+        invalidate: Drops all finished background results.
+
+    Attributes:
+        budget: Maximum time spent waiting on expensive previews.
+        ready: Results of expensive previews that already finished.
+    """
+
+    BUDGET: Final[timedelta] = timedelta(milliseconds=100)
+
+    __slots__ = ("_inflight", "_lock", "_pool", "budget", "ready")
+
+    def __init__(
+        self,
+        budget: Optional[timedelta] = None,
+        max_workers: int = 2,
+    ) -> None:
+        self.budget = budget or self.BUDGET
+        self.ready: ResultCache[list[T]] = ResultCache()
+        self._inflight: dict[str, Future[list[T]]] = {}
+        self._lock = Lock()
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="toggl-preview")
+
+    def render(
+        self,
+        tasks: Sequence[PreviewTask[T]],
+        *,
+        limit: Optional[int] = None,
+    ) -> list[T]:
+        """Renders previews keeping the order they were supplied in.
+
+        Args:
+            tasks: Previews to render.
+            limit: Soft limit of results. Stops adding previews once reached,
+                but always keeps the full preview that crossed it.
+
+        Returns:
+            list: Flattened results of all the previews.
+        """
+        deadline = time.monotonic() + self.budget.total_seconds()
+        rendered: list[list[T]] = []
+        pending: dict[Future[list[T]], int] = {}
+
+        total = 0
+        for i, task in enumerate(tasks):
+            if limit is not None and total >= limit:
+                break
+
+            preview = self._ready(task) if task.deferred else task.func()
+            if preview is None:
+                pending[self._submit(task)] = i
+                preview = task.placeholder
+
+            rendered.append(preview)
+            total += len(preview)
+
+        done, _ = wait(pending, max(0.0, deadline - time.monotonic()))
+        for future, i in pending.items():
+            if future not in done:
+                log.debug("Preview %s missed the deadline.", tasks[i].key)
+            else:
+                rendered[i] = future.result() if future.exception() is None else []
+
+        return list(chain.from_iterable(rendered))
+
+    def _ready(self, task: PreviewTask[T]) -> list[T] | None:
+        entry = self.ready.peek(task.key)
+        if entry is None:
+            return None
+
+        preview, fresh = entry
+        if not fresh:
+            log.debug("Refreshing expired preview %s.", task.key)
+            self._submit(task)
+        return preview
+
+    def _submit(self, task: PreviewTask[T]) -> Future[list[T]]:
+        with self._lock:
+            future = self._inflight.get(task.key)
+            if future is not None:
+                return future
+
+            generation = self.ready.generation
+            future = self._pool.submit(task.func)
+            self._inflight[task.key] = future
+
+        def finish(done: Future[list[T]]) -> None:
+            with self._lock:
+                self._inflight.pop(task.key, None)
+            if done.exception() is not None:
+                log.error(
+                    "Failed to render preview %s.",
+                    task.key,
+                    exc_info=done.exception(),
+                )
+                return
+            self.ready.set(task.key, done.result(), generation)
+
+        future.add_done_callback(finish)
+        return future
+
+    def invalidate(self) -> None:
+        self.ready.invalidate()
@@ -0,0 +1,264 @@
+"""Rate limit aware scheduling of every request sent to the Toggl API.
+
+All endpoints authenticate through `ScheduledAuth`, which holds each request
+until the shared `RequestScheduler` hands out a token. Tokens refill at a
+steady rate up to a small burst, while a reserve is held back for
+interactive requests, so background work can never starve starting or
+stopping a tracker. Waiting requests are served by priority first and
+arrival second.
+
+Throttled responses pause the scheduler for the duration the API asked for
+and halve the refill rate, which then recovers gradually with every
+successful request.
+
+Classes:
+    Priority: Urgency of a request.
+    RequestScheduler: Token bucket shared by all requests.
+    ScheduledAuth: Basic authentication routed through the scheduler.
+
+Functions:
+    priority: Sets the priority of requests sent by the current thread.
+    current_priority: Priority of requests sent by the current thread.
+    retry_after: Delay a throttled response asked for.
+
+Examples:
+    >>> auth = ScheduledAuth(BasicAuth(api_token, "api_token"))
+    >>> with priority(Priority.INTERACTIVE):
+    ...     TrackerEndpoint(231231, auth, cache).stop(1)
+"""
+
+from __future__ import annotations
+
+import enum
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from threading import Condition, local
+from typing import TYPE_CHECKING, Final, Optional
+
+from httpx import BasicAuth, codes
+
+from ulauncher_toggl_extension.worker import checkpoint
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterator
+
+    from httpx import Request, Response
+
+log = logging.getLogger(__name__)
+
+_state = local()
+
+
+class Priority(enum.IntEnum):
+    """Urgency of a request. Lower values are served first.
+
+    Attributes:
+        INTERACTIVE: Starting, stopping and checking the running tracker.
+        QUERY: Anything the user is currently waiting on.
+        SYNC: Reconciling caches in the background.
+        BACKGROUND: Prefetching and bulk work.
+    """
+
+    INTERACTIVE = enum.auto()
+    QUERY = enum.auto()
+    SYNC = enum.auto()
+    BACKGROUND = enum.auto()
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[Priority]:
+    """Sets the priority of requests sent by the current thread."""
+    previous = current_priority()
+    _state.priority = level
+    try:
+        yield level
+    finally:
+        _state.priority = previous
+
+
+def current_priority() -> Priority:
+    """Priority of requests sent by the current thread. Defaults to QUERY."""
+    return getattr(_state, "priority", Priority.QUERY)
+
+
+def retry_after(response: Response, default: timedelta) -> float:
+    """Seconds a throttled response asked to wait before retrying.
+
+    Accepts both forms of the `Retry-After` header, falling back to the
+    default if it is missing or malformed.
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return default.total_seconds()
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default.total_seconds()
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RequestScheduler:
+    """Token bucket handing out requests by priority.
+
+    Methods:
+        acquire: Blocks until a request of a priority may be sent.
+        throttled: Pauses the scheduler after the API throttled a request.
+        succeeded: Recovers the refill rate after a successful request.
+
+    Attributes:
+        rate: Base amount of tokens refilled every second.
+        burst: Maximum amount of tokens the bucket holds.
+        reserve: Tokens only interactive requests are allowed to use.
+    """
+
+    RATE: Final[float] = 1.0
+    BURST: Final[int] = 4
+    RESERVE: Final[int] = 1
+    MIN_RATE: Final[float] = 0.1
+    POLL: Final[float] = 0.1
+
+    __slots__ = (
+        "_cond",
+        "_counter",
+        "_paused",
+        "_rate",
+        "_tokens",
+        "_updated",
+        "_waiting",
+        "burst",
+        "rate",
+        "reserve",
+    )
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        reserve: Optional[int] = None,
+    ) -> None:
+        self.rate = rate or self.RATE
+        self.burst = burst or self.BURST
+        self.reserve = self.RESERVE if reserve is None else reserve
+        self._rate = self.rate
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused = 0.0
+        self._waiting: list[tuple[Priority, int]] = []
+        self._counter = itertools.count()
+        self._cond = Condition()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self._rate)
+        self._updated = now
+
+    def _delay(self, ticket: tuple[Priority, int]) -> float:
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._paused:
+            return self._paused - now
+        if self._waiting[0] != ticket:
+            return self.POLL
+
+        level, _ = ticket
+        needed = 1 + (0 if level is Priority.INTERACTIVE else self.reserve)
+        if self._tokens >= needed:
+            return 0.0
+        return (needed - self._tokens) / self._rate
+
+    def acquire(self, level: Priority = Priority.QUERY) -> None:
+        """Blocks until a request of the given priority may be sent.
+
+        Only the most urgent waiting request is considered for a token and
+        anything but interactive requests leave the reserve untouched.
+
+        Raises:
+            QueryCancelledError: If a newer query superseded the one waiting.
+        """
+        ticket = (level, next(self._counter))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            self._cond.notify_all()
+            try:
+                while (delay := self._delay(ticket)) > 0:
+                    self._cond.wait(min(delay, self.POLL))
+                    checkpoint()
+                self._tokens -= 1
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def throttled(self, delay: float) -> None:
+        """Pauses every request for the delay and halves the refill rate."""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = 0.0
+            self._paused = max(self._paused, now + delay)
+            self._rate = max(self.MIN_RATE, self._rate / 2)
+            self._cond.notify_all()
+        log.warning("Throttled by the API. Pausing requests for %ss.", delay)
+
+    def succeeded(self) -> None:
+        """Gradually recovers the refill rate after throttling."""
+        if self._rate >= self.rate:
+            return
+        with self._cond:
+            self._rate = min(self.rate, self._rate + self.rate / 10)
+
+
+_scheduler = RequestScheduler()
+
+
+class ScheduledAuth(BasicAuth):
+    """Basic authentication that sends requests through a scheduler.
+
+    Subclasses `BasicAuth` so it can be passed to any endpoint in place of
+    the credentials it wraps. Throttled requests are retried once the API
+    allows it, unless it asks for a longer wait than `MAX_WAIT`.
+
+    Attributes:
+        auth: Wrapped credentials.
+        scheduler: Scheduler requests wait on. Defaults to the one shared by
+            the whole extension.
+    """
+
+    RETRIES: Final[int] = 2
+    BACKOFF: Final[timedelta] = timedelta(seconds=5)
+    MAX_WAIT: Final[timedelta] = timedelta(seconds=30)
+
+    def __init__(
+        self,
+        auth: BasicAuth,
+        scheduler: Optional[RequestScheduler] = None,
+    ) -> None:
+        self.auth = auth
+        self.scheduler = scheduler or _scheduler
+
+    def auth_flow(self, request: Request) -> Generator[Request, Response, None]:
+        level = current_priority()
+        request = next(self.auth.auth_flow(request))
+        for attempt in range(self.RETRIES + 1):
+            self.scheduler.acquire(level)
+            response = yield request
+            if response.status_code != codes.TOO_MANY_REQUESTS:
+                self.scheduler.succeeded()
+                return
+
+            delay = retry_after(response, self.BACKOFF)
+            self.scheduler.throttled(delay)
+            if attempt == self.RETRIES or delay > self.MAX_WAIT.total_seconds():
+                return
+            log.info("Retrying %s %s after %ss.", request.method, request.url, delay)
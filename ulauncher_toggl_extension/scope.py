@@ -0,0 +1,184 @@
+"""Request scoped memoization and single-flight of model fetches.
+
+Rendering a single query asks for the same models from several previews,
+views and handlers. Every fetch made while a `RenderScope` is active is
+memoized for the lifetime of that render, so each distinct fetch runs once.
+
+Underneath the scopes, identical fetches that are in flight at the same
+time on different threads are collapsed into a single call whose result is
+shared by every caller.
+
+Classes:
+    SingleFlight: Collapses concurrent identical calls into one.
+    RenderScope: Memoizes fetches for the lifetime of a single render.
+
+Functions:
+    current_scope: Scope active on the current thread.
+    bind: Runs a callable within the scope of the current thread.
+    fetch: Fetches through the active scope or single-flight.
+
+Examples:
+    >>> with RenderScope():
+    ...     fetch(("current", path, False), partial(user.current, refresh=False))
+    ...     fetch(("current", path, False), partial(user.current, refresh=False))
+    TogglTracker(...)
+    TogglTracker(...)
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Future, wait
+from functools import partial
+from threading import Lock, local
+from typing import TYPE_CHECKING, Any, Final, Optional, TypeVar, cast
+
+from ulauncher_toggl_extension.worker import QueryCancelledError, checkpoint
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_state = local()
+
+
+class SingleFlight:
+    """Shares the result of a call with every identical call made meanwhile.
+
+    Results are only shared while the call is in flight. Callers arriving
+    afterwards run the call again.
+
+    Methods:
+        do: Runs a call unless an identical one is already in flight.
+    """
+
+    POLL: Final[float] = 0.1
+
+    __slots__ = ("_calls", "_lock")
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, Future[Any]] = {}
+        self._lock = Lock()
+
+    def do(self, key: Hashable, call: Callable[[], T]) -> T:
+        """Runs a call or waits on the identical call already in flight.
+
+        A call cancelled by its own query is run again by the waiters
+        instead of cancelling them too.
+
+        Raises:
+            QueryCancelledError: If the query of the caller was superseded
+                while waiting.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if future is None:
+                future = self._calls[key] = Future()
+
+        if not owner:
+            while not wait((future,), self.POLL).done:
+                checkpoint()
+            try:
+                return future.result()
+            except QueryCancelledError:
+                return self.do(key, call)
+
+        try:
+            result = call()
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+_flights = SingleFlight()
+
+
+class RenderScope:
+    """Memoized fetches of a single render.
+
+    Activated as a context manager on the thread evaluating a query. Work
+    handed to other threads takes the scope along through `bind`.
+
+    Methods:
+        fetch: Fetches once per key for the lifetime of the scope.
+        run: Calls a function with the scope active.
+    """
+
+    __slots__ = ("_lock", "_results")
+
+    def __init__(self) -> None:
+        self._results: dict[Hashable, Any] = {}
+        self._lock = Lock()
+
+    def __enter__(self) -> Self:
+        _stack().append(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        _stack().pop()
+
+    def fetch(self, key: Hashable, call: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+
+        result = _flights.do(key, call)
+        with self._lock:
+            return self._results.setdefault(key, result)
+
+    def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self:
+            return func(*args, **kwargs)
+
+
+def _stack() -> list[RenderScope]:
+    stack: Optional[list[RenderScope]] = getattr(_state, "stack", None)
+    if stack is None:
+        stack = _state.stack = []
+    return stack
+
+
+def current_scope() -> Optional[RenderScope]:
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def bind(func: Callable[..., T]) -> Callable[..., T]:
+    """Binds a callable to the scope active on the current thread, if any."""
+    scope = current_scope()
+    return func if scope is None else cast("Callable[..., T]", partial(scope.run, func))
+
+
+def fetch(key: Hashable, call: Callable[[], T]) -> T:
+    """Fetches through the active scope, falling back to single-flight.
+
+    Args:
+        key: Identifies the fetch. Has to cover everything the result
+            depends on.
+        call: Performs the actual fetch.
+
+    Returns:
+        The memoized, shared or freshly fetched result.
+    """
+    scope = current_scope()
+    if scope is None:
+        return _flights.do(key, call)
+    return scope.fetch(key, call)
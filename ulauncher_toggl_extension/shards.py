@@ -0,0 +1,284 @@
+"""Time partitioned, compressed shards of closed tracker history.
+
+Closed months never change, but the JSON cache stores, loads and rewrites
+them together with today's entries. Once a month lies completely outside
+the hot window its stopped trackers are moved out of the tracker cache into
+a gzip compressed shard of that month. Shards are written once and only
+touched again when a tracker of that month is edited or deleted, so queries
+within the hot window never decompress or parse older history.
+
+Classes:
+    TrackerShards: Monthly shards belonging to a tracker cache file.
+    ShardedSession: Journal session moving closed months into shards.
+    ShardedCache: Journaled tracker cache backed by shards.
+
+Functions:
+    archive: Moves closed months of a tracker cache into shards.
+
+Examples:
+    >>> shards = TrackerShards(Path("cache/cache_tracker.json"))
+    >>> shards.select(since=date(2024, 1, 1), until=date(2024, 3, 1))
+    [PosixPath('cache/cache_tracker.shards/2024-01.json.gz'), ...]
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Final, Optional
+
+from toggl_api import TogglTracker
+from toggl_api.meta.cache.json_cache import CustomEncoder
+from toggl_api.version import version
+
+from ulauncher_toggl_extension.codec import decode_models
+from ulauncher_toggl_extension.journal import (
+    JournalCache,
+    JournalOp,
+    JournalSession,
+    journal_path,
+    replay,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+    from toggl_api.meta.cached_endpoint import TogglCachedEndpoint
+
+log = logging.getLogger(__name__)
+
+
+WINDOW: Final[timedelta] = timedelta(weeks=4)
+
+
+def _month(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+class TrackerShards:
+    """Monthly shards of closed trackers next to a tracker cache file.
+
+    Methods:
+        key: Month a tracker belongs to.
+        select: Shards overlapping a date range, oldest first.
+        read: Decompresses a shard into JSON.
+        load: Decodes the trackers of a shard.
+        write: Merges trackers into the shard of their month.
+        remove: Removes trackers from the shards they are stored in.
+
+    Attributes:
+        path: Directory the shards are stored in.
+    """
+
+    SUFFIX: Final[str] = ".shards"
+    EXTENSION: Final[str] = ".json.gz"
+    LEVEL: Final[int] = 6
+
+    __slots__ = ("path",)
+
+    def __init__(self, cache_file: Path) -> None:
+        self.path = cache_file.with_suffix(self.SUFFIX)
+
+    @staticmethod
+    def key(tracker: TogglTracker) -> date:
+        return _month(tracker.start.astimezone(timezone.utc).date())
+
+    def shard(self, month: date) -> Path:
+        return self.path / f"{month:%Y-%m}{self.EXTENSION}"
+
+    @classmethod
+    def month(cls, shard: Path) -> date:
+        year, _, month = shard.name.removesuffix(cls.EXTENSION).partition("-")
+        return date(int(year), int(month), 1)
+
+    def select(
+        self,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+    ) -> list[Path]:
+        """Shards overlapping a date range, oldest first.
+
+        Args:
+            since: Earliest date needed. Includes the oldest shard if None.
+            until: Latest date needed. Includes the newest shard if None.
+        """
+        shards = []
+        for shard in sorted(self.path.glob(f"*{self.EXTENSION}")):
+            try:
+                month = self.month(shard)
+            except ValueError:
+                continue
+            if since is not None and _next_month(month) <= _date(since):
+                continue
+            if until is not None and month > _date(until):
+                continue
+            shards.append(shard)
+        return shards
+
+    @staticmethod
+    def read(shard: Path) -> bytes:
+        return gzip.decompress(shard.read_bytes())
+
+    def load(self, shard: Path) -> list[TogglTracker]:
+        try:
+            return decode_models(self.read(shard))  # type: ignore[return-value]
+        except FileNotFoundError:
+            return []
+
+    def _save(self, shard: Path, trackers: list[TogglTracker]) -> None:
+        if not trackers:
+            shard.unlink(missing_ok=True)
+            return
+
+        trackers.sort(key=lambda t: t.start)
+        data = json.dumps(
+            {"version": version, "data": trackers},
+            cls=CustomEncoder,
+            separators=(",", ":"),
+        ).encode()
+        shard.parent.mkdir(parents=True, exist_ok=True)
+        tmp = shard.with_suffix(".tmp")
+        tmp.write_bytes(gzip.compress(data, self.LEVEL, mtime=0))
+        tmp.replace(shard)
+
+    def write(self, trackers: Iterable[TogglTracker]) -> int:
+        """Merges trackers into the shards of their months.
+
+        Returns:
+            int: Amount of shards written.
+        """
+        months: defaultdict[date, list[TogglTracker]] = defaultdict(list)
+        for tracker in trackers:
+            months[self.key(tracker)].append(tracker)
+
+        for month, update in months.items():
+            shard = self.shard(month)
+            self._save(shard, replay(self.load(shard), _puts(update)))
+            log.debug("Wrote %s trackers to shard %s.", len(update), shard)
+        return len(months)
+
+    def remove(self, trackers: Iterable[TogglTracker]) -> None:
+        """Removes trackers from the shards of their months if present."""
+        months: defaultdict[date, set[int]] = defaultdict(set)
+        for tracker in trackers:
+            months[self.key(tracker)].add(tracker.id)
+
+        for month, ids in months.items():
+            shard = self.shard(month)
+            if not shard.exists():
+                continue
+            existing = self.load(shard)
+            kept = [t for t in existing if t.id not in ids]
+            if len(kept) != len(existing):
+                self._save(shard, kept)
+
+
+def _date(value: date) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _puts(trackers: Iterable[TogglTracker]) -> list[tuple[JournalOp, TogglTracker]]:
+    return [(JournalOp.PUT, tracker) for tracker in trackers]
+
+
+@dataclass
+class ShardedSession(JournalSession[TogglTracker]):
+    """Journal session that moves closed months into shards on checkpoint.
+
+    A month is closed once it lies completely outside the hot window. Running
+    trackers always stay in the cache file.
+
+    Attributes:
+        window: Hot window that has to remain in the cache file.
+    """
+
+    window: timedelta = field(default=WINDOW)
+
+    def closed(self, trackers: Iterable[TogglTracker]) -> list[TogglTracker]:
+        boundary = _month((datetime.now(timezone.utc) - self.window).date())
+        return [
+            t
+            for t in trackers
+            if t.stop is not None and TrackerShards.key(t) < boundary
+        ]
+
+    def commit(self, path: Path) -> None:
+        self.refresh(path)
+        closed = self.closed(self.data)
+        if closed:
+            # NOTE: Shards are written first, so a crash in between only
+            # leaves duplicates that the cache file takes precedence over.
+            TrackerShards(path).write(closed)
+            moved = {id(t) for t in closed}
+            self.data = [t for t in self.data if id(t) not in moved]
+            log.info("Moved %s closed trackers into shards.", len(closed))
+        super().commit(path)
+
+
+class ShardedCache(JournalCache[TogglTracker]):
+    """Journaled tracker cache keeping closed months in shards.
+
+    Deleting a tracker also removes it from its shard, as a journaled delete
+    can't reach trackers that were already moved out of the cache file.
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        path: Path,
+        expire_after: Optional[timedelta | int] = None,
+        parent: Optional[TogglCachedEndpoint[TogglTracker]] = None,
+        *,
+        max_length: int = 10_000,
+        window: Optional[timedelta] = None,
+    ) -> None:
+        super().__init__(path, expire_after, parent, max_length=max_length)
+        self.session = ShardedSession(
+            max_length=max_length,
+            window=window or WINDOW,
+        )
+        if parent is not None:
+            self.session.load(self.cache_path)
+
+    def delete_entries(
+        self,
+        update: list[TogglTracker] | TogglTracker,
+        **kwargs: Any,
+    ) -> None:
+        super().delete_entries(update, **kwargs)
+        trackers = update if isinstance(update, list) else [update]
+        TrackerShards(self.cache_path).remove(trackers)
+
+
+def archive(cache_file: Path, window: Optional[timedelta] = None) -> int:
+    """Moves closed months of a tracker cache into shards.
+
+    Also checkpoints the journal of the cache as the cache file is rewritten
+    anyway.
+
+    Args:
+        cache_file: Tracker cache file to archive.
+        window: Hot window that has to remain in the cache file.
+
+    Returns:
+        int: Amount of trackers moved into shards.
+    """
+    if not cache_file.exists():
+        return 0
+
+    session = ShardedSession(window=window or WINDOW)
+    session.load(cache_file)
+    closed = len(session.closed(session.data))
+    if closed or journal_path(cache_file).exists():
+        session.commit(cache_file)
+    return closed
@@ -0,0 +1,287 @@
+"""Warm-start snapshots of the models stored in the JSON cache.
+
+Decoding a JSON cache file into models and indexing them is the bulk of the
+work on the first query after a restart. Snapshots store the decoded models
+together with structures derived from them in a versioned binary file next
+to the cache: lookup indexes by id and name, the order of the models by
+recency and maps of the clients, projects and tags the models reference.
+Each snapshot is stamped with the modification time and size of the cache
+file it was built from, and is only used while that stamp still matches.
+
+Classes:
+    CacheSnapshot: Decoded models of a cache file with lookup indexes.
+    SnapshotStore: Loads, builds and persists snapshots on demand.
+
+Attributes:
+    REFERENCES: Attributes whose referenced ids are mapped in snapshots.
+    SNAPSHOTS: Process wide snapshot store.
+
+Examples:
+    >>> snapshot = SNAPSHOTS.get(Path("cache/cache_project.json"))
+    >>> snapshot.find("Ulauncher")
+    TogglProject(...)
+"""
+
+from __future__ import annotations
+
+import logging
+import pickle  # noqa: S403
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Final, Generic, Optional, TypeVar
+
+from toggl_api.models import TogglClass
+
+from ulauncher_toggl_extension.codec import decode_models
+from ulauncher_toggl_extension.journal import journal_path, read_journal, replay
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=TogglClass)
+
+STAMP = tuple[int, int]
+
+REFERENCES: Final[tuple[str, ...]] = ("client", "project", "tags")
+
+
+def cache_stamp(path: Path) -> STAMP | None:
+    """Identifies the current generation of a cache file by mtime and size.
+
+    Includes the journal of the cache file as appending to it changes the
+    cached models just as much.
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    try:
+        journal = journal_path(path).stat()
+    except OSError:
+        return stat.st_mtime_ns, stat.st_size
+    return max(stat.st_mtime_ns, journal.st_mtime_ns), stat.st_size + journal.st_size
+
+
+def _references(value: Any) -> Iterator[int]:
+    if isinstance(value, int):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            ref = item.id if isinstance(item, TogglClass) else item
+            if isinstance(ref, int):
+                yield ref
+
+
+class CacheSnapshot(Generic[T]):
+    """Decoded models of a single cache file with their lookup indexes.
+
+    Methods:
+        find: Looks up a model by id or by name.
+        recent: Models ordered by recency.
+        referencing: Models referencing a client, project or tag.
+        referenced: Ids of the clients, projects or tags referenced at all.
+        load: Loads a snapshot from disk if its still valid.
+        save: Writes the snapshot to disk.
+        from_cache: Builds a snapshot by decoding a cache file.
+
+    Attributes:
+        models: Models in the order they are stored in the cache.
+        stamp: Generation stamp of the cache file the snapshot was built from.
+        ids: Index of model ids to their position.
+        names: Index of model names to the position of their first occurrence.
+        recency: Positions of the models, most recently changed first.
+        references: Positions of the models referencing each client, project
+            or tag id, keyed by the referencing attribute.
+    """
+
+    MAGIC: Final[bytes] = b"TGLSNAP"
+    VERSION: Final[int] = 2
+
+    __slots__ = ("ids", "models", "names", "recency", "references", "stamp")
+
+    def __init__(self, models: Sequence[T], stamp: STAMP) -> None:
+        self.models = list(models)
+        self.stamp = stamp
+        self.ids: dict[int, int] = {}
+        self.names: dict[str, int] = {}
+        self.references: dict[str, dict[int, list[int]]] = {}
+        for i, model in enumerate(self.models):
+            self.ids.setdefault(model.id, i)
+            self.names.setdefault(model.name, i)
+            for attr in REFERENCES:
+                for ref in _references(getattr(model, attr, None)):
+                    self.references.setdefault(attr, {}).setdefault(ref, []).append(i)
+        self.recency = sorted(
+            range(len(self.models)),
+            key=lambda i: self.models[i].timestamp,
+            reverse=True,
+        )
+
+    def find(
+        self,
+        key: int | str,
+        expire_after: Optional[timedelta] = None,
+    ) -> T | None:
+        """Looks up a model by id or name.
+
+        Args:
+            key: Integer id or name of the model.
+            expire_after: Treats models older than this as missing.
+
+        Returns:
+            TogglClass | None: The model or None if its not present or expired.
+        """
+        index = self.ids.get(key) if isinstance(key, int) else self.names.get(key)
+        if index is None:
+            return None
+
+        model = self.models[index]
+        if expire_after is not None and (
+            model.timestamp <= datetime.now(timezone.utc) - expire_after
+        ):
+            return None
+        return model
+
+    def recent(self, expire_after: Optional[timedelta] = None) -> list[T]:
+        """Models ordered by recency, skipping expired ones.
+
+        Args:
+            expire_after: Leaves out models older than this.
+
+        Returns:
+            list: Models with the most recently changed first.
+        """
+        if expire_after is None:
+            return [self.models[i] for i in self.recency]
+
+        cutoff = datetime.now(timezone.utc) - expire_after
+        models = []
+        for i in self.recency:
+            model = self.models[i]
+            if model.timestamp <= cutoff:
+                break
+            models.append(model)
+        return models
+
+    def referencing(self, attr: str, ref: int) -> list[T]:
+        """Models referencing a client, project or tag.
+
+        Args:
+            attr: Attribute holding the reference, e.g. `project` or `tags`.
+            ref: Id of the referenced model.
+
+        Returns:
+            list: Models in the order they are stored in the cache.
+        """
+        return [self.models[i] for i in self.references.get(attr, {}).get(ref, [])]
+
+    def referenced(self, attr: str) -> set[int]:
+        """Ids referenced by at least one model through an attribute."""
+        return set(self.references.get(attr, {}))
+
+    @classmethod
+    def load(cls, path: Path, stamp: STAMP) -> CacheSnapshot[T] | None:
+        try:
+            with path.open("rb") as file:
+                if file.read(len(cls.MAGIC)) != cls.MAGIC:
+                    return None
+                version, snapshot_stamp, state = pickle.load(file)  # noqa: S301
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            log.exception("Failed to load cache snapshot %s.", path)
+            return None
+
+        if version != cls.VERSION or tuple(snapshot_stamp) != stamp:
+            log.debug("Discarding outdated cache snapshot %s.", path)
+            return None
+
+        snapshot = cls.__new__(cls)
+        (
+            snapshot.models,
+            snapshot.ids,
+            snapshot.names,
+            snapshot.recency,
+            snapshot.references,
+        ) = state
+        snapshot.stamp = stamp
+        return snapshot
+
+    def save(self, path: Path) -> None:
+        state = (self.models, self.ids, self.names, self.recency, self.references)
+        tmp = path.with_suffix(".tmp")
+        try:
+            with tmp.open("wb") as file:
+                file.write(self.MAGIC)
+                pickle.dump(
+                    (self.VERSION, self.stamp, state),
+                    file,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            tmp.replace(path)
+        except OSError:
+            log.exception("Failed to write cache snapshot %s.", path)
+
+    @classmethod
+    def from_cache(cls, path: Path, stamp: STAMP) -> CacheSnapshot[T]:
+        models = decode_models(path.read_bytes())
+        entries, _ = read_journal(journal_path(path))
+        return cls(replay(models, entries), stamp)  # type: ignore[arg-type]
+
+
+class SnapshotStore:
+    """Keeps warm-start snapshots of cache files in memory and on disk.
+
+    Snapshots are rebuilt and written the first time a cache file is read
+    after it changed.
+
+    Methods:
+        get: Retrieves a valid snapshot of a cache file.
+    """
+
+    SUFFIX: Final[str] = ".snapshot"
+
+    __slots__ = ("_lock", "_memory")
+
+    def __init__(self) -> None:
+        self._memory: dict[Path, CacheSnapshot] = {}
+        self._lock = Lock()
+
+    def get(self, cache_file: Path) -> CacheSnapshot | None:
+        """Retrieves a snapshot matching the current state of a cache file.
+
+        Args:
+            cache_file: JSON cache file the snapshot belongs to.
+
+        Returns:
+            CacheSnapshot | None: Valid snapshot or None if the cache file is
+                missing or can't be read.
+        """
+        stamp = cache_stamp(cache_file)
+        if stamp is None:
+            return None
+
+        with self._lock:
+            snapshot = self._memory.get(cache_file)
+            if snapshot is not None and snapshot.stamp == stamp:
+                return snapshot
+
+            path = cache_file.with_suffix(self.SUFFIX)
+            snapshot = CacheSnapshot.load(path, stamp)
+            if snapshot is None:
+                try:
+                    snapshot = CacheSnapshot.from_cache(cache_file, stamp)
+                except (OSError, ValueError, KeyError):
+                    log.exception("Failed to build a snapshot of %s.", cache_file)
+                    return None
+                snapshot.save(path)
+                log.debug("Rebuilt the cache snapshot of %s.", cache_file)
+
+            self._memory[cache_file] = snapshot
+            return snapshot
+
+
+SNAPSHOTS: Final[SnapshotStore] = SnapshotStore()
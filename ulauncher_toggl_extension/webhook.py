@@ -0,0 +1,337 @@
+"""Push based cache updates through Toggl webhooks.
+
+Toggl can send a webhook event for every change to time entries, projects,
+tags and clients. A relay forwarding those events to the local machine lets
+the extension keep its cache current without polling the API.
+
+Classes:
+    WebhookEvent: A single parsed webhook event.
+    WebhookReceiver: Embedded HTTP listener that applies events to the cache.
+
+Examples:
+    >>> receiver = WebhookReceiver(extension, 8642, secret="...")
+    >>> receiver.start()
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Any, Final, Optional, cast
+
+from toggl_api import (
+    ClientEndpoint,
+    ProjectEndpoint,
+    TagEndpoint,
+    TogglTracker,
+    TrackerEndpoint,
+)
+from toggl_api.meta import RequestMethod
+
+from ulauncher_toggl_extension.codec import dumps, loads
+from ulauncher_toggl_extension.columns import COLUMNS
+from ulauncher_toggl_extension.commands import CurrentTrackerCommand
+from ulauncher_toggl_extension.journal import JournalCache
+from ulauncher_toggl_extension.shards import ShardedCache
+from ulauncher_toggl_extension.workspaces import namespaces
+
+if TYPE_CHECKING:
+    from toggl_api.meta.cached_endpoint import TogglCachedEndpoint
+    from toggl_api.models import TogglClass
+
+    from ulauncher_toggl_extension.extension import TogglExtension
+    from ulauncher_toggl_extension.workspaces import Workspace
+
+log = logging.getLogger(__name__)
+
+
+ENDPOINTS: Final[dict[str, type[TogglCachedEndpoint]]] = {
+    "time_entry": TrackerEndpoint,
+    "project": ProjectEndpoint,
+    "tag": TagEndpoint,
+    "client": ClientEndpoint,
+}
+
+
+@dataclass(frozen=True)
+class WebhookEvent:
+    """Webhook event for a single modified model.
+
+    Attributes:
+        event_id: Unique identifier of the event used for discarding retries.
+        model: Type of the modified model. e.g. 'time_entry' or 'project'.
+        action: What happened to the model. e.g. 'created' or 'deleted'.
+        payload: Model data in the same format as the API returns.
+    """
+
+    event_id: int = field()
+    model: str = field()
+    action: str = field()
+    payload: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> WebhookEvent:
+        """Parses the body of a webhook request.
+
+        Raises:
+            KeyError: If the event is missing required fields.
+            TypeError: If the payload is not model data.
+        """
+        metadata = data["metadata"]
+        payload = data["payload"]
+        if not isinstance(payload, dict):
+            msg = f"Unsupported webhook payload: {payload}"
+            raise TypeError(msg)
+
+        return cls(
+            int(data["event_id"]),
+            metadata["model"],
+            metadata["action"],
+            payload,
+        )
+
+    @property
+    def deleted(self) -> bool:
+        return self.action == "deleted"
+
+
+class WebhookReceiver:
+    """Embedded HTTP listener that applies webhook events to the local cache.
+
+    Only listens on the loopback interface. Events for unknown models are
+    acknowledged and ignored while repeated deliveries of the same event are
+    only applied once. Events that failed to apply are not remembered, so
+    their retries get applied again.
+
+    Methods:
+        start: Starts listening on a background thread.
+        stop: Shuts down the listener.
+        verify: Checks the signature of a request body.
+        handle: Processes a raw request body into a response.
+        apply: Applies a single event to the cache.
+
+    Attributes:
+        extension: Extension the cache location and credentials come from.
+        port: Port to listen on. Zero picks a free port.
+        secret: Secret of the webhook subscription used for verifying
+            signatures. If None signatures are not checked.
+    """
+
+    HOST: Final[str] = "127.0.0.1"
+    SIGNATURE_HEADER: Final[str] = "X-Webhook-Signature-256"
+
+    __slots__ = (
+        "_lock",
+        "_seen",
+        "_server",
+        "_thread",
+        "extension",
+        "port",
+        "secret",
+    )
+
+    def __init__(
+        self,
+        extension: TogglExtension,
+        port: int = 0,
+        secret: Optional[str] = None,
+    ) -> None:
+        self.extension = extension
+        self.port = port
+        self.secret = secret
+        self._seen: deque[int] = deque(maxlen=256)
+        self._lock = Lock()
+        self._server: Optional[_WebhookServer] = None
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        if self._server is not None:
+            return
+
+        self._server = _WebhookServer((self.HOST, self.port), self)
+        self.port = self._server.server_address[1]
+        self._thread = Thread(
+            target=self._server.serve_forever,
+            name="toggl-webhook",
+            daemon=True,
+        )
+        self._thread.start()
+        log.info("Listening for webhook events on %s:%s.", self.HOST, self.port)
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+        log.info("Stopped listening for webhook events.")
+
+    def verify(self, body: bytes, signature: Optional[str]) -> bool:
+        if self.secret is None:
+            return True
+        if not signature:
+            return False
+
+        digest = hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(f"sha256={digest}", signature)
+
+    def handle(
+        self,
+        body: bytes,
+        signature: Optional[str] = None,
+    ) -> tuple[HTTPStatus, dict[str, Any]]:
+        """Processes the body of a webhook request.
+
+        Args:
+            body: Raw request body.
+            signature: Value of the signature header if present.
+
+        Returns:
+            tuple: Status code and JSON body to respond with.
+        """
+        if not self.verify(body, signature):
+            log.warning("Rejected webhook event with an invalid signature.")
+            return HTTPStatus.UNAUTHORIZED, {}
+
+        try:
+            data = loads(body)
+            code = data.get("validation_code")
+        except (ValueError, AttributeError):
+            return HTTPStatus.BAD_REQUEST, {}
+
+        # NOTE: Subscriptions are validated by echoing back the code.
+        if code is not None:
+            return HTTPStatus.OK, {"validation_code": code}
+
+        try:
+            event = WebhookEvent.from_json(data)
+        except (KeyError, TypeError, ValueError):
+            log.debug("Ignoring unsupported webhook event: %s", data)
+            return HTTPStatus.OK, {}
+
+        try:
+            self.apply(event)
+        except Exception:
+            log.exception("Failed to apply webhook event %s.", event.event_id)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {}
+
+        return HTTPStatus.OK, {}
+
+    def apply(self, event: WebhookEvent) -> TogglClass | None:
+        """Applies an event to the cache of the affected model type.
+
+        Only the modified model is upserted or removed. Rendered results get
+        invalidated and the running tracker is updated in memory if the event
+        concerns it.
+
+        Returns:
+            TogglClass | None: The modified model or None if the event was
+                ignored.
+        """
+        endpoint_type = ENDPOINTS.get(event.model)
+        if endpoint_type is None:
+            log.debug("Ignoring webhook event for %s.", event.model)
+            return None
+
+        with self._lock:
+            if event.event_id in self._seen:
+                log.debug("Skipping repeated webhook event %s.", event.event_id)
+                return None
+
+            cmd = CurrentTrackerCommand(self.extension)
+            workspace = self._workspace(event)
+            cache: JournalCache = (
+                ShardedCache(workspace.cache_path, window=COLUMNS.window)
+                if endpoint_type is TrackerEndpoint
+                else JournalCache(workspace.cache_path)
+            )
+            endpoint_type(workspace.id, cmd.auth, cache)
+            model_type = cast("type[TogglClass]", endpoint_type.MODEL)
+            model = model_type.from_kwargs(**event.payload)
+            if event.deleted:
+                cache.delete_entries(model)
+                cache.commit()
+            else:
+                cache.save_cache(model, RequestMethod.PUT)
+
+            # NOTE: Failed events stay unseen so the relay's retry applies them.
+            self._seen.append(event.event_id)
+
+        if isinstance(model, TogglTracker):
+            self._update_current(cmd, model, deleted=event.deleted)
+
+        log.info("Applied webhook event: %s %s.", event.model, event.action)
+        self.extension.invalidate()
+        return model
+
+    def _workspace(self, event: WebhookEvent) -> Workspace:
+        # NOTE: Trackers are user wide and always live in the default namespace.
+        workspaces = namespaces(
+            Path(self.extension.cache_path),
+            self.extension.workspace_ids or (self.extension.workspace_id,),  # type: ignore[arg-type]
+        )
+        if event.model != "time_entry":
+            wid = event.payload.get("workspace_id")
+            for workspace in workspaces:
+                if workspace.id == wid:
+                    return workspace
+        return workspaces[0]
+
+    @staticmethod
+    def _update_current(
+        cmd: CurrentTrackerCommand,
+        tracker: TogglTracker,
+        *,
+        deleted: bool,
+    ) -> None:
+        if not deleted and tracker.running():
+            cmd.tracker = tracker
+        elif cmd.tracker is not None and cmd.tracker.id == tracker.id:
+            cmd.tracker = None
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+
+class _WebhookServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        receiver: WebhookReceiver,
+    ) -> None:
+        super().__init__(address, _WebhookHandler)
+        self.receiver = receiver
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    server: _WebhookServer
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        status, response = self.server.receiver.handle(
+            body,
+            self.headers.get(WebhookReceiver.SIGNATURE_HEADER),
+        )
+
+        data = dumps(response)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, PLR6301
+        log.debug(format, *args)
@@ -0,0 +1,270 @@
+"""Background evaluation of keyword queries.
+
+Queries are evaluated one at a time on a single worker thread. Each query
+supersedes any query submitted before it, so work for an outdated query is
+cancelled cooperatively at checkpoints and its results are never rendered.
+
+Classes:
+    QueryCancelledError: Raised at a checkpoint of a superseded query.
+    QueryWorker: Evaluates the latest query on a background thread.
+    IdleTimer: Calls a function once activity stopped for a while.
+
+Functions:
+    checkpoint: Cooperative cancellation point for long running work.
+    time_limit: Cancels work outside of the worker once a deadline passed.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from threading import Condition, Event, Thread, local
+from typing import TYPE_CHECKING, Final, Generic, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+log = logging.getLogger(__name__)
+
+E = TypeVar("E")
+Q = TypeVar("Q")
+R = TypeVar("R")
+
+_state = local()
+
+
+class QueryCancelledError(Exception):
+    """Raised at a checkpoint once a newer query superseded the current one."""
+
+
+def checkpoint() -> None:
+    """Stops work on the current query if a newer query has arrived.
+
+    Does nothing outside of a query worker or a `time_limit`, so commands
+    can call it freely.
+
+    Raises:
+        QueryCancelledError: If the query being evaluated is outdated or
+            the time limit was exceeded.
+    """
+    cancelled: Optional[Event] = getattr(_state, "cancelled", None)
+    if cancelled is not None and cancelled.is_set():
+        raise QueryCancelledError
+
+    deadline: Optional[float] = getattr(_state, "deadline", None)
+    if deadline is not None and time.monotonic() >= deadline:
+        raise QueryCancelledError
+
+
+@contextmanager
+def time_limit(limit: timedelta) -> Iterator[None]:
+    """Cancels work on the current thread at its next checkpoint past a limit.
+
+    Nested limits never extend the deadline of an outer one.
+    """
+    previous: Optional[float] = getattr(_state, "deadline", None)
+    deadline = time.monotonic() + limit.total_seconds()
+    _state.deadline = deadline if previous is None else min(previous, deadline)
+    try:
+        yield
+    finally:
+        _state.deadline = previous
+
+
+class QueryWorker(Generic[E, Q, R]):
+    """Evaluates queries on a background thread, keeping only the latest.
+
+    Queries waiting to be evaluated are replaced by newer ones and the
+    query currently being evaluated is flagged as cancelled, so it stops at
+    its next `checkpoint`. Queries failing with an error are answered with
+    the results of `fail`, so the failure is visible in the launcher.
+
+    Methods:
+        submit: Queues a query and supersedes all earlier ones.
+
+    Attributes:
+        process: Callable that evaluates a query into results.
+        respond: Callable that delivers results for the event.
+        fail: Callable that turns an error evaluating a query into results.
+            Failed queries get no response without it.
+        generation: Counter incremented for every submitted query.
+    """
+
+    __slots__ = (
+        "_cancelled",
+        "_cond",
+        "_pending",
+        "_thread",
+        "fail",
+        "generation",
+        "process",
+        "respond",
+    )
+
+    def __init__(
+        self,
+        process: Callable[[Q], R],
+        respond: Callable[[E, R], None],
+        fail: Optional[Callable[[Exception], R]] = None,
+    ) -> None:
+        self.process = process
+        self.respond = respond
+        self.fail = fail
+        self.generation = 0
+        self._pending: Optional[tuple[int, E, Q]] = None
+        self._cancelled: Optional[Event] = None
+        self._cond = Condition()
+        self._thread: Optional[Thread] = None
+
+    def submit(self, event: E, query: Q) -> int:
+        """Queues a query for evaluation.
+
+        Args:
+            event: Event the results will be delivered for.
+            query: Query to evaluate.
+
+        Returns:
+            int: Generation of the submitted query.
+        """
+        with self._cond:
+            self.generation += 1
+            if self._cancelled is not None:
+                self._cancelled.set()
+            self._pending = (self.generation, event, query)
+            self._cond.notify()
+
+            if self._thread is None:
+                self._thread = Thread(
+                    target=self._run,
+                    name="toggl-query",
+                    daemon=True,
+                )
+                self._thread.start()
+
+            return self.generation
+
+    def _next(self) -> tuple[int, E, Q, Event]:
+        with self._cond:
+            while self._pending is None:
+                self._cond.wait()
+            generation, event, query = self._pending
+            self._pending = None
+            self._cancelled = Event()
+            return generation, event, query, self._cancelled
+
+    def _run(self) -> None:
+        while True:
+            generation, event, query, cancelled = self._next()
+            _state.cancelled = cancelled
+            try:
+                results = self.process(query)
+            except QueryCancelledError:
+                log.debug("Dropped query %s for a newer one.", generation)
+                continue
+            except Exception as err:
+                log.exception("Failed to evaluate query %s.", generation)
+                if self.fail is None:
+                    continue
+                try:
+                    results = self.fail(err)
+                except Exception:
+                    log.exception("Failed to render the error of query %s.", generation)
+                    continue
+            finally:
+                _state.cancelled = None
+
+            with self._cond:
+                if generation != self.generation:
+                    log.debug("Discarding results of outdated query %s.", generation)
+                    continue
+
+            self.respond(event, results)
+
+
+class IdleTimer:
+    """Calls a function once no activity happened for a delay.
+
+    A single long lived thread waits on a monotonic deadline that every
+    `touch` pushes back, so frequent activity such as keystrokes never
+    spawns or cancels threads.
+
+    Methods:
+        touch: Registers activity and pushes the deadline back.
+        wait: Waits until no call is pending or running.
+
+    Attributes:
+        callback: Function called on the timer thread once idle.
+        delay: How long activity has to stop before calling.
+        name: Name of the timer thread.
+    """
+
+    DELAY: Final[timedelta] = timedelta(seconds=1)
+
+    __slots__ = (
+        "_cond",
+        "_deadline",
+        "_running",
+        "_thread",
+        "callback",
+        "delay",
+        "name",
+    )
+
+    def __init__(
+        self,
+        callback: Callable[[], object],
+        delay: Optional[timedelta] = None,
+        name: str = "toggl-idle",
+    ) -> None:
+        self.callback = callback
+        self.delay = self.DELAY if delay is None else delay
+        self.name = name
+        self._deadline: Optional[float] = None
+        self._running = False
+        self._cond = Condition()
+        self._thread: Optional[Thread] = None
+
+    def touch(self) -> None:
+        with self._cond:
+            idle = self._deadline is None
+            self._deadline = time.monotonic() + self.delay.total_seconds()
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            elif idle:
+                self._cond.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits for the pending call. Returns whether the timer is idle."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._deadline is None and not self._running,
+                timeout,
+            )
+
+    def _next(self) -> None:
+        with self._cond:
+            while True:
+                if self._deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = self._deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            self._deadline = None
+            self._running = True
+
+    def _run(self) -> None:
+        while True:
+            self._next()
+            try:
+                self.callback()
+            except Exception:
+                log.exception("Idle callback of %s failed.", self.name)
+            finally:
+                with self._cond:
+                    self._running = False
+                    self._cond.notify_all()
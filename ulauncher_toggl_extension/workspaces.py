@@ -0,0 +1,95 @@
+"""Multiple Toggl workspaces with separate cache namespaces.
+
+The default workspace keeps using the root of the cache directory, while
+every additional workspace gets its own namespace below it. Fetches across
+workspaces run concurrently on a bounded pool and their results are merged.
+
+Classes:
+    Workspace: Id and cache namespace of a workspace.
+
+Functions:
+    namespaces: Assigns cache namespaces to workspace ids.
+    fetch_all: Runs a fetch for every workspace concurrently.
+
+Attributes:
+    MAX_FETCHES: Maximum amount of concurrent fetches.
+
+Examples:
+    >>> workspaces = namespaces(Path("cache"), (1234, 5678))
+    >>> fetch_all(workspaces, fetch_projects)
+    [TogglProject(...), ...]
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Final, NamedTuple, TypeVar
+
+from ulauncher_toggl_extension.scope import bind
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+    from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAX_FETCHES: Final[int] = 4
+NAMESPACE: Final[str] = "workspaces"
+
+_pool = ThreadPoolExecutor(MAX_FETCHES, thread_name_prefix="toggl-fetch")
+
+
+class Workspace(NamedTuple):
+    """Workspace id with the cache directory its models are stored in."""
+
+    id: int
+    cache_path: Path
+
+
+def namespaces(cache_path: Path, workspace_ids: Sequence[int]) -> list[Workspace]:
+    """Assigns cache namespaces to workspaces.
+
+    Args:
+        cache_path: Root of the cache directory.
+        workspace_ids: Workspace ids with the default workspace first.
+
+    Returns:
+        list: Workspaces in the same order with the default one using the
+            root of the cache directory.
+    """
+    return [
+        Workspace(wid, cache_path if i == 0 else cache_path / NAMESPACE / str(wid))
+        for i, wid in enumerate(workspace_ids)
+    ]
+
+
+def fetch_all(
+    workspaces: Sequence[Workspace],
+    fetch: Callable[[Workspace], Iterable[T]],
+) -> list[T]:
+    """Runs a fetch for every workspace concurrently and merges the results.
+
+    A single workspace is fetched on the calling thread. Others run within
+    the render scope of the caller.
+
+    Args:
+        workspaces: Workspaces to fetch from.
+        fetch: Fetches the models of a single workspace.
+
+    Raises:
+        Exception: The first error raised by any fetch once all of them
+            completed.
+
+    Returns:
+        list: Results of all workspaces in the order of the workspaces.
+    """
+    if len(workspaces) == 1:
+        return list(fetch(workspaces[0]))
+
+    futures = [_pool.submit(bind(fetch), workspace) for workspace in workspaces]
+    wait(futures)
+    log.debug("Fetched from %s workspaces.", len(workspaces))
+    return [model for future in futures for model in future.result()]